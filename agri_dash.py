@@ -110,24 +110,33 @@ LOGIN_CONTENT = """
 </div>
 """
 
-from flask import Flask, render_template_string, request, redirect, url_for, flash, session, g, jsonify
+from flask import Flask, render_template, request, redirect, url_for, flash, session, g, jsonify, has_app_context
 from werkzeug.security import generate_password_hash, check_password_hash
+from jinja2 import DictLoader
 from functools import wraps
+from contextlib import contextmanager
+from concurrent.futures import Future
 import sqlite3
 import os
 import secrets
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from collections import OrderedDict
 import re
+import csv
+import io
+import json
+import threading
+import time
+import queue
+import gc
+import signal
+import socket
 from datetime import datetime
 import numpy as np
-try:
-    import tensorflow as tf
-    TF_AVAILABLE = True
-except ImportError:
-    TF_AVAILABLE = False
-    print("TensorFlow not available. ML features will be disabled.")
+from numpy_model import NumpyFertilizerModel
+from metrics import Registry
 
 # --- Flask App Initialization ---
 app = Flask(__name__)
@@ -138,24 +147,398 @@ app.config['MAIL_USE_TLS'] = True
 app.config['MAIL_USERNAME'] = 'your-email@gmail.com'
 app.config['MAIL_PASSWORD'] = 'your-app-password'
 app.config['MAIL_DEFAULT_SENDER'] = 'your-email@gmail.com'
+app.config['MAIL_TIMEOUT'] = 10
+# Outgoing mail is queued and sent by a background worker over one reused SMTP session.
+# MAIL_QUEUE_SIZE is read once at import; the other mail settings on every use.
+app.config['MAIL_QUEUE_SIZE'] = 100
+app.config['MAIL_BATCH_SIZE'] = 20
+app.config['MAIL_MAX_RETRIES'] = 3
+app.config['MAIL_RETRY_BACKOFF'] = 1.0
+app.config['MAIL_SMTP_IDLE_TIMEOUT'] = 30.0
+app.config['DATABASE'] = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'agridash.db')
+# Connections are checked out of a pool once per request and kept on flask.g.
+app.config['DB_POOL_SIZE'] = 8
+app.config['DB_POOL_TIMEOUT'] = 10.0
+# Storage profile from SQLITE_PROFILES ('wal' or 'rollback'); SQLITE_PRAGMAS overrides single pragmas.
+app.config['SQLITE_PROFILE'] = 'wal'
+app.config['SQLITE_PRAGMAS'] = {}
+# Route every write through one background writer thread. The writer is per process, so
+# prefork/gunicorn workers still contend with each other. It also costs throughput: in
+# benchmarks/bench_sqlite_concurrency.py it raised in-process write p50 from ~2 ms to
+# 15-120 ms and cut writes/s by 20-50%. Leave it off unless a threaded single-process
+# server logs 'database is locked' errors that busy_timeout does not absorb.
+app.config['DB_WRITE_QUEUE'] = False
+app.config['DB_WRITE_QUEUE_SIZE'] = 1000  # read once at import
+# Logged-in user rows are cached per process for a few seconds; writes to a user invalidate it.
+app.config['USER_CACHE_ENABLED'] = True
+app.config['USER_CACHE_TTL'] = 5
+app.config['USER_CACHE_SIZE'] = 10000
+app.config['PREDICT_BATCH_MAX_ROWS'] = 5000
+# Ranked alternatives returned by /predict and /predict/batch (?top_k= overrides the default).
+app.config['PREDICT_TOP_K'] = 3
+app.config['PREDICT_TOP_K_MAX'] = 10
+# Largest grid /predict/sweep will build (rows of the one forward pass).
+app.config['PREDICT_SWEEP_MAX_CELLS'] = 2500
+# Serving: 'waitress' (threaded, pure Python, also runs on Android), 'prefork'
+# (waitress workers forked from one parent, Unix), 'gunicorn' or 'development'.
+app.config['SERVER_MODE'] = 'waitress'
+app.config['SERVER_THREADS'] = 8
+app.config['SERVER_WORKERS'] = 1
+# Load the model in the parent before forking workers so they share its pages copy-on-write.
+# Only the fork-safe NumPy/student/TFLite engines are preloaded; Keras loads per worker.
+app.config['SERVER_PRELOAD_MODEL'] = True
+# The model is loaded off the import path: in a background thread when the server starts
+# (ML_MODEL_WARMUP), otherwise on the first prediction request.
+app.config['ML_MODEL_WARMUP'] = True
+# 'auto' tries the NumPy export, then the quantized TFLite model, then Keras;
+# 'numpy', 'tflite' or 'keras' force one engine. 'student' serves the distilled
+# one-hidden-layer model (student_weights.npz, see distill.py) on the NumPy engine,
+# falling back to 'numpy' when that file is missing.
+app.config['ML_MODEL_BACKEND'] = 'auto'
+# Seconds CLI and benchmark callers wait for the model warm-up; request handlers never
+# wait and answer 503 + Retry-After while it is still loading.
+app.config['ML_MODEL_LOAD_TIMEOUT'] = 30
+# Micro-batching: concurrent /predict calls arriving within the window share one forward pass.
+# 'auto' enables it for the Keras backend only; the NumPy engine has no per-call overhead to amortize.
+app.config['INFERENCE_BATCHING'] = 'auto'
+app.config['INFERENCE_BATCH_WINDOW_MS'] = 3.0
+app.config['INFERENCE_BATCH_MAX_ROWS'] = 64
+# Prediction cache: numeric inputs are rounded to PRECISION decimals before lookup.
+# Size, TTL and precision (like the user cache's) are read on every use.
+app.config['PREDICTION_CACHE_ENABLED'] = True
+app.config['PREDICTION_CACHE_SIZE'] = 4096
+app.config['PREDICTION_CACHE_TTL'] = 3600
+app.config['PREDICTION_CACHE_PRECISION'] = 1
+# Prometheus-style metrics on /metrics. Values are per process; prefork workers each report their own.
+app.config['METRICS_ENABLED'] = True
+# /metrics answers loopback clients, or others sending "Authorization: Bearer <METRICS_TOKEN>".
+# Behind a reverse proxy every client looks local: keep /metrics off the proxy or set a token.
+app.config['METRICS_TOKEN'] = None
+
+# --- Metrics ---
+# Any other verb is recorded as 'other' so clients cannot create unbounded label series.
+METRICS_HTTP_METHODS = frozenset({'GET', 'POST', 'HEAD', 'OPTIONS', 'PUT', 'DELETE', 'PATCH'})
+LOOPBACK_ADDRESSES = frozenset({'127.0.0.1', '::1'})
+
+metrics_registry = Registry()
+REQUEST_DURATION = metrics_registry.histogram(
+    'agridash_http_request_duration_seconds', 'Request latency by endpoint.', ('endpoint', 'method'))
+REQUESTS_TOTAL = metrics_registry.counter(
+    'agridash_http_requests_total', 'Responses by endpoint and status code.', ('endpoint', 'method', 'status'))
+DB_QUERIES_PER_REQUEST = metrics_registry.histogram(
+    'agridash_db_queries_per_request', 'SQL statements executed per request.', ('endpoint',),
+    buckets=(0, 1, 2, 3, 4, 6, 8, 12, 16, 32, 64))
+DB_SECONDS_PER_REQUEST = metrics_registry.histogram(
+    'agridash_db_seconds_per_request', 'Time spent executing SQL statements per request.', ('endpoint',))
+MODEL_INFERENCE_DURATION = metrics_registry.histogram(
+    'agridash_model_inference_seconds', 'Duration of one model forward pass.', ('backend',))
+MODEL_INFERENCE_ROWS = metrics_registry.counter(
+    'agridash_model_inference_rows_total', 'Feature rows run through the model.', ('backend',))
+TEMPLATE_RENDER_DURATION = metrics_registry.histogram(
+    'agridash_template_render_seconds', 'Page template render time.', ('template',))
+
+
+def _cache_stat(field):
+    def collect():
+        for name, cache in (('prediction', prediction_cache), ('user', user_cache)):
+            yield (name,), cache.stats()[field]
+    return collect
+
+
+metrics_registry.callback('agridash_cache_hits_total', 'Cache lookups that found a fresh entry.',
+                          ('cache',), _cache_stat('hits'), kind='counter')
+metrics_registry.callback('agridash_cache_misses_total', 'Cache lookups that missed or found an expired entry.',
+                          ('cache',), _cache_stat('misses'), kind='counter')
+metrics_registry.callback('agridash_cache_hit_ratio', 'Hits divided by lookups since start.',
+                          ('cache',), _cache_stat('hit_ratio'))
+metrics_registry.callback('agridash_cache_entries', 'Entries currently held.',
+                          ('cache',), _cache_stat('entries'))
+metrics_registry.callback('agridash_model_ready', '1 once the model is loaded, by backend.',
+                          ('backend',), lambda: [((model_backend or 'none',), int(ml_model_status == 'ready'))])
+
+
+@app.before_request
+def start_request_metrics():
+    if app.config['METRICS_ENABLED']:
+        g.metrics_started = time.perf_counter()
+        g.db_stats = [0, 0.0]
+
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.pop('metrics_started', None)
+    if started is not None:
+        elapsed = time.perf_counter() - started
+        endpoint = request.endpoint or 'unmatched'
+        method = request.method if request.method in METRICS_HTTP_METHODS else 'other'
+        REQUEST_DURATION.observe(elapsed, (endpoint, method))
+        REQUESTS_TOTAL.inc((endpoint, method, str(response.status_code)))
+        queries, seconds = g.pop('db_stats')
+        DB_QUERIES_PER_REQUEST.observe(queries, (endpoint,))
+        DB_SECONDS_PER_REQUEST.observe(seconds, (endpoint,))
+    return response
+
+
+def record_db_query(elapsed):
+    """Add one statement to the current request's query count and time."""
+    stats = g.get('db_stats') if has_app_context() else None
+    if stats is not None:
+        stats[0] += 1
+        stats[1] += elapsed
+
 
 # --- ML Model Loading ---
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 MODEL_PATH = os.path.join(BASE_DIR, "model.h5")
+NUMPY_MODEL_PATH = os.path.join(BASE_DIR, "model_weights.npz")
+TFLITE_MODEL_PATH = os.path.join(BASE_DIR, "model.tflite")
+STUDENT_MODEL_PATH = os.path.join(BASE_DIR, "student_weights.npz")
+# Preprocessing artifacts: the JSON label metadata written with the TFLite export,
+# or train_and_save.py's pickles (which need scikit-learn to load).
+MODEL_METADATA_PATH = os.path.join(BASE_DIR, "model_metadata.json")
+ENCODERS_PATH = os.path.join(BASE_DIR, "encoders.pkl")
+SCALER_PATH = os.path.join(BASE_DIR, "scaler.pkl")
 model = None
+model_backend = None
 ml_model_available = False
+# One of 'idle' (not requested yet), 'loading', 'ready' or 'failed'.
+ml_model_status = 'idle'
+_model_load_lock = threading.Lock()
+_model_loaded = threading.Event()
+
+
+class TTLCache:
+    """Thread-safe LRU cache with a per-entry time-to-live and hit/miss counters.
+
+    With ``config_prefix`` (e.g. 'USER_CACHE'), a size or TTL left as None is
+    read from ``app.config[prefix + '_SIZE']`` / ``[prefix + '_TTL']`` on every
+    use, so config changes made after import take effect.
+    """
+
+    def __init__(self, max_entries=None, ttl_seconds=None, config_prefix=None):
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self.config_prefix = config_prefix
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _setting(self, value, suffix, default):
+        if value is not None:
+            return value
+        if self.config_prefix:
+            return app.config[f"{self.config_prefix}_{suffix}"]
+        return default
+
+    @property
+    def max_entries(self):
+        return self._setting(self._max_entries, 'SIZE', 4096)
+
+    @property
+    def ttl(self):
+        return self._setting(self._ttl, 'TTL', 3600)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            max_entries = self.max_entries
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class PredictionCache(TTLCache):
+    """Cache of model outputs keyed on the validated raw inputs.
+
+    Keys are a row of the predictor's own inputs (numeric values in the units
+    the user entered, then the categorical codes) rounded to ``precision``
+    decimals, so the key does not depend on the training scaler. Inputs that
+    only differ below that precision (e.g. soil values from the same lab
+    template) share one forward pass.
+    """
+
+    def __init__(self, max_entries=None, ttl_seconds=None, precision=None, config_prefix=None):
+        super().__init__(max_entries, ttl_seconds, config_prefix)
+        self._precision = precision
+
+    @property
+    def precision(self):
+        return self._setting(self._precision, 'PRECISION', 1)
+
+    def key(self, inputs):
+        return (np.round(inputs.astype(np.float64), self.precision) + 0.0).tobytes()
+
+
+prediction_cache = PredictionCache(config_prefix='PREDICTION_CACHE')
+
+
+def load_ml_model(allow_tensorflow=True):
+    """Load (or reload) the fertilizer model and drop any cached predictions.
+
+    TensorFlow is only imported here, and only when the NumPy export is missing.
+    With ``allow_tensorflow=False`` only the engines that run without it are tried
+    (see preload_for_fork).
+    """
+    global model, model_backend, ml_model_available, ml_model_status, preprocessor
+
+    with _model_load_lock:
+        ml_model_status = 'loading'
+        loaded = None
+        backend = None
+
+        choice = app.config['ML_MODEL_BACKEND']
+
+        # Without the training encoders and scaler the model's outputs are meaningless.
+        try:
+            pipeline = PreprocessingPipeline.load()
+        except Exception as e:
+            print(f"Error loading preprocessing artifacts (model_metadata.json or encoders.pkl/scaler.pkl): {e}")
+            choice = None
+
+        # The distilled student is opt-in: it trades a little agreement with the full
+        # network for a much smaller forward pass. Without it, serve the full network
+        # on the NumPy engine rather than disabling ML predictions.
+        if choice == 'student':
+            if not os.path.exists(STUDENT_MODEL_PATH):
+                print(f"Student model not found at {STUDENT_MODEL_PATH}. Run distill.py to create it.")
+            else:
+                try:
+                    loaded = NumpyFertilizerModel.load(STUDENT_MODEL_PATH)
+                    backend = "student"
+                    print("ML Model loaded successfully (distilled student, NumPy engine)!")
+                except Exception as e:
+                    print(f"Error loading student model weights: {e}")
+            if loaded is None:
+                print("Warning: falling back to the full model on the NumPy engine.")
+                choice = 'numpy'
+
+        # Prefer the exported NumPy weights (see numpy_model.py): they need no TensorFlow,
+        # so the predictor also works on Android and workers start without importing TF.
+        if choice in ('auto', 'numpy') and os.path.exists(NUMPY_MODEL_PATH):
+            try:
+                loaded = NumpyFertilizerModel.load(NUMPY_MODEL_PATH)
+                backend = "numpy"
+                print("ML Model loaded successfully (NumPy engine)!")
+            except Exception as e:
+                print(f"Error loading NumPy model weights: {e}")
+
+        # The quantized TFLite export (see tflite_model.py) runs on the lightweight
+        # ai-edge-litert / tflite-runtime interpreters instead of full TensorFlow.
+        if loaded is None and choice in ('auto', 'tflite') and os.path.exists(TFLITE_MODEL_PATH):
+            try:
+                from tflite_model import TFLiteFertilizerModel, has_lightweight_interpreter
+                if allow_tensorflow or has_lightweight_interpreter():
+                    loaded = TFLiteFertilizerModel.load(TFLITE_MODEL_PATH)
+                    backend = "tflite"
+                    print("ML Model loaded successfully (TFLite interpreter)!")
+            except ImportError:
+                print("No TFLite interpreter installed (ai-edge-litert, tflite-runtime or tensorflow).")
+            except Exception as e:
+                print(f"Error loading TFLite model: {e}")
+
+        if loaded is None and allow_tensorflow and choice in ('auto', 'keras'):
+            if not os.path.exists(MODEL_PATH):
+                print(f"Warning: Model file not found at {MODEL_PATH}")
+                print("ML-based predictions will not be available. Basic recommendations will still work.")
+            else:
+                try:
+                    import tensorflow as tf
+                    loaded = tf.keras.models.load_model(MODEL_PATH)
+                    backend = "keras"
+                    print("ML Model loaded successfully!")
+                except ImportError:
+                    print("TensorFlow not available. Run numpy_model.py to export model_weights.npz.")
+                except Exception as e:
+                    print(f"Error loading ML model: {e}")
+                    print("ML-based predictions will not be available.")
+
+        model = loaded
+        model_backend = backend
+        ml_model_available = loaded is not None
+        if ml_model_available:
+            preprocessor = pipeline
+        ml_model_status = 'ready' if ml_model_available else 'failed'
+        prediction_cache.clear()
+        _model_loaded.set()
+    return ml_model_available
+
+
+def start_model_warmup():
+    """Load the model in a background thread so the server can start serving at once."""
+    global ml_model_status
+
+    with _model_load_lock:
+        if ml_model_status != 'idle':
+            return
+        ml_model_status = 'loading'
+    threading.Thread(target=load_ml_model, name="model-warmup", daemon=True).start()
+
+
+def ensure_ml_model(timeout=None):
+    """Make sure the model has been loaded, loading it now if nothing has started it.
+
+    Returns True once the model is ready, False if loading failed or is still
+    in progress. Request handlers pass no ``timeout`` so an in-flight warm-up
+    answers 503 + Retry-After at once instead of tying up a server thread;
+    CLI and benchmark callers pass one to wait for the warm-up to finish.
+    """
+    global ml_model_status
+
+    with _model_load_lock:
+        load_now = ml_model_status == 'idle'
+        if load_now:
+            ml_model_status = 'loading'
+    if load_now:
+        return load_ml_model()
+
+    if timeout is not None:
+        _model_loaded.wait(timeout)
+    return _model_loaded.is_set() and ml_model_available
+
+
+def model_unavailable_response():
+    """JSON error for prediction endpoints when the model is not ready."""
+    if ml_model_status == 'loading':
+        response = jsonify({"error": "ML model is still loading. Please retry shortly.", "status": ml_model_status})
+        response.headers['Retry-After'] = '2'
+        return response, 503
+    return jsonify({
+        "error": "ML model is not available. Please ensure model_weights.npz or model.h5 exists.",
+        "status": ml_model_status
+    }), 503
 
-if os.path.exists(MODEL_PATH):
-    try:
-        model = tf.keras.models.load_model(MODEL_PATH)
-        ml_model_available = True
-        print("ML Model loaded successfully!")
-    except Exception as e:
-        print(f"Error loading ML model: {e}")
-        print("ML-based predictions will not be available.")
-else:
-    print(f"Warning: Model file not found at {MODEL_PATH}")
-    print("ML-based predictions will not be available. Basic recommendations will still work.")
 
 # --- ML Model Data ---
 crops_ml = {
@@ -241,11 +624,462 @@ month_to_int = {month: i for i, month in enumerate(months_ml)}
 
 EXPECTED_MODEL_INPUT_FEATURES = 10
 
+# Numeric predictor inputs, in model column order, with their accepted ranges.
+PARAMETER_RANGES = {
+    "N": (0, 300),
+    "P": (0, 200),
+    "K": (0, 250),
+    "temperature": (10, 50),
+    "humidity": (0, 100),
+    "ph": (4.0, 9.0),
+    "moisture": (0, 100)
+}
+NUMERIC_INPUT_FIELDS = list(PARAMETER_RANGES)
+_RANGE_LOW = np.array([low for low, _ in PARAMETER_RANGES.values()], dtype=np.float64)
+_RANGE_HIGH = np.array([high for _, high in PARAMETER_RANGES.values()], dtype=np.float64)
+
+CATEGORICAL_INPUT_FIELDS = [
+    ("crop", crop_to_int),
+    ("region", region_to_int),
+    ("month", month_to_int)
+]
+PREDICTION_INPUT_FIELDS = NUMERIC_INPUT_FIELDS + [name for name, _ in CATEGORICAL_INPUT_FIELDS]
+
+
+# Training CSV column for each predictor field (see train_and_save.py).
+TRAINING_COLUMNS = {
+    "N": "N", "P": "P", "K": "K", "temperature": "Temperature(C)", "humidity": "Humidity(%)",
+    "ph": "Soil_pH", "moisture": "Moisture(%)", "crop": "Crop", "region": "Region", "month": "Month"
+}
+
+
+def _vocabulary_key(name):
+    # train_and_save.py strips and lowercases every categorical value before encoding.
+    return name.strip().lower()
+
+
+class PreprocessingPipeline:
+    """Turns raw predictor rows into model inputs in one vectorized pass.
+
+    Built once from the training artifacts: the LabelEncoder vocabularies,
+    the StandardScaler mean and scale as NumPy arrays, and the fertilizer
+    classes in model output order. ``transform`` validates a whole batch,
+    encodes the categoricals, puts the columns in training order, scales and
+    casts to float32 without calling scikit-learn.
+    """
+
+    def __init__(self, features, categories, mean, scale, labels):
+        features = list(features)
+        missing = [column for column in TRAINING_COLUMNS.values() if column not in features]
+        if missing or len(features) != EXPECTED_MODEL_INPUT_FEATURES:
+            raise ValueError(f"Model features {features} do not match the predictor inputs")
+        self.columns = np.array([features.index(TRAINING_COLUMNS[field]) for field in PREDICTION_INPUT_FIELDS])
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.vocabularies = {
+            field: {_vocabulary_key(name): code for code, name in enumerate(categories[TRAINING_COLUMNS[field]])}
+            for field, _ in CATEGORICAL_INPUT_FIELDS
+        }
+        display_names = {_vocabulary_key(name): name for name in fertilizers_ml}
+        self.labels = [display_names.get(_vocabulary_key(label), label.title()) for label in labels]
+        self.label_types = [categorize_fertilizer(label) for label in self.labels]
+        # One-hot (label x category) matrix: probabilities @ matrix sums them per category.
+        self.categories = sorted(set(self.label_types))
+        self.category_matrix = np.zeros((len(self.labels), len(self.categories)), dtype=np.float32)
+        for i, label_type in enumerate(self.label_types):
+            self.category_matrix[i, self.categories.index(label_type)] = 1.0
+
+    @classmethod
+    def from_metadata(cls, path=MODEL_METADATA_PATH):
+        with open(path) as f:
+            metadata = json.load(f)
+        return cls(metadata["features"], metadata["categories"], metadata["scaler"]["mean"],
+                   metadata["scaler"]["scale"], metadata["labels"])
+
+    @classmethod
+    def from_pickles(cls, encoders_path=ENCODERS_PATH, scaler_path=SCALER_PATH):
+        import pickle
+
+        with open(encoders_path, "rb") as f:
+            encoders = pickle.load(f)
+        with open(scaler_path, "rb") as f:
+            scaler = pickle.load(f)
+        categories = {column: list(encoder.classes_) for column, encoder in encoders["label_encoders"].items()}
+        features = getattr(scaler, "feature_names_in_", list(TRAINING_COLUMNS.values()))
+        return cls(features, categories, scaler.mean_, scaler.scale_, list(encoders["fertilizer_encoder"].classes_))
+
+    @classmethod
+    def load(cls):
+        if os.path.exists(MODEL_METADATA_PATH):
+            return cls.from_metadata()
+        return cls.from_pickles()
+
+    def encode_category(self, field, value):
+        """Model code for a categorical value, or None if the model was not trained on it."""
+        if not isinstance(value, str):
+            return None
+        vocabulary = self.vocabularies[field]
+        key = _vocabulary_key(value)
+        code = vocabulary.get(key)
+        if code is None and " (" in key:
+            # App names may add a local name in brackets, e.g. "Sesame (Til)" for "sesame".
+            code = vocabulary.get(key.split(" (")[0])
+        return code
+
+    def transform(self, rows, with_inputs=False):
+        """Validate, encode, scale and cast a batch of raw predictor rows.
+
+        Returns ``(features, errors)``: a float32 array with one row per input and
+        a dict mapping row index to the first validation error for that row.
+        Rows with errors are left as zeros in ``features``. With ``with_inputs``
+        the unscaled inputs (numeric fields, then categorical codes, in
+        PREDICTION_INPUT_FIELDS order) are returned third, for the prediction cache.
+        """
+        n_rows = len(rows)
+        numeric = np.full((n_rows, len(NUMERIC_INPUT_FIELDS)), np.nan, dtype=np.float64)
+        codes = np.zeros((n_rows, len(CATEGORICAL_INPUT_FIELDS)), dtype=np.float64)
+        errors = {}
+
+        for i, row in enumerate(rows):
+            if not isinstance(row, dict):
+                errors[i] = "Each row must be an object with the predictor fields."
+                continue
+            for j, field in enumerate(NUMERIC_INPUT_FIELDS):
+                value = row.get(field)
+                if value is None or value == "":
+                    errors[i] = f"Missing {field} value."
+                    break
+                try:
+                    numeric[i, j] = float(value)
+                except (TypeError, ValueError) as e:
+                    errors[i] = str(e)
+                    break
+
+        # Range checks run over the whole matrix at once; NaN fails both bounds.
+        in_range = (numeric >= _RANGE_LOW) & (numeric <= _RANGE_HIGH)
+        for i in np.flatnonzero(~in_range.all(axis=1)):
+            i = int(i)
+            if i in errors:
+                continue
+            j = int(np.argmin(in_range[i]))
+            param = NUMERIC_INPUT_FIELDS[j]
+            min_val, max_val = PARAMETER_RANGES[param]
+            errors[i] = f"Invalid {param} value: {numeric[i, j]}. Must be between {min_val} and {max_val}."
+
+        for i, row in enumerate(rows):
+            if i in errors:
+                continue
+            for j, (field, app_values) in enumerate(CATEGORICAL_INPUT_FIELDS):
+                value = row.get(field)
+                encoded = self.encode_category(field, value)
+                if encoded is None:
+                    if isinstance(value, str) and value in app_values:
+                        errors[i] = f"The prediction model was not trained on {field} '{value}'."
+                    else:
+                        errors[i] = f"Invalid {field}: '{value}'"
+                    break
+                codes[i, j] = encoded
+
+        raw = np.hstack([numeric, codes])
+        features = np.empty_like(raw)
+        features[:, self.columns] = raw
+        features -= self.mean
+        features /= self.scale
+        features = features.astype(np.float32)
+        if errors:
+            features[list(errors)] = 0.0
+        if with_inputs:
+            return features, errors, raw
+        return features, errors
+
+    def column_values(self, field, values):
+        """Model column of a predictor field and ``values`` (raw numbers or codes) scaled for it."""
+        column = int(self.columns[PREDICTION_INPUT_FIELDS.index(field)])
+        scaled = (np.asarray(values, dtype=np.float64) - self.mean[column]) / self.scale[column]
+        return column, scaled.astype(np.float32)
+
+    def label(self, predicted_index):
+        if 0 <= predicted_index < len(self.labels):
+            return self.labels[predicted_index]
+        return "Custom Fertilizer Blend"
+
+
+preprocessor = None
+_preprocessor_lock = threading.Lock()
+
+
+def get_preprocessor():
+    """Return the preprocessing pipeline, loading the training artifacts on first use."""
+    global preprocessor
+    if preprocessor is None:
+        with _preprocessor_lock:
+            if preprocessor is None:
+                preprocessor = PreprocessingPipeline.load()
+    return preprocessor
+
+
+def encode_prediction_inputs(rows, with_inputs=False):
+    """Validate raw predictor inputs and turn them into one scaled feature matrix.
+
+    See :meth:`PreprocessingPipeline.transform`; single and batch predictions
+    share this path.
+    """
+    return get_preprocessor().transform(rows, with_inputs)
+
+
+def top_k_fertilizers(probabilities, k):
+    """Class indices and probabilities of the ``k`` most likely fertilizers per row, best first.
+
+    ``argpartition`` selects the top ``k`` in linear time; only those ``k``
+    columns are then sorted.
+    """
+    k = max(1, min(k, probabilities.shape[1]))
+    top = np.argpartition(probabilities, -k, axis=1)[:, -k:]
+    top_probabilities = np.take_along_axis(probabilities, top, axis=1)
+    order = np.argsort(-top_probabilities, axis=1)
+    return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_probabilities, order, axis=1)
+
+
+def describe_predictions(probabilities, top_k=1, by_category=False):
+    """Build the JSON result for each row of a probability matrix from one forward pass."""
+    pipeline = get_preprocessor()
+    indices, top_probabilities = top_k_fertilizers(probabilities, top_k)
+    if by_category:
+        category_probabilities = probabilities @ pipeline.category_matrix
+
+    results = []
+    for r in range(len(probabilities)):
+        ranked = [
+            {
+                "fertilizer": pipeline.label(int(i)),
+                "fertilizer_type": pipeline.label_types[int(i)],
+                "probability": round(float(p), 4)
+            }
+            for i, p in zip(indices[r], top_probabilities[r])
+        ]
+        result = dict(ranked[0], top=ranked)
+        if by_category:
+            result["categories"] = sorted(
+                ({"category": name, "probability": round(float(p), 4)}
+                 for name, p in zip(pipeline.categories, category_probabilities[r])),
+                key=lambda item: item["probability"], reverse=True
+            )
+        results.append(result)
+    return results
+
+
+def prediction_choices():
+    """Crops (by category), regions and months the prediction model was trained on."""
+    pipeline = get_preprocessor()
+    crops = {
+        category: [crop for crop in names if pipeline.encode_category("crop", crop) is not None]
+        for category, names in crops_ml.items()
+    }
+    regions = [region for region in regions_ml if pipeline.encode_category("region", region) is not None]
+    months = [month for month in months_ml if pipeline.encode_category("month", month) is not None]
+    return crops, regions, months
+
+
+def _forward(features):
+    if not app.config['METRICS_ENABLED']:
+        return model.predict(features, verbose=0)
+    started = time.perf_counter()
+    probabilities = model.predict(features, verbose=0)
+    MODEL_INFERENCE_DURATION.observe(time.perf_counter() - started, (model_backend,))
+    MODEL_INFERENCE_ROWS.inc((model_backend,), len(features))
+    return probabilities
+
+
+class InferenceBatcher:
+    """Collects concurrent prediction requests and runs them as one forward pass.
+
+    Callers block in :meth:`submit` until the batch containing their rows has
+    run. A batch closes when ``max_rows`` rows are queued or ``window_ms`` has
+    passed since its first request arrived, whichever comes first. Either
+    left as None is read from ``app.config`` (INFERENCE_BATCH_WINDOW_MS /
+    INFERENCE_BATCH_MAX_ROWS) for every batch, so config changes made after
+    import take effect.
+    """
+
+    def __init__(self, predict_fn, window_ms=None, max_rows=None):
+        self.predict_fn = predict_fn
+        self.window_ms = window_ms
+        self._max_rows = max_rows
+        self._pending = []
+        self._pending_rows = 0
+        self._cond = threading.Condition()
+        self._worker = None
+        self._stats_lock = threading.Lock()
+        self.reset_stats()
+
+    @property
+    def window(self):
+        window_ms = app.config['INFERENCE_BATCH_WINDOW_MS'] if self.window_ms is None else self.window_ms
+        return window_ms / 1000.0
+
+    @property
+    def max_rows(self):
+        return app.config['INFERENCE_BATCH_MAX_ROWS'] if self._max_rows is None else self._max_rows
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self._batches = 0
+            self._rows = 0
+            self._max_batch = 0
+            self._wait_total = 0.0
+            self._wait_max = 0.0
+            self._inference_total = 0.0
+
+    def stats(self):
+        """Return batch-size, queue-wait and inference-time counters."""
+        with self._stats_lock:
+            batches = self._batches
+            return {
+                "batches": batches,
+                "rows": self._rows,
+                "avg_batch_size": self._rows / batches if batches else 0.0,
+                "max_batch_size": self._max_batch,
+                "avg_queue_wait_ms": 1000.0 * self._wait_total / self._rows if self._rows else 0.0,
+                "max_queue_wait_ms": 1000.0 * self._wait_max,
+                "avg_inference_ms": 1000.0 * self._inference_total / batches if batches else 0.0,
+                "window_ms": 1000.0 * self.window,
+                "max_rows": self.max_rows,
+            }
+
+    def submit(self, features):
+        """Queue a feature matrix and block until its probabilities are ready."""
+        job = {"features": features, "queued": time.perf_counter(), "done": threading.Event()}
+        with self._cond:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="inference-batcher", daemon=True)
+                self._worker.start()
+            self._pending.append(job)
+            self._pending_rows += len(features)
+            self._cond.notify()
+        job["done"].wait()
+        if "error" in job:
+            # The error is shared by every job in the batch; chain it so each
+            # caller raises its own exception with its own traceback.
+            raise RuntimeError(f"Batched inference failed: {job['error']}") from job["error"]
+        return job["result"]
+
+    def _take_batch(self):
+        with self._cond:
+            while not self._pending:
+                self._cond.wait()
+            deadline = self._pending[0]["queued"] + self.window
+            max_rows = self.max_rows
+            while self._pending_rows < max_rows:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch, self._pending = self._pending, []
+            self._pending_rows = 0
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            started = time.perf_counter()
+            try:
+                if len(batch) == 1:
+                    outputs = [self.predict_fn(batch[0]["features"])]
+                else:
+                    sizes = [len(job["features"]) for job in batch]
+                    merged = self.predict_fn(np.vstack([job["features"] for job in batch]))
+                    outputs = np.split(merged, np.cumsum(sizes)[:-1])
+                for job, output in zip(batch, outputs):
+                    job["result"] = output
+            except Exception as e:
+                for job in batch:
+                    job["error"] = e
+            finished = time.perf_counter()
+
+            rows = sum(len(job["features"]) for job in batch)
+            waits = [started - job["queued"] for job in batch]
+            with self._stats_lock:
+                self._batches += 1
+                self._rows += rows
+                self._max_batch = max(self._max_batch, rows)
+                self._wait_total += sum(w * len(job["features"]) for w, job in zip(waits, batch))
+                self._wait_max = max(self._wait_max, max(waits))
+                self._inference_total += finished - started
+
+            for job in batch:
+                job["done"].set()
+
+
+inference_batcher = InferenceBatcher(_forward)
+
+
+def inference_batching_enabled():
+    batching = app.config['INFERENCE_BATCHING']
+    if batching == 'auto':
+        return model_backend == "keras"
+    return bool(batching)
+
+
+def _infer(features):
+    # Small requests go through the micro-batcher so concurrent callers share one
+    # pass; matrices that already fill a batch are run directly.
+    if inference_batching_enabled() and len(features) < inference_batcher.max_rows:
+        return inference_batcher.submit(features)
+    return _forward(features)
+
+
+def run_model(features, inputs):
+    """Return class probabilities for a 2-D feature matrix.
+
+    ``inputs`` are the matching unscaled rows from ``encode_prediction_inputs``
+    and key the prediction cache. Rows found there skip the model; the
+    remaining rows are run together in one forward pass and cached.
+    """
+    if not app.config['PREDICTION_CACHE_ENABLED']:
+        return _infer(features)
+
+    keys = [prediction_cache.key(row) for row in inputs]
+    cached = [prediction_cache.get(key) for key in keys]
+    missing = [i for i, hit in enumerate(cached) if hit is None]
+    if not missing:
+        return np.vstack(cached)
+
+    computed = _infer(features[missing])
+    for i, probabilities in zip(missing, computed):
+        prediction_cache.put(keys[i], probabilities.copy())
+        cached[i] = probabilities
+    return np.vstack(cached)
+
 # --- Database Functions ---
+SQLITE_PROFILES = {
+    # SQLite defaults: rollback journal, readers wait while a writer commits.
+    'rollback': {
+        'busy_timeout': 5000,
+        'temp_store': 'MEMORY',
+    },
+    # Write-ahead log: readers never block on the writer. synchronous=NORMAL is
+    # durable across application crashes and only risks the last commit on power loss.
+    'wal': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,
+        'temp_store': 'MEMORY',
+        'mmap_size': 64 * 1024 * 1024,
+        'cache_size': -16000,
+    },
+}
+
+
+def sqlite_pragmas():
+    """Pragmas for new connections: the storage profile plus any overrides."""
+    pragmas = dict(SQLITE_PROFILES[app.config['SQLITE_PROFILE']])
+    pragmas.update(app.config['SQLITE_PRAGMAS'])
+    return pragmas
+
+
 def init_db():
     """Initialize SQLite database with users table if it doesn't exist."""
-    db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'agridash.db')
-    conn = sqlite3.connect(db_path)
+    conn = get_db_connection()
     cursor = conn.cursor()
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS users (
@@ -290,45 +1124,287 @@ def init_db():
         )
     ''')
     conn.commit()
+    run_migrations(conn)
     conn.close()
 
 
+# Schema migrations, applied in order. PRAGMA user_version holds the last
+# version applied, so each one runs exactly once per database file.
+MIGRATIONS = [
+    (1, "Index per-user crop and soil test lookups and reset tokens", [
+        'CREATE INDEX IF NOT EXISTS idx_crops_user_planting ON crops (user_id, planting_date)',
+        'CREATE INDEX IF NOT EXISTS idx_soil_testing_user_date ON soil_testing (user_id, test_date)',
+        'CREATE INDEX IF NOT EXISTS idx_users_reset_token ON users (reset_token)',
+    ]),
+]
+
+
+def get_schema_version(conn):
+    """Return the schema version recorded in the database file."""
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def run_migrations(conn):
+    """Apply pending migrations; safe to call on every startup and from several workers."""
+    applied = []
+    for version, description, statements in MIGRATIONS:
+        if version <= get_schema_version(conn):
+            continue
+        # BEGIN IMMEDIATE takes the write lock first, so concurrent starters
+        # re-check the version instead of applying the same migration twice.
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if version <= get_schema_version(conn):
+                conn.rollback()
+                continue
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(f'PRAGMA user_version = {int(version)}')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied.append(version)
+        print(f"Applied schema migration {version}: {description}")
+    return applied
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """sqlite3 connection whose ``execute`` is counted and timed for /metrics."""
+
+    def execute(self, sql, parameters=()):
+        if not app.config['METRICS_ENABLED']:
+            return super().execute(sql, parameters)
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            record_db_query(time.perf_counter() - started)
+
+
 def get_db_connection():
-    """Get a connection to the SQLite database."""
-    db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'agridash.db')
-    conn = sqlite3.connect(db_path)
+    """Open a new connection to the SQLite database with the configured pragmas."""
+    conn = sqlite3.connect(app.config['DATABASE'], check_same_thread=False, factory=InstrumentedConnection)
     conn.row_factory = sqlite3.Row
+    for pragma, value in sqlite_pragmas().items():
+        conn.execute(f'PRAGMA {pragma} = {value}')
     return conn
 
 
+class ConnectionPool:
+    """Thread-safe pool of SQLite connections.
+
+    Up to ``size`` connections are opened on demand and reused; pragmas are set
+    once when a connection is created. ``acquire`` blocks for up to ``timeout``
+    seconds when every connection is checked out.
+    """
+
+    def __init__(self, database, size=8, timeout=10.0, connect=get_db_connection):
+        self.database = database
+        self.size = size
+        self.timeout = timeout
+        self._connect = connect
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_create = self._created < self.size
+            if can_create:
+                self._created += 1
+        if can_create:
+            try:
+                return self._connect()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError(
+                f"Timed out after {self.timeout}s waiting for one of {self.size} database connections"
+            )
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    def close(self):
+        """Close idle connections; checked-out ones are closed with the pool object."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._created -= 1
+
+
+_db_pool = None
+_db_pool_lock = threading.Lock()
+
+
+def get_db_pool():
+    """Return the process-wide pool, rebuilding it if the DATABASE setting changed."""
+    global _db_pool
+    database = app.config['DATABASE']
+    pool = _db_pool
+    if pool is None or pool.database != database:
+        with _db_pool_lock:
+            if _db_pool is None or _db_pool.database != database:
+                if _db_pool is not None:
+                    _db_pool.close()
+                _db_pool = ConnectionPool(
+                    database,
+                    size=app.config['DB_POOL_SIZE'],
+                    timeout=app.config['DB_POOL_TIMEOUT']
+                )
+            pool = _db_pool
+    return pool
+
+
+def _reset_db_pool_after_fork():
+    # SQLite connections must not cross fork(); children open their own.
+    global _db_pool
+    _db_pool = None
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_db_pool_after_fork)
+
+
+@contextmanager
+def db_connection():
+    """Yield the database connection for the current request.
+
+    Inside an app context the connection is checked out of the pool once and
+    kept on ``g`` until teardown; outside one (scripts, the CLI) it is
+    returned to the pool as soon as the block exits.
+    """
+    if has_app_context():
+        if 'db' not in g:
+            g.db_pool = get_db_pool()
+            g.db = g.db_pool.acquire()
+        yield g.db
+        return
+
+    pool = get_db_pool()
+    conn = pool.acquire()
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
+
+
+@app.teardown_appcontext
+def release_db_connection(exception=None):
+    """Return the request's connection to the pool."""
+    conn = g.pop('db', None)
+    if conn is not None:
+        g.pop('db_pool').release(conn)
+
+
+class DatabaseWriter:
+    """Single background thread that runs queued write helpers one at a time.
+
+    With SQLite only one writer can hold the lock anyway; funnelling writes
+    through one thread removes busy-wait retries between writers, and with WAL
+    readers keep reading while the writer works.
+    """
+
+    def __init__(self, max_queue=1000):
+        self._jobs = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._conn = None
+        self._database = None
+
+    def in_writer_thread(self):
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def submit(self, func, *args, **kwargs):
+        """Queue ``func(*args, **kwargs)`` and block until the writer has run it."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+                self._thread.start()
+        future = Future()
+        self._jobs.put((future, func, args, kwargs))
+        return future.result()
+
+    def _connection(self):
+        # The writer keeps its own connection so it never waits on the request pool.
+        database = app.config['DATABASE']
+        if self._conn is None or self._database != database:
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = get_db_connection()
+            self._database = database
+        return self._conn
+
+    def _run(self):
+        while True:
+            future, func, args, kwargs = self._jobs.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            with app.app_context():
+                try:
+                    g.db = self._connection()
+                    future.set_result(func(*args, **kwargs))
+                except Exception as e:
+                    future.set_exception(e)
+                finally:
+                    conn = g.pop('db', None)
+                    if conn is not None and conn.in_transaction:
+                        conn.rollback()
+
+
+db_writer = DatabaseWriter(max_queue=app.config['DB_WRITE_QUEUE_SIZE'])
+
+
+def serialized_write(func):
+    """Run a write helper on the DB writer thread when DB_WRITE_QUEUE is enabled."""
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if app.config['DB_WRITE_QUEUE'] and not db_writer.in_writer_thread():
+            return db_writer.submit(func, *args, **kwargs)
+        return func(*args, **kwargs)
+
+    return wrapper
+
+
 def get_user_by_username(username):
     """Retrieve user by username from database."""
-    conn = get_db_connection()
-    user = conn.execute(
-        'SELECT * FROM users WHERE username = ?', (username,)
-    ).fetchone()
-    conn.close()
-    return user
+    with db_connection() as conn:
+        return conn.execute(
+            'SELECT * FROM users WHERE username = ?', (username,)
+        ).fetchone()
 
 
 def get_user_by_email(email):
     """Retrieve user by email from database."""
-    conn = get_db_connection()
-    user = conn.execute(
-        'SELECT * FROM users WHERE email = ?', (email,)
-    ).fetchone()
-    conn.close()
-    return user
+    with db_connection() as conn:
+        return conn.execute(
+            'SELECT * FROM users WHERE email = ?', (email,)
+        ).fetchone()
 
 
 def get_user_by_phone(phone):
     """Retrieve user by phone from database."""
-    conn = get_db_connection()
-    user = conn.execute(
-        'SELECT * FROM users WHERE phone = ?', (phone,)
-    ).fetchone()
-    conn.close()
-    return user
+    with db_connection() as conn:
+        return conn.execute(
+            'SELECT * FROM users WHERE phone = ?', (phone,)
+        ).fetchone()
 
 
 def get_user_by_identifier(identifier):
@@ -343,160 +1419,188 @@ def get_user_by_identifier(identifier):
 
 def get_user_by_id(user_id):
     """Retrieve user by ID from database."""
-    conn = get_db_connection()
-    user = conn.execute(
-        'SELECT * FROM users WHERE id = ?', (user_id,)
-    ).fetchone()
-    conn.close()
+    with db_connection() as conn:
+        return conn.execute(
+            'SELECT * FROM users WHERE id = ?', (user_id,)
+        ).fetchone()
+
+
+user_cache = TTLCache(config_prefix='USER_CACHE')
+
+
+def get_cached_user(user_id):
+    """Retrieve user by ID, served from the per-process user cache when fresh."""
+    if not app.config['USER_CACHE_ENABLED']:
+        return get_user_by_id(user_id)
+    user = user_cache.get(user_id)
+    if user is None:
+        user = get_user_by_id(user_id)
+        if user is not None:
+            user_cache.put(user_id, user)
     return user
 
 
 def get_user_by_reset_token(token):
     """Retrieve user by reset token."""
-    conn = get_db_connection()
-    user = conn.execute(
-        'SELECT * FROM users WHERE reset_token = ? AND token_expiry > datetime("now")', (token,)
-    ).fetchone()
-    conn.close()
-    return user
+    with db_connection() as conn:
+        return conn.execute(
+            'SELECT * FROM users WHERE reset_token = ? AND token_expiry > datetime("now")', (token,)
+        ).fetchone()
 
 
+@serialized_write
 def create_user(username, password_hash, email, phone, full_name, farm_name, location, total_land):
     """Create a new user in the database."""
-    conn = get_db_connection()
-    try:
-        conn.execute(
-            'INSERT INTO users (username, password_hash, email, phone, full_name, farm_name, location, total_land) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
-            (username, password_hash, email, phone, full_name, farm_name, location, total_land)
-        )
-        conn.commit()
-        return True
-    except sqlite3.IntegrityError as e:
-        print(f"Integrity error: {e}")
-        return False
-    finally:
-        conn.close()
-
-
+    with db_connection() as conn:
+        try:
+            conn.execute(
+                'INSERT INTO users (username, password_hash, email, phone, full_name, farm_name, location, total_land) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (username, password_hash, email, phone, full_name, farm_name, location, total_land)
+            )
+            conn.commit()
+            return True
+        except sqlite3.IntegrityError as e:
+            conn.rollback()
+            print(f"Integrity error: {e}")
+            return False
+
+
+@serialized_write
 def update_password(user_id, password_hash):
     """Update user password."""
-    conn = get_db_connection()
-    try:
-        conn.execute(
-            'UPDATE users SET password_hash = ?, reset_token = NULL, token_expiry = NULL WHERE id = ?',
-            (password_hash, user_id)
-        )
-        conn.commit()
-        return True
-    except Exception as e:
-        print(f"Password update error: {e}")
-        return False
-    finally:
-        conn.close()
-
-
+    with db_connection() as conn:
+        try:
+            conn.execute(
+                'UPDATE users SET password_hash = ?, reset_token = NULL, token_expiry = NULL WHERE id = ?',
+                (password_hash, user_id)
+            )
+            conn.commit()
+            user_cache.invalidate(user_id)
+            return True
+        except Exception as e:
+            conn.rollback()
+            print(f"Password update error: {e}")
+            return False
+
+
+@serialized_write
 def update_user_profile(user_id, email, phone, full_name, farm_name, location, total_land):
     """Update user profile details."""
-    conn = get_db_connection()
-    try:
-        conn.execute(
-            'UPDATE users SET email = ?, phone = ?, full_name = ?, farm_name = ?, location = ?, total_land = ? WHERE id = ?',
-            (email, phone, full_name, farm_name, location, total_land, user_id)
-        )
-        conn.commit()
-        return True
-    except sqlite3.IntegrityError as e:
-        print(f"Profile update integrity error: {e}")
-        return False
-    except Exception as e:
-        print(f"Profile update error: {e}")
-        return False
-    finally:
-        conn.close()
-
-
+    with db_connection() as conn:
+        try:
+            conn.execute(
+                'UPDATE users SET email = ?, phone = ?, full_name = ?, farm_name = ?, location = ?, total_land = ? WHERE id = ?',
+                (email, phone, full_name, farm_name, location, total_land, user_id)
+            )
+            conn.commit()
+            user_cache.invalidate(user_id)
+            return True
+        except sqlite3.IntegrityError as e:
+            conn.rollback()
+            print(f"Profile update integrity error: {e}")
+            return False
+        except Exception as e:
+            conn.rollback()
+            print(f"Profile update error: {e}")
+            return False
+
+
+@serialized_write
+def update_user_location(user_id, location):
+    """Update the location used for the user's weather widget."""
+    with db_connection() as conn:
+        try:
+            conn.execute(
+                'UPDATE users SET location = ? WHERE id = ?',
+                (location, user_id)
+            )
+            conn.commit()
+            user_cache.invalidate(user_id)
+            return True
+        except Exception as e:
+            conn.rollback()
+            print(f"Location update error: {e}")
+            return False
+
+
+@serialized_write
 def set_reset_token(user_id, token):
     """Set password reset token for user."""
-    conn = get_db_connection()
-    try:
-        conn.execute(
-            'UPDATE users SET reset_token = ?, token_expiry = datetime("now", "+1 hour") WHERE id = ?',
-            (token, user_id)
-        )
-        conn.commit()
-        return True
-    except Exception as e:
-        print(f"Set reset token error: {e}")
-        return False
-    finally:
-        conn.close()
+    with db_connection() as conn:
+        try:
+            conn.execute(
+                'UPDATE users SET reset_token = ?, token_expiry = datetime("now", "+1 hour") WHERE id = ?',
+                (token, user_id)
+            )
+            conn.commit()
+            user_cache.invalidate(user_id)
+            return True
+        except Exception as e:
+            conn.rollback()
+            print(f"Set reset token error: {e}")
+            return False
 
 
 def get_user_crops(user_id):
     """Retrieve crops for the logged-in user."""
-    conn = get_db_connection()
-    crops = conn.execute(
-        'SELECT * FROM crops WHERE user_id = ? ORDER BY planting_date DESC', (user_id,)
-    ).fetchall()
-    conn.close()
-    return crops
+    with db_connection() as conn:
+        return conn.execute(
+            'SELECT * FROM crops WHERE user_id = ? ORDER BY planting_date DESC', (user_id,)
+        ).fetchall()
 
 
 def get_soil_testing_data(user_id):
     """Retrieve soil testing data for the user."""
-    conn = get_db_connection()
-    soil_data = conn.execute(
-        'SELECT * FROM soil_testing WHERE user_id = ? ORDER BY test_date DESC', (user_id,)
-    ).fetchall()
-    conn.close()
-    return soil_data
+    with db_connection() as conn:
+        return conn.execute(
+            'SELECT * FROM soil_testing WHERE user_id = ? ORDER BY test_date DESC', (user_id,)
+        ).fetchall()
 
 
+@serialized_write
 def add_user_crop(user_id, acre, crop_type, stage, planting_date):
     """Add a new crop for the user."""
-    conn = get_db_connection()
-    try:
-        conn.execute(
-            'INSERT INTO crops (user_id, acre, crop_type, stage, planting_date) VALUES (?, ?, ?, ?, ?)',
-            (user_id, acre, crop_type, stage, planting_date)
-        )
-        conn.commit()
-        return True
-    except Exception as e:
-        print(f"Add crop error: {e}")
-        return False
-    finally:
-        conn.close()
-
-
+    with db_connection() as conn:
+        try:
+            conn.execute(
+                'INSERT INTO crops (user_id, acre, crop_type, stage, planting_date) VALUES (?, ?, ?, ?, ?)',
+                (user_id, acre, crop_type, stage, planting_date)
+            )
+            conn.commit()
+            return True
+        except Exception as e:
+            conn.rollback()
+            print(f"Add crop error: {e}")
+            return False
+
+
+@serialized_write
 def delete_user_crop(crop_id, user_id):
     """Delete a crop belonging to the user."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute(
-        'DELETE FROM crops WHERE id = ? AND user_id = ?', (crop_id, user_id)
-    )
-    success = cursor.rowcount > 0
-    conn.commit()
-    conn.close()
-    return success
+    with db_connection() as conn:
+        cursor = conn.execute(
+            'DELETE FROM crops WHERE id = ? AND user_id = ?', (crop_id, user_id)
+        )
+        success = cursor.rowcount > 0
+        conn.commit()
+        return success
 
 
+@serialized_write
 def add_soil_test_result(user_id, test_date, n_level, p_level, k_level, ph_level, recommendations):
     """Add a new soil test result for the user."""
-    conn = get_db_connection()
-    try:
-        conn.execute(
-            'INSERT INTO soil_testing (user_id, test_date, nitrogen_level, phosphorus_level, potassium_level, ph_level, recommendations) VALUES (?, ?, ?, ?, ?, ?, ?)',
-            (user_id, test_date, n_level, p_level, k_level, ph_level, recommendations)
-        )
-        conn.commit()
-        return True
-    except Exception as e:
-        print(f"Add soil test error: {e}")
-        return False
-    finally:
-        conn.close()
+    with db_connection() as conn:
+        try:
+            conn.execute(
+                'INSERT INTO soil_testing (user_id, test_date, nitrogen_level, phosphorus_level, potassium_level, ph_level, recommendations) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (user_id, test_date, n_level, p_level, k_level, ph_level, recommendations)
+            )
+            conn.commit()
+            return True
+        except Exception as e:
+            conn.rollback()
+            print(f"Add soil test error: {e}")
+            return False
 
 
 # --- Static Data/Simulation Functions ---
@@ -608,17 +1712,160 @@ def categorize_fertilizer(fertilizer_name):
 
 
 # --- Email Utility Functions ---
-def send_reset_email(email, token):
-    """Send password reset email."""
-    try:
-        msg = MIMEMultipart()
-        msg['Subject'] = 'AgriDash Pro - Password Reset Request'
-        msg['From'] = app.config['MAIL_DEFAULT_SENDER']
-        msg['To'] = email
+class MailDispatcher:
+    """Background mail sender with a bounded queue and one reused SMTP session.
+
+    Requests only enqueue a message. The worker drains up to ``batch_size``
+    queued messages per wake-up over the same connection, reconnects and
+    retries with exponential backoff on transient failures, and closes the
+    session after ``idle_timeout`` seconds without mail. Settings left as None
+    are read from the MAIL_* config keys on every use; the queue size is
+    fixed when the dispatcher is created.
+    """
+
+    def __init__(self, max_queue=None, batch_size=None, max_retries=None, backoff=None, idle_timeout=None):
+        self._jobs = queue.Queue(maxsize=app.config['MAIL_QUEUE_SIZE'] if max_queue is None else max_queue)
+        self._settings = {
+            'MAIL_BATCH_SIZE': batch_size,
+            'MAIL_MAX_RETRIES': max_retries,
+            'MAIL_RETRY_BACKOFF': backoff,
+            'MAIL_SMTP_IDLE_TIMEOUT': idle_timeout,
+        }
+        self._server = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.connections = 0
+
+    def _setting(self, key):
+        value = self._settings[key]
+        return app.config[key] if value is None else value
+
+    @property
+    def batch_size(self):
+        return self._setting('MAIL_BATCH_SIZE')
+
+    @property
+    def max_retries(self):
+        return self._setting('MAIL_MAX_RETRIES')
+
+    @property
+    def backoff(self):
+        return self._setting('MAIL_RETRY_BACKOFF')
+
+    @property
+    def idle_timeout(self):
+        return self._setting('MAIL_SMTP_IDLE_TIMEOUT')
+
+    def enqueue(self, msg):
+        """Queue a message for delivery; returns False if the queue is full."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="mail-dispatcher", daemon=True)
+                self._thread.start()
+        try:
+            self._jobs.put_nowait(msg)
+            return True
+        except queue.Full:
+            return False
+
+    def flush(self, timeout=None):
+        """Block until every queued message was sent or dropped; False on timeout."""
+        with self._jobs.all_tasks_done:
+            return self._jobs.all_tasks_done.wait_for(lambda: self._jobs.unfinished_tasks == 0, timeout)
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "queued": self._jobs.qsize(),
+                "sent": self.sent,
+                "failed": self.failed,
+                "retries": self.retries,
+                "connections": self.connections,
+            }
+
+    def _connect(self):
+        server = smtplib.SMTP(app.config['MAIL_SERVER'], app.config['MAIL_PORT'], timeout=app.config['MAIL_TIMEOUT'])
+        if app.config['MAIL_USE_TLS']:
+            server.starttls()
+        if app.config['MAIL_USERNAME']:
+            server.login(app.config['MAIL_USERNAME'], app.config['MAIL_PASSWORD'])
+        with self._stats_lock:
+            self.connections += 1
+        return server
+
+    def _disconnect(self):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except Exception:
+                self._server.close()
+            self._server = None
+
+    def _send(self, msg):
+        max_retries = self.max_retries
+        for attempt in range(max_retries + 1):
+            try:
+                if self._server is None:
+                    self._server = self._connect()
+                self._server.send_message(msg)
+                with self._stats_lock:
+                    self.sent += 1
+                return
+            except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused) as e:
+                # Permanent for this message; the session itself is still usable.
+                print(f"Email rejected for {msg['To']}: {e}")
+                break
+            except (smtplib.SMTPException, OSError) as e:
+                self._disconnect()
+                if attempt == max_retries:
+                    print(f"Email error: {e}")
+                    break
+                with self._stats_lock:
+                    self.retries += 1
+                time.sleep(self.backoff * (2 ** attempt))
+        with self._stats_lock:
+            self.failed += 1
+
+    def _run(self):
+        while True:
+            try:
+                first = self._jobs.get(timeout=self.idle_timeout)
+            except queue.Empty:
+                self._disconnect()
+                continue
+
+            batch = [first]
+            batch_size = self.batch_size
+            while len(batch) < batch_size:
+                try:
+                    batch.append(self._jobs.get_nowait())
+                except queue.Empty:
+                    break
+
+            for msg in batch:
+                try:
+                    self._send(msg)
+                finally:
+                    self._jobs.task_done()
+
+
+mail_dispatcher = MailDispatcher()
 
-        reset_url = f"http://127.0.0.1:5000/reset-password/{token}"
 
-        html = f"""
+def build_reset_email(email, token):
+    """Build the password reset message."""
+    msg = MIMEMultipart()
+    msg['Subject'] = 'AgriDash Pro - Password Reset Request'
+    msg['From'] = app.config['MAIL_DEFAULT_SENDER']
+    msg['To'] = email
+
+    reset_url = f"http://127.0.0.1:5000/reset-password/{token}"
+
+    html = f"""
         <html>
             <body style="font-family: Arial, sans-serif;">
                 <h2 style="color: #2e7d32;">AgriDash Pro Password Reset</h2>
@@ -635,14 +1882,14 @@ def send_reset_email(email, token):
         </html>
         """
 
-        msg.attach(MIMEText(html, 'html'))
+    msg.attach(MIMEText(html, 'html'))
+    return msg
 
-        server = smtplib.SMTP(app.config['MAIL_SERVER'], app.config['MAIL_PORT'])
-        server.starttls()
-        server.login(app.config['MAIL_USERNAME'], app.config['MAIL_PASSWORD'])
-        server.send_message(msg)
-        server.quit()
-        return True
+
+def send_reset_email(email, token):
+    """Queue the password reset email; returns False if it could not be queued."""
+    try:
+        return mail_dispatcher.enqueue(build_reset_email(email, token))
     except Exception as e:
         print(f"Email error: {e}")
         return False
@@ -667,27 +1914,38 @@ def calculate_total_acreage(crops):
     return sum(float(crop['acre']) for crop in crops) if crops else 0
 
 
+def render_page(name, **context):
+    """Render a page template registered by register_page_templates()."""
+    if not app.config['METRICS_ENABLED']:
+        return render_template(f'{name}.html', **context)
+    started = time.perf_counter()
+    html = render_template(f'{name}.html', **context)
+    TEMPLATE_RENDER_DURATION.observe(time.perf_counter() - started, (name,))
+    return html
+
+
 @app.before_request
-def load_logged_in_user_and_weather():
-    """Load user data and weather into Flask's global context 'g'."""
+def load_logged_in_user():
+    """Load the logged-in user into Flask's global context 'g'."""
     user_id = session.get('user_id')
+    g.user = get_cached_user(user_id) if user_id is not None else None
 
-    if user_id is None:
-        g.user = None
-        g.weather = get_weather_data('Delhi')
-    else:
-        g.user = get_user_by_id(user_id)
-        if g.user and g.user['location']:
-            g.weather = get_weather_data(g.user['location'])
-        else:
-            g.weather = get_weather_data('Delhi')
+
+@app.template_global()
+def get_current_weather():
+    """Weather for the user's location, resolved on first use in a request."""
+    if 'weather' not in g:
+        user = g.get('user')
+        location = user['location'] if user and user['location'] else 'Delhi'
+        g.weather = get_weather_data(location)
+    return g.weather
 
 
 # --- Flask Routes ---
 @app.route('/', methods=['GET'])
 def home():
     """Renders the landing page."""
-    return render_template_string(BASE_TEMPLATE + HOME_CONTENT, title='Home')
+    return render_page('home', title='Home')
 
 
 @app.route('/login', methods=['GET', 'POST'])
@@ -710,7 +1968,7 @@ def login():
         else:
             flash('Login failed. Check your credentials.', 'error')
 
-    return render_template_string(BASE_TEMPLATE + LOGIN_CONTENT, title='Login')
+    return render_page('login', title='Login')
 
 
 @app.route('/register', methods=['GET', 'POST'])
@@ -764,7 +2022,7 @@ def register():
         else:
             flash('Registration failed. Username, Email, or Phone may already be in use.', 'error')
 
-    return render_template_string(BASE_TEMPLATE + REGISTER_CONTENT, title='Register')
+    return render_page('register', title='Register')
 
 
 @app.route('/logout')
@@ -793,7 +2051,7 @@ def forgot_password():
                 if send_reset_email(email, token):
                     flash('A password reset link has been sent to your email.', 'success')
                 else:
-                    flash('Failed to send reset email. Please check server settings.', 'error')
+                    flash('Too many reset emails are waiting to be sent. Please try again shortly.', 'error')
             else:
                 flash('An error occurred while setting the reset token.', 'error')
         else:
@@ -801,7 +2059,7 @@ def forgot_password():
 
         return redirect(url_for('forgot_password'))
 
-    return render_template_string(BASE_TEMPLATE + FORGOT_PASSWORD_CONTENT, title='Forgot Password')
+    return render_page('forgot_password', title='Forgot Password')
 
 
 @app.route('/reset-password/<token>', methods=['GET', 'POST'])
@@ -822,11 +2080,11 @@ def reset_password(token):
 
         if password != confirm_password:
             flash('Passwords do not match.', 'error')
-            return render_template_string(BASE_TEMPLATE + RESET_PASSWORD_CONTENT, title='Reset Password')
+            return render_page('reset_password', title='Reset Password')
 
         if len(password) < 6:
             flash('Password must be at least 6 characters.', 'error')
-            return render_template_string(BASE_TEMPLATE + RESET_PASSWORD_CONTENT, title='Reset Password')
+            return render_page('reset_password', title='Reset Password')
 
         password_hash = generate_password_hash(password)
         if update_password(user['id'], password_hash):
@@ -835,7 +2093,7 @@ def reset_password(token):
         else:
             flash('An error occurred during password update.', 'error')
 
-    return render_template_string(BASE_TEMPLATE + RESET_PASSWORD_CONTENT, title='Reset Password')
+    return render_page('reset_password', title='Reset Password')
 
 
 @app.route('/dashboard', methods=['GET'])
@@ -850,11 +2108,11 @@ def dashboard():
 
     dashboard_rec = get_fertilizer_recommendation(soil_data, 'Wheat')
 
-    return render_template_string(
-        BASE_TEMPLATE + DASHBOARD_CONTENT,
+    return render_page(
+        'dashboard',
         title='Dashboard',
         user=g.user,
-        weather=g.weather,
+        weather=get_current_weather(),
         crops=user_crops,
         total_acreage=total_acreage,
         soil_data=soil_data[0] if soil_data else None,
@@ -868,10 +2126,10 @@ def dashboard():
 @login_required
 def weather():
     """Renders the detailed weather page."""
-    return render_template_string(
-        BASE_TEMPLATE + WEATHER_CONTENT,
+    return render_page(
+        'weather',
         title='Weather Intelligence',
-        weather=g.weather,
+        weather=get_current_weather(),
         forecast=FORECAST_DATA
     )
 
@@ -883,19 +2141,10 @@ def set_location():
     new_location = request.form.get('location_input')
     user_id = g.user['id']
 
-    conn = get_db_connection()
-    try:
-        conn.execute(
-            'UPDATE users SET location = ? WHERE id = ?',
-            (new_location.title(), user_id)
-        )
-        conn.commit()
+    if new_location and update_user_location(user_id, new_location.title()):
         flash(f"Location updated to {new_location.title()}.", 'success')
-    except Exception as e:
+    else:
         flash("Failed to update location.", 'error')
-        print(f"Location update error: {e}")
-    finally:
-        conn.close()
 
     return redirect(request.referrer or url_for('dashboard'))
 
@@ -936,8 +2185,8 @@ def fertilizer():
 
             return redirect(url_for('fertilizer'))
 
-    return render_template_string(
-        BASE_TEMPLATE + FERTILIZER_CONTENT,
+    return render_page(
+        'fertilizer',
         title='Fertilizer & Soil Management',
         crops=user_crops,
         soil_data=soil_data,
@@ -945,7 +2194,7 @@ def fertilizer():
         selected_crop=selected_crop,
         get_soil_status_class=get_soil_status_class,
         current_date=datetime.now().strftime('%Y-%m-%d'),
-        ml_model_available=ml_model_available
+        ml_model_status=ml_model_status
     )
 
 
@@ -953,13 +2202,20 @@ def fertilizer():
 @login_required
 def ml_fertilizer_predictor():
     """Renders the ML-based fertilizer prediction page."""
-    return render_template_string(
-        BASE_TEMPLATE + ML_PREDICTOR_CONTENT,
+    # Start loading now so the model is ready by the time the form is submitted.
+    start_model_warmup()
+    try:
+        crops, regions, months = prediction_choices()
+    except Exception as e:
+        print(f"Error loading prediction choices: {e}")
+        crops, regions, months = crops_ml, regions_ml, months_ml
+    return render_page(
+        'ml_predictor',
         title='AI Fertilizer Predictor',
-        crops=crops_ml,
-        regions=regions_ml,
-        months=months_ml,
-        ml_model_available=ml_model_available
+        crops=crops,
+        regions=regions,
+        months=months,
+        ml_model_status=ml_model_status
     )
 
 
@@ -967,88 +2223,244 @@ def ml_fertilizer_predictor():
 @login_required
 def predict():
     """ML-based fertilizer prediction endpoint."""
-    if not ml_model_available:
-        return jsonify({"error": "ML model is not available. Please ensure model.h5 exists."}), 503
+    if not ensure_ml_model():
+        return model_unavailable_response()
 
     try:
         data = request.get_json()
 
-        n_val = float(data.get("N"))
-        p_val = float(data.get("P"))
-        k_val = float(data.get("K"))
-        temp_val = float(data.get("temperature"))
-        humidity_val = float(data.get("humidity"))
-        ph_val = float(data.get("ph"))
-        moisture_val = float(data.get("moisture"))
-
-        parameter_ranges = {
-            "N": (0, 300),
-            "P": (0, 200),
-            "K": (0, 250),
-            "temperature": (10, 50),
-            "humidity": (0, 100),
-            "ph": (4.0, 9.0),
-            "moisture": (0, 100)
-        }
-
-        for param, value in [
-            ("N", n_val), ("P", p_val), ("K", k_val),
-            ("temperature", temp_val), ("humidity", humidity_val),
-            ("ph", ph_val), ("moisture", moisture_val)
-        ]:
-            min_val, max_val = parameter_ranges[param]
-            if not (min_val <= value <= max_val):
-                return jsonify({
-                    "error": f"Invalid {param} value: {value}. Must be between {min_val} and {max_val}."
-                }), 400
-
-        selected_crop_str = data.get("crop")
-        selected_region_str = data.get("region")
-        selected_month_str = data.get("month")
-
-        crop_encoded = crop_to_int.get(selected_crop_str)
-        region_encoded = region_to_int.get(selected_region_str)
-        month_encoded = month_to_int.get(selected_month_str)
-
-        if crop_encoded is None:
-            return jsonify({"error": f"Invalid crop: '{selected_crop_str}'"}), 400
-        if region_encoded is None:
-            return jsonify({"error": f"Invalid region: '{selected_region_str}'"}), 400
-        if month_encoded is None:
-            return jsonify({"error": f"Invalid month: '{selected_month_str}'"}), 400
-
-        features = [
-            n_val, p_val, k_val, temp_val, humidity_val,
-            ph_val, moisture_val, float(crop_encoded),
-            float(region_encoded), float(month_encoded)
-        ]
+        features, errors, inputs = encode_prediction_inputs([data], with_inputs=True)
+        if errors:
+            return jsonify({"error": errors[0]}), 400
 
-        if len(features) != EXPECTED_MODEL_INPUT_FEATURES:
+        if features.shape[1] != EXPECTED_MODEL_INPUT_FEATURES:
             return jsonify({
-                "error": f"Feature count mismatch. Expected {EXPECTED_MODEL_INPUT_FEATURES} features, got {len(features)}"
+                "error": f"Feature count mismatch. Expected {EXPECTED_MODEL_INPUT_FEATURES} features, got {features.shape[1]}"
             }), 500
 
-        input_data = np.array([features], dtype=np.float32)
-        prediction = model.predict(input_data)
-        predicted_index = int(np.argmax(prediction))
+        top_k, by_category = prediction_options()
+        prediction = run_model(features, inputs)
+        return jsonify(describe_predictions(prediction, top_k, by_category)[0])
+
+    except (KeyError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print(f"Error: {e}")
+        return jsonify({"error": "Internal server error"}), 500
+
 
-        if 0 <= predicted_index < len(fertilizers_ml):
-            predicted_fertilizer = fertilizers_ml[predicted_index]
+def prediction_options():
+    """Read the ranking options from the query string: ?top_k=N&by_category=1."""
+    top_k = request.args.get('top_k', app.config['PREDICT_TOP_K'], type=int)
+    top_k = max(1, min(top_k, app.config['PREDICT_TOP_K_MAX']))
+    by_category = request.args.get('by_category', '').lower() in ('1', 'true', 'yes')
+    return top_k, by_category
+
+
+def read_batch_rows():
+    """Read batch prediction rows from a JSON array or an uploaded CSV file."""
+    upload = request.files.get('file')
+    if upload is not None:
+        text = io.TextIOWrapper(upload.stream, encoding='utf-8-sig')
+        return list(csv.DictReader(text))
+
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get('rows')
+    if not isinstance(data, list):
+        raise ValueError("Expected a JSON array of rows or a CSV file upload under 'file'.")
+    return data
+
+
+@app.route('/predict/batch', methods=['POST'])
+@login_required
+def predict_batch():
+    """ML-based fertilizer prediction for many rows in one forward pass."""
+    if not ensure_ml_model():
+        return model_unavailable_response()
+
+    try:
+        rows = read_batch_rows()
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        return jsonify({"error": str(e)}), 400
+
+    max_rows = app.config['PREDICT_BATCH_MAX_ROWS']
+    if not rows:
+        return jsonify({"error": "No rows to predict."}), 400
+    if len(rows) > max_rows:
+        return jsonify({"error": f"Too many rows: {len(rows)}. The limit is {max_rows} per request."}), 413
+
+    try:
+        top_k, by_category = prediction_options()
+        features, errors, inputs = encode_prediction_inputs(rows, with_inputs=True)
+        valid = np.array([i not in errors for i in range(len(rows))])
+
+        described = []
+        if valid.any():
+            described = describe_predictions(run_model(features[valid], inputs[valid]), top_k, by_category)
+
+        results = []
+        predictions = iter(described)
+        for i in range(len(rows)):
+            if i in errors:
+                results.append({"row": i, "error": errors[i]})
+                continue
+            results.append(dict(next(predictions), row=i))
+
+        return jsonify({
+            "count": len(rows),
+            "succeeded": int(valid.sum()),
+            "failed": len(errors),
+            "results": results
+        })
+
+    except Exception as e:
+        print(f"Batch prediction error: {e}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
+def sweep_axis(spec, pipeline, max_cells):
+    """Parse one /predict/sweep axis into ``(field, values, column, scaled_values)``.
+
+    Categorical axes default to every value the model was trained on; numeric
+    axes take ``start``/``stop``/``step`` (stop included) or a ``values`` list.
+    """
+    if not isinstance(spec, dict) or spec.get('field') not in PREDICTION_INPUT_FIELDS:
+        raise ValueError(f"Each axis needs a 'field', one of {', '.join(PREDICTION_INPUT_FIELDS)}.")
+    field = spec['field']
+
+    if field in PARAMETER_RANGES:
+        min_val, max_val = PARAMETER_RANGES[field]
+        if 'values' in spec:
+            values = spec['values']
+            if (not isinstance(values, list) or not values
+                    or not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values)):
+                raise ValueError(f"Axis {field} values must be a flat list of numbers.")
+            values = np.asarray(values, dtype=np.float64)
         else:
-            predicted_fertilizer = "Custom Fertilizer Blend"
+            start = float(spec.get('start', min_val))
+            stop = float(spec.get('stop', max_val))
+            step = float(spec.get('step', 0))
+            if not all(np.isfinite([start, stop, step])):
+                raise ValueError(f"Axis {field} start, stop and step must be finite numbers.")
+            if not step > 0 or stop < start:
+                raise ValueError(f"Axis {field} needs step > 0 and stop >= start.")
+            # Count the points before allocating so a tiny step cannot build a huge range.
+            count = int(np.floor((stop - start) / step + 1e-9)) + 1
+            if count > max_cells:
+                raise OverflowError(count)
+            values = start + step * np.arange(count)
+        if not ((values >= min_val) & (values <= max_val)).all():
+            raise ValueError(f"Axis {field} values must be between {min_val} and {max_val}.")
+        column, scaled = pipeline.column_values(field, values)
+        return field, [round(float(v), 4) for v in values], column, scaled
+
+    crops, regions, months = prediction_choices()
+    trained = {
+        'crop': [crop for names in crops.values() for crop in names],
+        'region': regions,
+        'month': months
+    }[field]
+    values = spec.get('values', trained)
+    if not isinstance(values, list):
+        raise ValueError(f"Axis {field} values must be a list.")
+    codes = []
+    for value in values:
+        code = pipeline.encode_category(field, value)
+        if code is None:
+            raise ValueError(f"Invalid {field}: '{value}'")
+        codes.append(code)
+    column, scaled = pipeline.column_values(field, codes)
+    return field, list(values), column, scaled
+
+
+@app.route('/predict/sweep', methods=['POST'])
+@login_required
+def predict_sweep():
+    """What-if table: vary one or two predictor fields around a base input in one forward pass.
+
+    Body: ``{"base": {...predictor fields...}, "axes": [{"field": "month"},
+    {"field": "N", "start": 0, "stop": 300, "step": 50}]}``. The answer holds
+    the axis values and, per grid cell, an index into ``legend`` and the
+    probability of that fertilizer.
+    """
+    if not ensure_ml_model():
+        return model_unavailable_response()
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not isinstance(data.get('base'), dict):
+        return jsonify({"error": "Expected a JSON object with a 'base' input and a list of 'axes'."}), 400
+    specs = data.get('axes')
+    if not isinstance(specs, list) or not 1 <= len(specs) <= 2:
+        return jsonify({"error": "Give one or two axes to sweep."}), 400
+
+    max_cells = app.config['PREDICT_SWEEP_MAX_CELLS']
+    try:
+        pipeline = get_preprocessor()
+        axes = [sweep_axis(spec, pipeline, max_cells) for spec in specs]
+        if len(axes) == 2 and axes[0][0] == axes[1][0]:
+            return jsonify({"error": "The two axes must vary different fields."}), 400
+        shape = tuple(len(axis[1]) for axis in axes)
+        cells = int(np.prod(shape))
+        if cells > max_cells:
+            raise OverflowError(cells)
+        if cells == 0:
+            return jsonify({"error": "An axis has no values."}), 400
+
+        # Validate the base with the swept fields filled in, then overwrite their
+        # columns across the grid: axis values vary along their own dimension.
+        base = dict(data['base'])
+        for field, values, _, _ in axes:
+            base[field] = values[0]
+        features, errors = encode_prediction_inputs([base])
+        if errors:
+            return jsonify({"error": errors[0]}), 400
+        grid = np.repeat(features, cells, axis=0)
+        for dim, (_, _, column, scaled) in enumerate(axes):
+            view = [1] * len(shape)
+            view[dim] = shape[dim]
+            grid[:, column] = np.broadcast_to(scaled.reshape(view), shape).ravel()
+
+        # One pass over the whole grid, bypassing the prediction cache so a sweep
+        # does not evict the entries interactive predictions rely on.
+        probabilities = _forward(grid)
+        best = np.argmax(probabilities, axis=1)
+        best_probability = probabilities[np.arange(cells), best]
+        legend_indices, legend_positions = np.unique(best, return_inverse=True)
 
         return jsonify({
-            "fertilizer": predicted_fertilizer,
-            "fertilizer_type": categorize_fertilizer(predicted_fertilizer)
+            "axes": [{"field": field, "values": values} for field, values, _, _ in axes],
+            "cells": cells,
+            "legend": [
+                {"fertilizer": pipeline.label(int(i)), "fertilizer_type": pipeline.label_types[int(i)]}
+                for i in legend_indices
+            ],
+            "fertilizer": legend_positions.reshape(shape).tolist(),
+            "probability": np.round(best_probability.astype(np.float64), 4).reshape(shape).tolist()
         })
 
-    except (KeyError, ValueError) as e:
+    except OverflowError as e:
+        return jsonify({"error": f"Sweep grid too large: {e} cells. The limit is {max_cells} per request."}), 413
+    except (TypeError, ValueError) as e:
         return jsonify({"error": str(e)}), 400
     except Exception as e:
-        print(f"Error: {e}")
+        print(f"Sweep prediction error: {e}")
         return jsonify({"error": "Internal server error"}), 500
 
 
+@app.route('/predict/stats', methods=['GET'])
+@login_required
+def predict_stats():
+    """Reports micro-batching and prediction cache statistics."""
+    return jsonify({
+        "enabled": inference_batching_enabled(),
+        "status": ml_model_status,
+        "backend": model_backend,
+        "batcher": inference_batcher.stats(),
+        "cache": dict(prediction_cache.stats(), enabled=app.config['PREDICTION_CACHE_ENABLED'])
+    })
+
+
 @app.route('/crop-management', methods=['GET', 'POST'])
 @login_required
 def crop_management():
@@ -1092,8 +2504,8 @@ def crop_management():
 
         return redirect(url_for('crop_management'))
 
-    return render_template_string(
-        BASE_TEMPLATE + CROP_MANAGEMENT_CONTENT,
+    return render_page(
+        'crop_management',
         title='Crop Management',
         user=g.user,
         crops=user_crops,
@@ -1121,13 +2533,13 @@ def profile():
 
         if update_user_profile(g.user['id'], email, phone, full_name, farm_name, location, total_land):
             flash('Profile updated successfully!', 'success')
-            g.user = get_user_by_id(g.user['id'])
+            g.user = get_cached_user(g.user['id'])
         else:
             flash('Profile update failed. Email or Phone may already be in use.', 'error')
 
         return redirect(url_for('profile'))
 
-    return render_template_string(BASE_TEMPLATE + PROFILE_CONTENT, title='User Profile', user=g.user)
+    return render_page('profile', title='User Profile', user=g.user)
 
 
 @app.route('/contact', methods=['GET', 'POST'])
@@ -1142,7 +2554,35 @@ def contact():
 
         return redirect(url_for('contact'))
 
-    return render_template_string(BASE_TEMPLATE + CONTACT_CONTENT, title='Contact & Support')
+    return render_page('contact', title='Contact & Support')
+
+
+@app.route('/healthz', methods=['GET'])
+def healthz():
+    """Readiness probe: 200 once the app can serve requests and reach the database."""
+    try:
+        with db_connection() as conn:
+            conn.execute('SELECT 1').fetchone()
+        database = 'ok'
+    except Exception as e:
+        print(f"Health check database error: {e}")
+        database = 'error'
+    status = 200 if database == 'ok' else 503
+    return jsonify({"status": "ok" if status == 200 else "unavailable",
+                    "database": database, "ml_model": ml_model_status}), status
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus scrape endpoint for this process."""
+    if not app.config['METRICS_ENABLED']:
+        return jsonify({"error": "Metrics are disabled"}), 404
+    token = app.config['METRICS_TOKEN']
+    authorized = request.remote_addr in LOOPBACK_ADDRESSES or (
+        token and secrets.compare_digest(request.headers.get('Authorization', ''), f"Bearer {token}"))
+    if not authorized:
+        return jsonify({"error": "Forbidden"}), 403
+    return app.response_class(metrics_registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
 
 
 # --- HTML Templates ---
@@ -1307,7 +2747,7 @@ BASE_TEMPLATE = """
                     <div class="weather-widget nav-link p-1">
                         <form method="POST" action="{{ url_for('set_location') }}" class="d-flex align-items-center me-3" style="margin:0;">
                             <i class="fas fa-map-marker-alt me-1 text-white"></i>
-                            <input type="text" name="location_input" value="{{ g.weather.city }}" 
+                            <input type="text" name="location_input" value="{{ get_current_weather().city }}" 
                                    class="form-control form-control-sm bg-transparent border-0 text-white p-0" 
                                    placeholder="City" style="max-width: 100px;">
                             <button type="submit" class="btn btn-sm text-white p-0 ps-1">
@@ -1315,7 +2755,7 @@ BASE_TEMPLATE = """
                             </button>
                         </form>
                         <span class="ms-2">
-                            <strong>{{ g.weather.temperature }}°C</strong> {{ g.weather.icon }}
+                            <strong>{{ get_current_weather().temperature }}°C</strong> {{ get_current_weather().icon }}
                         </span>
                     </div>
                     <li class="nav-item"><a class="nav-link" href="{{ url_for('logout') }}"><i class="fas fa-sign-out-alt me-1"></i>Logout</a></li>
@@ -1742,7 +3182,7 @@ FERTILIZER_CONTENT = """
     </div>
 </div>
 
-{% if ml_model_available %}
+{% if ml_model_status != 'failed' %}
 <div class="alert alert-info">
     <i class="fas fa-robot me-2"></i>
     <strong>New!</strong> Try our <a href="{{ url_for('ml_fertilizer_predictor') }}" class="alert-link">AI-Powered Fertilizer Predictor</a> 
@@ -1936,11 +3376,16 @@ ML_PREDICTOR_CONTENT = """
     </div>
 </div>
 
-{% if not ml_model_available %}
+{% if ml_model_status == 'failed' %}
 <div class="alert alert-danger">
     <i class="fas fa-exclamation-triangle me-2"></i>
     <strong>ML Model Not Available:</strong> The machine learning model could not be loaded. 
-    Please ensure model.h5 is in the application directory.
+    Please ensure model_weights.npz or model.h5 is in the application directory.
+</div>
+{% elif ml_model_status == 'loading' %}
+<div class="alert alert-info">
+    <i class="fas fa-spinner fa-spin me-2"></i>
+    <strong>Loading ML Model:</strong> The predictor is warming up and will be ready in a moment.
 </div>
 {% endif %}
 
@@ -2049,7 +3494,7 @@ ML_PREDICTOR_CONTENT = """
                     </div>
 
                     <div class="d-grid">
-                        <button type="submit" class="btn btn-success btn-lg" {% if not ml_model_available %}disabled{% endif %}>
+                        <button type="submit" class="btn btn-success btn-lg" {% if ml_model_status == 'failed' %}disabled{% endif %}>
                             <i class="fas fa-magic me-2"></i>Get AI Recommendation
                         </button>
                     </div>
@@ -2059,7 +3504,18 @@ ML_PREDICTOR_CONTENT = """
                     <div class="alert alert-success">
                         <h5><i class="fas fa-check-circle me-2"></i>Recommended Fertilizer</h5>
                         <h3 id="fertilizerName" class="mb-2"></h3>
-                        <p class="mb-0"><strong>Type:</strong> <span id="fertilizerType"></span></p>
+                        <p class="mb-0"><strong>Type:</strong> <span id="fertilizerType"></span>
+                            (<span id="fertilizerProbability"></span> confidence)</p>
+                    </div>
+                    <div class="row">
+                        <div class="col-md-6">
+                            <h6>Alternatives</h6>
+                            <ul id="fertilizerAlternatives" class="list-group mb-3"></ul>
+                        </div>
+                        <div class="col-md-6">
+                            <h6>By fertilizer type</h6>
+                            <ul id="fertilizerCategories" class="list-group mb-3"></ul>
+                        </div>
                     </div>
                 </div>
 
@@ -2073,6 +3529,27 @@ ML_PREDICTOR_CONTENT = """
 </div>
 
 <script>
+function formatProbability(p) {
+    return (p * 100).toFixed(1) + '%';
+}
+
+function fillList(id, items, describe) {
+    const list = document.getElementById(id);
+    list.replaceChildren();
+    for (const item of items) {
+        const [name, probability] = describe(item);
+        const li = document.createElement('li');
+        li.className = 'list-group-item d-flex justify-content-between';
+        const label = document.createElement('span');
+        label.textContent = name;
+        const value = document.createElement('span');
+        value.className = 'text-muted';
+        value.textContent = formatProbability(probability);
+        li.append(label, value);
+        list.appendChild(li);
+    }
+}
+
 document.getElementById('mlPredictionForm').addEventListener('submit', async function(e) {
     e.preventDefault();
 
@@ -2093,7 +3570,7 @@ document.getElementById('mlPredictionForm').addEventListener('submit', async fun
     document.getElementById('predictionError').style.display = 'none';
 
     try {
-        const response = await fetch('/predict', {
+        const response = await fetch('/predict?top_k=5&by_category=1', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
@@ -2106,6 +3583,9 @@ document.getElementById('mlPredictionForm').addEventListener('submit', async fun
         if (response.ok) {
             document.getElementById('fertilizerName').textContent = data.fertilizer;
             document.getElementById('fertilizerType').textContent = data.fertilizer_type;
+            document.getElementById('fertilizerProbability').textContent = formatProbability(data.probability);
+            fillList('fertilizerAlternatives', data.top.slice(1), item => [item.fertilizer, item.probability]);
+            fillList('fertilizerCategories', data.categories, item => [item.category, item.probability]);
             document.getElementById('predictionResult').style.display = 'block';
         } else {
             document.getElementById('errorMessage').textContent = data.error || 'Prediction failed';
@@ -2411,16 +3891,215 @@ CONTACT_CONTENT = """
 </div>
 """
 
+# --- Template Registration ---
+PAGE_TEMPLATES = {
+    'home': HOME_CONTENT,
+    'login': LOGIN_CONTENT,
+    'register': REGISTER_CONTENT,
+    'forgot_password': FORGOT_PASSWORD_CONTENT,
+    'reset_password': RESET_PASSWORD_CONTENT,
+    'dashboard': DASHBOARD_CONTENT,
+    'weather': WEATHER_CONTENT,
+    'fertilizer': FERTILIZER_CONTENT,
+    'ml_predictor': ML_PREDICTOR_CONTENT,
+    'crop_management': CROP_MANAGEMENT_CONTENT,
+    'profile': PROFILE_CONTENT,
+    'contact': CONTACT_CONTENT
+}
+
+
+def register_page_templates():
+    """Register BASE_TEMPLATE as a real parent template and compile every page once.
+
+    Each page extends ``base.html`` and fills its ``content`` block. Jinja keeps
+    the compiled templates in its cache, so requests only render.
+    """
+    sources = {'base.html': BASE_TEMPLATE}
+    for name, content in PAGE_TEMPLATES.items():
+        sources[f'{name}.html'] = '{% extends "base.html" %}{% block content %}' + content + '{% endblock %}'
+    app.jinja_loader = DictLoader(sources)
+    for template_name in sources:
+        app.jinja_env.get_template(template_name)
+
+
+register_page_templates()
+
+# --- Serving ---
+def preload_for_fork():
+    """Load shared state in the parent so forked workers share it copy-on-write.
+
+    The lookup tables and page templates are built at import; this loads the
+    model and its preprocessing pipeline and then freezes the
+    garbage collector so collections in the workers do not write to (and
+    un-share) the parent's objects.
+
+    TensorFlow's thread pools do not survive fork(), so only the NumPy,
+    student and TFLite (ai-edge-litert / tflite-runtime) engines are loaded
+    here. A Keras model is left for each worker to load after the fork.
+    Returns True if the model was preloaded.
+    """
+    global ml_model_status
+
+    if ml_model_status == 'idle' and not load_ml_model(allow_tensorflow=False):
+        print("No fork-safe model engine available; each worker loads the model after the fork.")
+        with _model_load_lock:
+            ml_model_status = 'idle'
+            _model_loaded.clear()
+    gc.collect()
+    gc.freeze()
+    return ml_model_available
+
+
+def run_prefork(host='0.0.0.0', port=5000, workers=None, threads=None, preload=None):
+    """Fork waitress workers that all accept on one listening socket (Unix only)."""
+    from waitress import serve
+
+    workers = workers or app.config['SERVER_WORKERS']
+    threads = threads or app.config['SERVER_THREADS']
+    preload = app.config['SERVER_PRELOAD_MODEL'] if preload is None else preload
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(1024)
+
+    if preload:
+        preload = preload_for_fork()
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            try:
+                if app.config['ML_MODEL_WARMUP']:
+                    start_model_warmup()
+                serve(app, sockets=[sock], threads=threads, _quiet=True)
+            finally:
+                os._exit(0)
+        return pid
+
+    children = {spawn() for _ in range(workers)}
+    print(f"Prefork parent {os.getpid()} started workers {sorted(children)}"
+          f" (model {'preloaded' if preload else 'loaded per worker'})")
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while children:
+        try:
+            pid, _ = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        children.discard(pid)
+        if not stopping:
+            print(f"Worker {pid} exited; starting a replacement.")
+            children.add(spawn())
+    sock.close()
+
+
+def run_server(host='0.0.0.0', port=5000, mode=None, threads=None, workers=None):
+    """Serve the app with the configured WSGI server (blocks until it exits)."""
+    mode = mode or app.config['SERVER_MODE']
+    threads = threads or app.config['SERVER_THREADS']
+    workers = workers or app.config['SERVER_WORKERS']
+
+    if mode == 'prefork':
+        if hasattr(os, 'fork'):
+            run_prefork(host, port, workers, threads)
+            return
+        print("prefork needs os.fork(); falling back to waitress.")
+        mode = 'waitress'
+
+    if mode == 'gunicorn':
+        try:
+            from gunicorn.app.base import BaseApplication
+        except ImportError:
+            print("gunicorn is not installed; falling back to waitress.")
+            mode = 'waitress'
+        else:
+            def post_fork(server, worker):
+                # Without a preload each worker warms its own model (threads do not survive fork).
+                if app.config['ML_MODEL_WARMUP']:
+                    start_model_warmup()
+
+            class AgriDashGunicorn(BaseApplication):
+                def load_config(self):
+                    self.cfg.set('bind', f'{host}:{port}')
+                    self.cfg.set('workers', workers)
+                    self.cfg.set('threads', threads)
+                    self.cfg.set('worker_class', 'gthread')
+                    self.cfg.set('post_fork', post_fork)
+
+                def load(self):
+                    return app
+
+            if app.config['SERVER_PRELOAD_MODEL']:
+                preload_for_fork()
+            AgriDashGunicorn().run()
+            return
+
+    if app.config['ML_MODEL_WARMUP']:
+        start_model_warmup()
+
+    if mode == 'waitress':
+        try:
+            from waitress import serve
+        except ImportError:
+            print("waitress is not installed; falling back to the development server.")
+            mode = 'development'
+        else:
+            serve(app, host=host, port=port, threads=threads)
+            return
+
+    app.run(debug=False, host=host, port=port, threaded=True, use_reloader=False)
+
+
 # --- Main Application Execution ---
 if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="AgriDash Pro server")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--server', choices=['waitress', 'prefork', 'gunicorn', 'development'], default=app.config['SERVER_MODE'])
+    parser.add_argument('--threads', type=int, default=app.config['SERVER_THREADS'])
+    parser.add_argument('--workers', type=int, default=app.config['SERVER_WORKERS'])
+    parser.add_argument('--no-preload', action='store_true', help="load the model in each worker instead of the parent")
+    parser.add_argument('--backend', choices=['auto', 'numpy', 'tflite', 'keras', 'student'], default=app.config['ML_MODEL_BACKEND'])
+    parser.add_argument('--database', default=app.config['DATABASE'])
+    args = parser.parse_args()
+    app.config['DATABASE'] = args.database
+    app.config['SERVER_PRELOAD_MODEL'] = not args.no_preload
+    app.config['ML_MODEL_BACKEND'] = args.backend
+
     init_db()
     print("\n" + "=" * 60)
     print("🚜 AgriDash Pro - Integrated Farm Management System")
     print("=" * 60)
     print("\n📊 System Status:")
     print(f"   ✓ Database initialized")
-    print(f"   {'✓' if ml_model_available else '✗'} ML Model loaded: {ml_model_available}")
-    print("\n🌐 Server starting at: http://127.0.0.1:5000/")
+    print(f"   ✓ ML Model: {'warming up in background' if app.config['ML_MODEL_WARMUP'] else 'loads on first prediction'}")
+    print(f"   ✓ Server: {args.server} ({args.workers} worker(s) x {args.threads} thread(s))")
+    print(f"\n🌐 Server starting at: http://127.0.0.1:{args.port}/")
     print("=" * 60 + "\n")
 
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    if args.server == 'development':
+        if app.config['ML_MODEL_WARMUP']:
+            start_model_warmup()
+        app.run(debug=True, host=args.host, port=args.port)
+    else:
+        run_server(args.host, args.port, args.server, args.threads, args.workers)
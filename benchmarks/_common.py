@@ -0,0 +1,170 @@
+"""Shared helpers for the benchmark scripts.
+
+Benchmarks run offline against ``agri_dash.app`` with a throwaway SQLite file,
+so they never touch the real ``agridash.db``.
+"""
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "3")
+
+import agri_dash  # noqa: E402
+import numpy as np  # noqa: E402
+from werkzeug.security import generate_password_hash  # noqa: E402
+
+BENCH_PASSWORD = "bench-password"
+
+
+def use_temp_database():
+    """Point the app at a fresh temporary database and create the schema."""
+    fd, path = tempfile.mkstemp(prefix="agridash-bench-", suffix=".db")
+    os.close(fd)
+    agri_dash.app.config["DATABASE"] = path
+    agri_dash.app.config["TESTING"] = True
+    agri_dash.init_db()
+    return path
+
+
+def seed_farmer(index, n_crops=5, n_soil_tests=3, password_hash=None):
+    """Create one farmer with a few crops and soil tests; return the user id."""
+    username = f"farmer{index}"
+    agri_dash.create_user(
+        username, password_hash or generate_password_hash(BENCH_PASSWORD),
+        f"{username}@example.com", f"+9190000{index:05d}",
+        f"Farmer {index}", f"Farm {index}", "Pune", 25.0
+    )
+    user_id = agri_dash.get_user_by_username(username)["id"]
+    for c in range(n_crops):
+        agri_dash.add_user_crop(user_id, 1.5 + c, "Wheat", "Vegetative", f"2025-0{1 + c % 9}-15")
+    for t in range(n_soil_tests):
+        agri_dash.add_soil_test_result(user_id, f"2025-0{1 + t % 9}-01", "Low", "Medium", "High", 6.4, "")
+    return user_id
+
+
+def seed_farmers_bulk(n_farmers, crops_per_farmer=10, soil_tests_per_farmer=3, seed=42):
+    """Insert ``n_farmers`` farmers (ids 1..n) with crops and soil tests in one transaction.
+
+    Every farmer can log in as ``farmer<id>`` with ``BENCH_PASSWORD``; the
+    password is hashed once and shared so seeding stays fast at scale.
+    """
+    rng = random.Random(seed)
+    password_hash = generate_password_hash(BENCH_PASSWORD)
+    crops = list(agri_dash.crop_to_int)
+    stages = ["Sowing", "Vegetative", "Flowering", "Harvest"]
+    levels = ["Low", "Medium", "High"]
+    conn = sqlite3.connect(agri_dash.app.config["DATABASE"])
+    conn.execute("BEGIN")
+    conn.executemany(
+        "INSERT INTO users (id, username, password_hash, email, phone, full_name, farm_name, location, total_land) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        ((i, f"farmer{i}", password_hash, f"farmer{i}@example.com", f"+91{i:010d}", f"Farmer {i}",
+          f"Farm {i}", rng.choice(agri_dash.regions_ml), round(rng.uniform(2, 50), 1))
+         for i in range(1, n_farmers + 1))
+    )
+    conn.executemany(
+        "INSERT INTO crops (user_id, acre, crop_type, stage, planting_date) VALUES (?, ?, ?, ?, ?)",
+        ((i, round(rng.uniform(0.5, 10), 1), rng.choice(crops), rng.choice(stages),
+          f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}")
+         for i in range(1, n_farmers + 1) for _ in range(crops_per_farmer))
+    )
+    conn.executemany(
+        "INSERT INTO soil_testing (user_id, test_date, nitrogen_level, phosphorus_level, potassium_level, "
+        "ph_level, recommendations) VALUES (?, ?, ?, ?, ?, ?, '')",
+        ((i, f"2025-{rng.randint(1, 12):02d}-01", rng.choice(levels), rng.choice(levels), rng.choice(levels),
+          round(rng.uniform(5.0, 8.0), 1))
+         for i in range(1, n_farmers + 1) for _ in range(soil_tests_per_farmer))
+    )
+    conn.commit()
+    conn.close()
+    return list(range(1, n_farmers + 1))
+
+
+def random_prediction_payload(rng):
+    """A valid /predict body drawn from the accepted input ranges and the model's vocabulary."""
+    crops, regions, months = agri_dash.prediction_choices()
+    payload = {field: round(rng.uniform(low, high), 1) for field, (low, high) in agri_dash.PARAMETER_RANGES.items()}
+    payload.update(crop=rng.choice([crop for names in crops.values() for crop in names]),
+                   region=rng.choice(regions), month=rng.choice(months))
+    return payload
+
+
+def write_training_csv(path, n_rows, seed=0, chunk_rows=200_000, label_noise=0.1):
+    """Write a synthetic training CSV in the layout train_and_save.py reads.
+
+    Values come from the committed model's vocabulary with some stray casing
+    and whitespace, numbers are uniform on [0, 100) like the real data, and
+    the fertilizer is a fixed function of the N and K levels and the month
+    (plus ``label_noise`` random labels) so there is something to learn.
+    """
+    import pandas as pd
+
+    with open(agri_dash.MODEL_METADATA_PATH) as f:
+        metadata = json.load(f)
+    categories = metadata["categories"]
+    labels = np.array(metadata["labels"], dtype=object)
+    rng = np.random.default_rng(seed)
+    numeric = ['N', 'P', 'K', 'Temperature(C)', 'Humidity(%)', 'Soil_pH', 'Moisture(%)']
+
+    def spelled(values, codes):
+        # Roughly 1 in 10 values title-cased or padded, as in hand-merged regional files.
+        variants = np.array([[v, v.title(), f" {v} "] for v in values], dtype=object)
+        return variants[codes, rng.choice(3, size=len(codes), p=[0.9, 0.05, 0.05])]
+
+    written = 0
+    while written < n_rows:
+        n = min(chunk_rows, n_rows - written)
+        columns = {col: np.round(rng.uniform(0, 100, n), 1) for col in numeric}
+        codes = {col: rng.integers(len(categories[col]), size=n) for col in ("Crop", "Region", "Month")}
+        label = (columns["N"] // 20 * 12 + columns["K"] * 12 // 100 + codes["Month"] // 6).astype(np.int64)
+        label %= len(labels)
+        noisy = rng.random(n) < label_noise
+        label[noisy] = rng.integers(len(labels), size=int(noisy.sum()))
+        for col, col_codes in codes.items():
+            columns[col] = spelled(categories[col], col_codes)
+        columns["Fertilizer"] = labels[label]
+        pd.DataFrame(columns).to_csv(path, mode="w" if written == 0 else "a", header=written == 0, index=False)
+        written += n
+    return path
+
+
+def logged_in_client(user_id):
+    client = agri_dash.app.test_client()
+    with client.session_transaction() as sess:
+        sess["user_id"] = user_id
+    return client
+
+
+def requests_per_second(client, path, n_requests):
+    started = time.perf_counter()
+    for _ in range(n_requests):
+        response = client.get(path)
+        assert response.status_code == 200, (path, response.status_code)
+    return n_requests / (time.perf_counter() - started)
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of numbers (0 for an empty list)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def latency_summary(samples):
+    """p50/p95/p99/max in milliseconds for a list of durations in seconds."""
+    return {
+        "count": len(samples),
+        "p50_ms": 1000 * percentile(samples, 50),
+        "p95_ms": 1000 * percentile(samples, 95),
+        "p99_ms": 1000 * percentile(samples, 99),
+        "max_ms": 1000 * max(samples, default=0.0),
+    }
@@ -0,0 +1,96 @@
+"""Distilled student versus the full network: agreement, accuracy, latency and memory.
+
+Each engine runs in a fresh interpreter (see bench_quantized.py) so its memory
+cost can be read from the process RSS: the Keras teacher (model.h5), its fused
+NumPy export (model_weights.npz) and TFLite export (model.tflite), and the
+distilled student (student_weights.npz) on the NumPy engine, all read from
+``--model-dir``.
+
+With ``--data`` (the CSV the models were trained on) the validation split is
+rebuilt with training_data.py and accuracy is measured against its labels;
+otherwise seeded synthetic rows are used and only agreement is meaningful.
+Agreement is the share of rows where an engine's top-1 fertilizer matches
+the Keras teacher's.
+
+Usage:
+    python benchmarks/bench_distilled.py [--model-dir output_models] [--data synthetic_crop_data_all_crops.csv]
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+from bench_quantized import ROOT, run_engine
+from tflite_model import synthetic_calibration_rows
+
+ENGINES = [
+    ("keras teacher", "model.h5"),
+    ("numpy teacher", "model_weights.npz"),
+    ("tflite teacher", "model.tflite"),
+    ("numpy student", "student_weights.npz"),
+]
+
+
+def validation_rows(data_path, n_features):
+    if data_path and os.path.exists(data_path):
+        from training_data import prepare_training_split
+
+        split, _ = prepare_training_split(data_path)
+        return np.asarray(split.x_val), np.asarray(split.y_val), f"{len(split.y_val)} validation rows of {data_path}"
+    x_val = synthetic_calibration_rows(n_features, n_samples=4000, seed=1)
+    return x_val, None, f"{len(x_val)} seeded synthetic rows (no labels)"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model-dir", default=ROOT, help="directory with the teacher and student artifacts")
+    parser.add_argument("--data", help="training CSV the models were trained on")
+    args = parser.parse_args(argv)
+
+    from numpy_model import NumpyFertilizerModel
+
+    student_path = os.path.join(args.model_dir, "student_weights.npz")
+    if not os.path.exists(student_path):
+        print(f"{student_path} not found; run distill.py (or train_and_save.py) first.")
+        return 1
+    x_val, y_val, description = validation_rows(args.data, NumpyFertilizerModel.load(student_path).input_dim)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        x_path = os.path.join(workdir, "x_val.npy")
+        np.save(x_path, x_val.astype(np.float32))
+        for name, filename in ENGINES:
+            path = os.path.join(args.model_dir, filename)
+            if not os.path.exists(path):
+                print(f"{name}: {filename} not found, skipped")
+                continue
+            stats, probs = run_engine(name, path, x_path, workdir)
+            if stats is None:
+                print(f"{name}: could not run (missing runtime?)")
+                continue
+            stats["size_kb"] = os.path.getsize(path) / 1024
+            results[name] = (stats, probs)
+
+    if "keras teacher" not in results:
+        print("TensorFlow and model.h5 are needed for the teacher reference.")
+        return 1
+    teacher_top1 = results["keras teacher"][1].argmax(axis=1)
+
+    print(f"Validation set: {description}")
+    header = (f"{'engine':<16}{'agreement':>11}{'accuracy':>10}{'size KB':>10}{'load MB':>10}{'RSS MB':>9}"
+              f"{'1 row ms':>10}{'1024 rows ms':>14}")
+    print(header)
+    print("-" * len(header))
+    for name, (stats, probs) in results.items():
+        top1 = probs.argmax(axis=1)
+        accuracy = f"{np.mean(top1 == y_val):.4f}" if y_val is not None else "-"
+        print(f"{name:<16}{np.mean(top1 == teacher_top1):>11.2%}{accuracy:>10}{stats['size_kb']:>10.0f}"
+              f"{stats['load_mb']:>10.1f}{stats['rss_mb']:>9.0f}{stats['single_row_ms']:>10.3f}"
+              f"{stats['batch_1024_ms']:>14.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
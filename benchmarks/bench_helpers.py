@@ -0,0 +1,205 @@
+"""Micro-benchmarks for the hot helper functions, with JSON output and a regression gate.
+
+Each helper is timed in isolation against a fixed, seeded database:
+get_fertilizer_recommendation, categorize_fertilizer, get_user_by_identifier
+(username, email and phone), calculate_total_acreage, rendering of every page
+template in PAGE_TEMPLATES, encode_prediction_inputs (validation, encoding and
+scaling) and model.predict, each for one row versus batches.
+
+Every benchmark reports the median and best time per call over ``--repeat``
+runs. Write the results with ``--output`` and compare a later run against them
+with ``--baseline``; the script exits with status 1 when any benchmark's median
+is more than ``--threshold`` slower than the baseline.
+
+Usage:
+    python benchmarks/bench_helpers.py --output baseline.json
+    python benchmarks/bench_helpers.py --baseline baseline.json [--threshold 0.25]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import timeit
+
+import numpy as np
+
+from _common import agri_dash, seed_farmers_bulk, use_temp_database
+
+PREDICT_BATCH_SIZES = (1, 64, 1024)
+
+
+def measure(func, repeat, calls_per_run=1):
+    """Time ``func`` and return per-call statistics in microseconds."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    runs = [total / number / calls_per_run * 1e6 for total in timer.repeat(repeat=repeat, number=number)]
+    return {"median_us": statistics.median(runs), "min_us": min(runs), "number": number * calls_per_run}
+
+
+def page_contexts(user, crops, soil_data):
+    """Template context for each page, mirroring what its route passes."""
+    weather = agri_dash.get_current_weather()
+    return {
+        'home': dict(title='Home'),
+        'login': dict(title='Login'),
+        'register': dict(title='Register'),
+        'forgot_password': dict(title='Forgot Password'),
+        'reset_password': dict(title='Reset Password'),
+        'dashboard': dict(
+            title='Dashboard', user=user, weather=weather, crops=crops,
+            total_acreage=agri_dash.calculate_total_acreage(crops), soil_data=soil_data[0],
+            last_test_date=soil_data[0]['test_date'],
+            dashboard_rec=agri_dash.get_fertilizer_recommendation(soil_data, 'Wheat'),
+            get_soil_status_class=agri_dash.get_soil_status_class),
+        'weather': dict(title='Weather Intelligence', weather=weather, forecast=agri_dash.FORECAST_DATA),
+        'fertilizer': dict(
+            title='Fertilizer & Soil Management', crops=crops, soil_data=soil_data,
+            recommendation=agri_dash.get_fertilizer_recommendation(soil_data, crops[0]['crop_type']),
+            selected_crop=crops[0]['crop_type'], get_soil_status_class=agri_dash.get_soil_status_class,
+            current_date='2025-06-01', ml_model_status=agri_dash.ml_model_status),
+        'ml_predictor': dict(
+            title='AI Fertilizer Predictor', crops=agri_dash.crops_ml, regions=agri_dash.regions_ml,
+            months=agri_dash.months_ml, ml_model_status=agri_dash.ml_model_status),
+        'crop_management': dict(
+            title='Crop Management', user=user, crops=crops,
+            total_acreage=agri_dash.calculate_total_acreage(crops)),
+        'profile': dict(title='User Profile', user=user),
+        'contact': dict(title='Contact & Support'),
+    }
+
+
+def run_benchmarks(repeat, name_filter=None):
+    user = agri_dash.get_user_by_id(1)
+    crops = agri_dash.get_user_crops(1)
+    soil_data = agri_dash.get_soil_testing_data(1)
+    many_crops = crops * 20
+    fertilizers = list(agri_dash.fertilizers_ml)
+
+    benchmarks = {
+        "get_fertilizer_recommendation": (lambda: agri_dash.get_fertilizer_recommendation(soil_data, "Wheat"), 1),
+        "get_fertilizer_recommendation/no_soil_test": (lambda: agri_dash.get_fertilizer_recommendation([], "Wheat"), 1),
+        "categorize_fertilizer": (lambda: [agri_dash.categorize_fertilizer(name) for name in fertilizers],
+                                  len(fertilizers)),
+        "get_user_by_identifier/username": (lambda: agri_dash.get_user_by_identifier(user["username"]), 1),
+        "get_user_by_identifier/email": (lambda: agri_dash.get_user_by_identifier(user["email"]), 1),
+        "get_user_by_identifier/phone": (lambda: agri_dash.get_user_by_identifier(user["phone"]), 1),
+        f"calculate_total_acreage/{len(crops)}_crops": (lambda: agri_dash.calculate_total_acreage(crops), 1),
+        f"calculate_total_acreage/{len(many_crops)}_crops": (lambda: agri_dash.calculate_total_acreage(many_crops), 1),
+    }
+
+    rng = np.random.default_rng(0)
+    raw_rows = [
+        {"N": float(rng.uniform(0, 300)), "P": float(rng.uniform(0, 200)), "K": float(rng.uniform(0, 250)),
+         "temperature": 25, "humidity": 60, "ph": 6.5, "moisture": 35,
+         "crop": "Rice", "region": "Haryana", "month": "June"}
+        for _ in range(max(PREDICT_BATCH_SIZES))
+    ]
+    if agri_dash.ensure_ml_model(timeout=agri_dash.app.config['ML_MODEL_LOAD_TIMEOUT']):
+        features, _ = agri_dash.encode_prediction_inputs(raw_rows)
+        for size in PREDICT_BATCH_SIZES:
+            rows = raw_rows[:size]
+            benchmarks[f"encode_prediction_inputs/{size}_rows"] = (
+                lambda rows=rows: agri_dash.encode_prediction_inputs(rows), 1)
+        for size in PREDICT_BATCH_SIZES:
+            batch = features[:size]
+            benchmarks[f"model.predict/{size}_rows"] = (lambda batch=batch: agri_dash.model.predict(batch, verbose=0), 1)
+    else:
+        print("ML model could not be loaded; skipping the prediction benchmarks.")
+
+    results = {}
+    for name, (func, calls) in benchmarks.items():
+        if name_filter and name_filter not in name:
+            continue
+        results[name] = measure(func, repeat, calls)
+
+    with agri_dash.app.test_request_context("/"):
+        agri_dash.session["user_id"] = user["id"]
+        agri_dash.g.user = user
+        contexts = page_contexts(user, crops, soil_data)
+        for page in agri_dash.PAGE_TEMPLATES:
+            name = f"render/{page}"
+            if name_filter and name_filter not in name:
+                continue
+            context = contexts.get(page, {"title": page})
+            results[name] = measure(lambda: agri_dash.render_page(page, **context), repeat)
+
+    for size in PREDICT_BATCH_SIZES:
+        for prefix in ("encode_prediction_inputs", "model.predict"):
+            result = results.get(f"{prefix}/{size}_rows")
+            if result:
+                result["per_row_us"] = result["median_us"] / size
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return the benchmarks whose median regressed by more than ``threshold``."""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        change = result["median_us"] / previous["median_us"] - 1.0
+        result["baseline_median_us"] = previous["median_us"]
+        result["change"] = change
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--filter", help="only run benchmarks whose name contains this text")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON file from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed median slow-down versus the baseline (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    agri_dash.app.config["METRICS_ENABLED"] = False
+    db_path = use_temp_database()
+    try:
+        seed_farmers_bulk(2000, crops_per_farmer=10, soil_tests_per_farmer=3, seed=42)
+        results = run_benchmarks(args.repeat, args.filter)
+    finally:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f)["results"], args.threshold)
+
+    print(f"{'benchmark':<46}{'median us':>12}{'best us':>12}{'vs baseline':>14}")
+    print("-" * 84)
+    for name, result in results.items():
+        change = f"{result['change']:+.1%}" if "change" in result else ""
+        flag = "  REGRESSION" if name in regressions else ""
+        print(f"{name:<46}{result['median_us']:>12.2f}{result['min_us']:>12.2f}{change:>14}{flag}")
+
+    if args.output:
+        report = {
+            "meta": {
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "machine": platform.machine(),
+                "backend": agri_dash.model_backend,
+                "repeat": args.repeat,
+            },
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {args.output}")
+
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) slower than the baseline by more than {args.threshold:.0%}.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
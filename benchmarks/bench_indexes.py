@@ -0,0 +1,108 @@
+"""Per-user query latency with and without the migration-1 indexes.
+
+Seeds a large synthetic database (100k users and 1M crop rows by default),
+times get_user_crops, get_soil_testing_data and get_user_by_reset_token for
+random users with the indexes dropped, then applies the migrations and times
+the same lookups again.
+
+Usage:
+    python benchmarks/bench_indexes.py [--users 100000] [--crops 1000000] [--queries 200]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import time
+
+from _common import agri_dash, latency_summary, use_temp_database
+
+LOOKUPS = [
+    ("get_user_crops", lambda user_id: agri_dash.get_user_crops(user_id)),
+    ("get_soil_testing_data", lambda user_id: agri_dash.get_soil_testing_data(user_id)),
+    ("get_user_by_reset_token", lambda user_id: agri_dash.get_user_by_reset_token(f"token-{user_id}")),
+]
+
+
+def seed(db_path, n_users, n_crops, n_soil_tests, rng):
+    conn = sqlite3.connect(db_path)
+    conn.execute("BEGIN")
+    conn.executemany(
+        "INSERT INTO users (id, username, password_hash, email, phone, full_name, farm_name, "
+        "reset_token, token_expiry) VALUES (?, ?, 'x', ?, ?, 'Farmer', 'Farm', ?, datetime('now', '+1 hour'))",
+        ((i, f"u{i}", f"u{i}@example.com", f"+91{i:010d}", f"token-{i}" if i % 10 == 0 else None)
+         for i in range(1, n_users + 1))
+    )
+    conn.executemany(
+        "INSERT INTO crops (user_id, acre, crop_type, stage, planting_date) VALUES (?, 2.0, 'Wheat', 'Vegetative', ?)",
+        ((rng.randint(1, n_users), f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}")
+         for _ in range(n_crops))
+    )
+    conn.executemany(
+        "INSERT INTO soil_testing (user_id, test_date, nitrogen_level, phosphorus_level, potassium_level, ph_level) "
+        "VALUES (?, ?, 'Low', 'Medium', 'High', 6.5)",
+        ((rng.randint(1, n_users), f"2025-{rng.randint(1, 12):02d}-01") for _ in range(n_soil_tests))
+    )
+    conn.commit()
+    conn.close()
+
+
+def time_lookups(user_ids):
+    results = {}
+    for name, lookup in LOOKUPS:
+        samples = []
+        for user_id in user_ids:
+            started = time.perf_counter()
+            lookup(user_id)
+            samples.append(time.perf_counter() - started)
+        results[name] = latency_summary(samples)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--crops", type=int, default=1_000_000)
+    parser.add_argument("--soil-tests", type=int, default=300_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(42)
+    db_path = use_temp_database()
+    try:
+        started = time.perf_counter()
+        seed(db_path, args.users, args.crops, args.soil_tests, rng)
+        print(f"Seeded {args.users} users, {args.crops} crops, {args.soil_tests} soil tests "
+              f"in {time.perf_counter() - started:.1f}s")
+
+        conn = sqlite3.connect(db_path)
+        for _, _, statements in agri_dash.MIGRATIONS:
+            for statement in statements:
+                index_name = statement.split("EXISTS ")[1].split(" ")[0]
+                conn.execute(f"DROP INDEX IF EXISTS {index_name}")
+        conn.execute("PRAGMA user_version = 0")
+        conn.commit()
+
+        user_ids = [rng.randint(1, args.users) // 10 * 10 or 10 for _ in range(args.queries)]
+        before = time_lookups(user_ids)
+
+        started = time.perf_counter()
+        agri_dash.run_migrations(conn)
+        print(f"Migrations applied in {time.perf_counter() - started:.1f}s "
+              f"(schema version {agri_dash.get_schema_version(conn)})")
+        conn.close()
+        after = time_lookups(user_ids)
+    finally:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+
+    print(f"\n{'lookup':<26}{'p50 before':>12}{'p50 after':>12}{'p99 before':>12}{'p99 after':>12}  (ms)")
+    for name, _ in LOOKUPS:
+        print(f"{name:<26}{before[name]['p50_ms']:>12.3f}{after[name]['p50_ms']:>12.3f}"
+              f"{before[name]['p99_ms']:>12.3f}{after[name]['p99_ms']:>12.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+"""Load test for the full request path with concurrent simulated farmers.
+
+Seeds a synthetic database at the requested scale, then runs ``--concurrency``
+farmer threads against ``agri_dash.app`` for ``--seconds``. Each farmer
+repeatedly picks a random seeded account and plays one session:
+
+    POST /login, then --visits times:
+        GET /dashboard -> POST /crop-management (add a crop) -> POST /predict x --predicts
+
+Logins are deliberately a small share of the traffic: checking the password
+hash costs far more than any other request and would otherwise dominate.
+
+Every request goes through the real WSGI app (routing, sessions, database
+pool, templates, model) in-process, so the run is fully offline. The report
+shows throughput and p50/p95/p99 latency per route; ``--json`` writes the
+same numbers to a file so runs can be diffed between releases.
+
+Usage:
+    python benchmarks/bench_load.py [--farmers 1000] [--concurrency 16] [--seconds 20] [--json load.json]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+from _common import (BENCH_PASSWORD, agri_dash, latency_summary, random_prediction_payload,
+                     seed_farmers_bulk, use_temp_database)
+
+ROUTES = ["login", "dashboard", "add_crop", "predict"]
+CROP_NAMES = list(agri_dash.crop_to_int)
+
+
+def farmer_session(client, user_id, rng, n_visits, n_predicts, record):
+    """Play one farmer session; ``record(route, seconds, ok)`` is called per request."""
+
+    def timed(route, call, expected):
+        started = time.perf_counter()
+        status = call().status_code
+        record(route, time.perf_counter() - started, status == expected)
+
+    timed("login", lambda: client.post("/login", data={"identifier": f"farmer{user_id}",
+                                                        "password": BENCH_PASSWORD}), 302)
+    for _ in range(n_visits):
+        timed("dashboard", lambda: client.get("/dashboard"), 200)
+        crop_form = {"add_crop": "1", "acre": f"{rng.uniform(0.5, 10):.1f}",
+                     "crop_type": rng.choice(CROP_NAMES), "stage": "Sowing", "planting_date": "2025-06-01"}
+        timed("add_crop", lambda: client.post("/crop-management", data=crop_form), 302)
+        for _ in range(n_predicts):
+            payload = random_prediction_payload(rng)
+            timed("predict", lambda: client.post("/predict", json=payload), 200)
+
+
+def run_load(user_ids, concurrency, seconds, n_visits, n_predicts, seed):
+    samples = {route: [] for route in ROUTES}
+    errors = {route: 0 for route in ROUTES}
+    lock = threading.Lock()
+    stop = time.perf_counter() + seconds
+
+    def farmer(k):
+        rng = random.Random(seed + k)
+        local = {route: [] for route in ROUTES}
+        local_errors = {route: 0 for route in ROUTES}
+
+        def record(route, elapsed, ok):
+            local[route].append(elapsed)
+            local_errors[route] += not ok
+
+        while time.perf_counter() < stop:
+            client = agri_dash.app.test_client()
+            farmer_session(client, rng.choice(user_ids), rng, n_visits, n_predicts, record)
+
+        with lock:
+            for route in ROUTES:
+                samples[route].extend(local[route])
+                errors[route] += local_errors[route]
+
+    threads = [threading.Thread(target=farmer, args=(k,)) for k in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    routes = {}
+    for route in ROUTES:
+        summary = latency_summary(samples[route])
+        summary["errors"] = errors[route]
+        summary["rps"] = len(samples[route]) / elapsed
+        routes[route] = summary
+    total = sum(len(s) for s in samples.values())
+    return {"elapsed_s": elapsed, "requests": total, "rps": total / elapsed, "routes": routes}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--farmers", type=int, default=1000, help="seeded farmer accounts")
+    parser.add_argument("--crops-per-farmer", type=int, default=10)
+    parser.add_argument("--soil-tests-per-farmer", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=16, help="simulated farmers running at once")
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--visits", type=int, default=5, help="dashboard/crop/predict rounds per login")
+    parser.add_argument("--predicts", type=int, default=2, help="/predict calls per round")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    agri_dash.app.config["DB_POOL_SIZE"] = max(agri_dash.app.config["DB_POOL_SIZE"], args.concurrency)
+    db_path = use_temp_database()
+    try:
+        started = time.perf_counter()
+        user_ids = seed_farmers_bulk(args.farmers, args.crops_per_farmer, args.soil_tests_per_farmer, args.seed)
+        print(f"Seeded {args.farmers} farmers ({args.crops_per_farmer} crops, "
+              f"{args.soil_tests_per_farmer} soil tests each) in {time.perf_counter() - started:.1f}s")
+        if not agri_dash.ensure_ml_model(timeout=agri_dash.app.config['ML_MODEL_LOAD_TIMEOUT']):
+            print("ML model could not be loaded; /predict requests will fail.")
+
+        result = run_load(user_ids, args.concurrency, args.seconds, args.visits, args.predicts, args.seed)
+        result["config"] = dict(vars(args), backend=agri_dash.model_backend,
+                                sqlite_profile=agri_dash.app.config["SQLITE_PROFILE"])
+    finally:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+
+    print(f"\n{args.concurrency} farmers for {result['elapsed_s']:.1f}s: "
+          f"{result['requests']} requests, {result['rps']:.0f} req/s (backend={agri_dash.model_backend})")
+    header = f"{'route':<11}{'count':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}{'errors':>8}"
+    print(header)
+    print("-" * len(header))
+    for route, summary in result["routes"].items():
+        print(f"{route:<11}{summary['count']:>8}{summary['rps']:>9.1f}{summary['p50_ms']:>9.1f}"
+              f"{summary['p95_ms']:>9.1f}{summary['p99_ms']:>9.1f}{summary['max_ms']:>9.1f}{summary['errors']:>8}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"\nWrote {args.json}")
+    return 1 if any(summary["errors"] for summary in result["routes"].values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
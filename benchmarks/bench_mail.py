@@ -0,0 +1,118 @@
+"""Password-reset mail benchmark against a local SMTP sink.
+
+Starts an aiosmtpd sink on localhost that adds a configurable delay to the
+SMTP handshake and to every message, then posts /forgot-password for a batch
+of farmers. It compares the old inline send (one SMTP session per request,
+on the request thread) with the queued MailDispatcher, reporting request
+latency, time until every mail was delivered, and SMTP sessions opened.
+
+Requires aiosmtpd (pip install aiosmtpd).
+
+Usage:
+    python benchmarks/bench_mail.py [--farmers 30] [--delay-ms 50]
+"""
+import argparse
+import asyncio
+import os
+import smtplib
+import socket
+import sys
+import time
+
+from aiosmtpd.controller import Controller
+
+from _common import agri_dash, latency_summary, seed_farmer, use_temp_database
+
+
+class SlowSink:
+    """SMTP handler that records messages and simulates a slow mail server."""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.messages = 0
+        self.sessions = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.sessions += 1
+        await asyncio.sleep(self.delay)
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        await asyncio.sleep(self.delay)
+        self.messages += 1
+        return "250 Message accepted for delivery"
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def inline_send_reset_email(email, token):
+    """The previous behaviour: connect, send and quit on the request thread."""
+    try:
+        server = smtplib.SMTP(agri_dash.app.config["MAIL_SERVER"], agri_dash.app.config["MAIL_PORT"])
+        server.send_message(agri_dash.build_reset_email(email, token))
+        server.quit()
+        return True
+    except Exception as e:
+        print(f"Email error: {e}")
+        return False
+
+
+def run(mode, emails, sink):
+    client = agri_dash.app.test_client()
+    sink.messages = sink.sessions = 0
+    samples = []
+    started = time.perf_counter()
+    for email in emails:
+        t0 = time.perf_counter()
+        response = client.post("/forgot-password", data={"email": email})
+        samples.append(time.perf_counter() - t0)
+        assert response.status_code == 302
+    if mode == "queued":
+        agri_dash.mail_dispatcher.flush(timeout=60)
+    while sink.messages < len(emails) and time.perf_counter() - started < 60:
+        time.sleep(0.005)
+    return latency_summary(samples), time.perf_counter() - started, sink.messages, sink.sessions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--farmers", type=int, default=30)
+    parser.add_argument("--delay-ms", type=float, default=50.0)
+    args = parser.parse_args(argv)
+
+    sink = SlowSink(args.delay_ms / 1000.0)
+    port = free_port()
+    controller = Controller(sink, hostname="127.0.0.1", port=port)
+    controller.start()
+    agri_dash.app.config.update(MAIL_SERVER="127.0.0.1", MAIL_PORT=port, MAIL_USE_TLS=False, MAIL_USERNAME="")
+
+    db_path = use_temp_database()
+    try:
+        emails = [f"farmer{i}@example.com" for i in range(args.farmers)]
+        for i in range(args.farmers):
+            seed_farmer(i, n_crops=0, n_soil_tests=0, password_hash="unused")
+
+        queued_send = agri_dash.send_reset_email
+        agri_dash.send_reset_email = inline_send_reset_email
+        inline = run("inline", emails, sink)
+        agri_dash.send_reset_email = queued_send
+        queued = run("queued", emails, sink)
+    finally:
+        controller.stop()
+        os.remove(db_path)
+
+    print(f"{args.farmers} reset requests, SMTP sink delay {args.delay_ms:.0f} ms per handshake and message\n")
+    print(f"{'mode':<8}{'req p50 ms':>12}{'req p99 ms':>12}{'all delivered s':>17}{'delivered':>11}{'sessions':>10}")
+    for mode, (latency, total, delivered, sessions) in (("inline", inline), ("queued", queued)):
+        print(f"{mode:<8}{latency['p50_ms']:>12.1f}{latency['p99_ms']:>12.1f}{total:>17.2f}{delivered:>11}{sessions:>10}")
+    print(f"\nDispatcher stats: {agri_dash.mail_dispatcher.stats()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""Overhead of the /metrics instrumentation.
+
+Measures requests per second for a template page (/dashboard), a JSON route
+with a database query (/healthz) and a prediction (/predict) with
+METRICS_ENABLED off and on, alternating which setting runs first in each
+round so drift affects both equally. It also reports the cost of one /metrics
+scrape once every series has been populated.
+
+Usage:
+    python benchmarks/bench_metrics_overhead.py [--requests 2000] [--rounds 5]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+from _common import agri_dash, logged_in_client, requests_per_second, seed_farmer, use_temp_database
+
+PREDICT_PAYLOAD = {"N": 40, "P": 30, "K": 20, "temperature": 25, "humidity": 60, "ph": 6.5,
+                   "moisture": 35, "crop": "Rice", "region": "Haryana", "month": "June"}
+
+
+def predict_per_second(client, n_requests):
+    started = time.perf_counter()
+    for _ in range(n_requests):
+        response = client.post("/predict", json=PREDICT_PAYLOAD)
+        assert response.status_code == 200, response.status_code
+    return n_requests / (time.perf_counter() - started)
+
+
+def measure(client, route, n_requests):
+    if route == "/predict":
+        return predict_per_second(client, n_requests)
+    return requests_per_second(client, route, n_requests)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000, help="requests per route per round")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    db_path = use_temp_database()
+    try:
+        client = logged_in_client(seed_farmer(0))
+        agri_dash.ensure_ml_model(timeout=agri_dash.app.config['ML_MODEL_LOAD_TIMEOUT'])
+        routes = ["/dashboard", "/healthz", "/predict"]
+        results = {route: {False: [], True: []} for route in routes}
+
+        for route in routes:
+            measure(client, route, 200)  # warm caches and code paths
+            for i in range(args.rounds):
+                for enabled in ((False, True) if i % 2 == 0 else (True, False)):
+                    agri_dash.app.config["METRICS_ENABLED"] = enabled
+                    results[route][enabled].append(measure(client, route, args.requests))
+
+        agri_dash.app.config["METRICS_ENABLED"] = True
+        started = time.perf_counter()
+        for _ in range(100):
+            body = client.get("/metrics").get_data()
+        scrape_ms = (time.perf_counter() - started) * 10
+
+        print(f"Metrics overhead (median of {args.rounds} rounds x {args.requests} requests, "
+              f"backend={agri_dash.model_backend}):")
+        for route in routes:
+            off = statistics.median(results[route][False])
+            on = statistics.median(results[route][True])
+            per_request_us = (1e6 / on) - (1e6 / off)
+            print(f"   {route:<11} off {off:8.0f} req/s   on {on:8.0f} req/s   "
+                  f"{(off - on) / off:+7.1%} slower   ({per_request_us:+.1f} us/request)")
+        print(f"   /metrics scrape: {scrape_ms:.2f} ms ({len(body) / 1024:.1f} KB)")
+    finally:
+        os.remove(db_path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""Per-worker memory with and without preloading the model before fork.
+
+Starts ``agri_dash.py --server prefork`` twice: once with the model loaded in
+the parent, once with every worker loading its own copy. After every worker
+reports a ready model, it reads /proc/<pid>/smaps_rollup for each worker.
+RSS counts shared pages in full. PSS splits them between the processes that
+share them, so PSS is the per-worker cost that actually limits how many
+workers fit. Linux only.
+
+Only the fork-safe engines (NumPy, student, TFLite) can be preloaded; see
+agri_dash.preload_for_fork. A Keras model is always loaded per worker, so
+there is no preload mode to compare for it.
+
+Usage:
+    python benchmarks/bench_prefork_memory.py [--workers 4] [--backend numpy]
+"""
+import argparse
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def smaps_rollup(pid):
+    """Return memory counters in MB from /proc/<pid>/smaps_rollup."""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 3 and parts[2] == "kB":
+                values[parts[0].rstrip(":")] = int(parts[1]) / 1024.0
+    return values
+
+
+def child_pids(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(p) for p in f.read().split()]
+
+
+def wait_until_ready(port, n_workers, timeout=120):
+    """Poll /healthz until enough distinct hits report a ready model."""
+    deadline = time.monotonic() + timeout
+    ready_hits = 0
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/healthz", timeout=2) as response:
+                if json.load(response).get("ml_model") == "ready":
+                    ready_hits += 1
+                    if ready_hits >= 4 * n_workers:
+                        return True
+        except OSError:
+            pass
+        time.sleep(0.05)
+    return False
+
+
+def measure(preload, workers, backend):
+    port = free_port()
+    with tempfile.TemporaryDirectory() as tmp:
+        cmd = [sys.executable, os.path.join(ROOT, "agri_dash.py"), "--server", "prefork",
+               "--workers", str(workers), "--port", str(port), "--host", "127.0.0.1", "--backend", backend,
+               "--database", os.path.join(tmp, "agridash.db")]
+        if not preload:
+            cmd.append("--no-preload")
+        env = dict(os.environ, TF_CPP_MIN_LOG_LEVEL="3")
+        proc = subprocess.Popen(cmd, cwd=tmp, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            if not wait_until_ready(port, workers):
+                raise RuntimeError("server did not become ready")
+            time.sleep(2)  # let lazily-loading workers finish
+            parent = smaps_rollup(proc.pid)
+            children = [smaps_rollup(pid) for pid in child_pids(proc.pid)]
+        finally:
+            proc.send_signal(signal.SIGTERM)
+            proc.wait(timeout=30)
+    return parent, children
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--backend", choices=["auto", "numpy", "student", "tflite"], default="auto")
+    args = parser.parse_args(argv)
+
+    print(f"{args.workers} prefork workers, model backend '{args.backend}' (MB)\n")
+    print(f"{'mode':<12}{'worker':>8}{'RSS':>10}{'PSS':>10}{'shared':>10}{'private':>10}")
+    totals = {}
+    for preload in (False, True):
+        mode = "preload" if preload else "per-worker"
+        parent, children = measure(preload, args.workers, args.backend)
+        for i, mem in enumerate(children):
+            shared = mem.get("Shared_Clean", 0) + mem.get("Shared_Dirty", 0)
+            private = mem.get("Private_Clean", 0) + mem.get("Private_Dirty", 0)
+            print(f"{mode:<12}{i:>8}{mem['Rss']:>10.1f}{mem['Pss']:>10.1f}{shared:>10.1f}{private:>10.1f}")
+        totals[mode] = parent["Pss"] + sum(mem["Pss"] for mem in children)
+        print(f"{mode:<12}{'total':>8}{'':>10}{totals[mode]:>10.1f}   (parent + workers PSS)")
+    saved = totals["per-worker"] - totals["preload"]
+    print(f"\nPreloading saves {saved:.1f} MB in total ({saved / args.workers:.1f} MB per worker).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
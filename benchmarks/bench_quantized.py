@@ -0,0 +1,175 @@
+"""Quantized TFLite model versus the float model: accuracy, latency and memory.
+
+Each engine runs in a fresh interpreter so its memory cost can be read from
+the process RSS: Keras on model.h5 (float32), the fused NumPy export (float32),
+the committed model.tflite and, when TensorFlow is installed, an int8 TFLite
+export made on the fly.
+
+The validation split is the one train_and_save.py uses (test_size=0.2,
+random_state=42) when the training CSV and scikit-learn are available. Without
+them a fixed seeded set of scaled rows is used and accuracy is measured as
+top-1 agreement with the Keras float model. The mean absolute probability
+difference from Keras is shown as well: the shipped network's class
+probabilities are close together, so a small quantization error can already
+flip the top-1 class.
+
+Usage:
+    python benchmarks/bench_quantized.py [--data synthetic_crop_data_all_crops.csv]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from tflite_model import (DEFAULT_METADATA_PATH, DEFAULT_TFLITE_PATH, convert_keras_model,  # noqa: E402
+                          load_metadata, synthetic_calibration_rows)
+
+ENGINE_SNIPPET = """
+import json, sys, time
+import numpy as np
+
+def rss_kb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+
+x = np.load({x_path!r})
+before = rss_kb()
+{load}
+after_load = rss_kb()
+probs = model.predict(x, verbose=0)
+np.save({out_path!r}, probs)
+
+row = x[:1]
+for _ in range(50):
+    model.predict(row, verbose=0)
+samples = []
+for _ in range(300):
+    t = time.perf_counter()
+    model.predict(row, verbose=0)
+    samples.append(time.perf_counter() - t)
+batch = x[:1024]
+model.predict(batch, verbose=0)
+t = time.perf_counter()
+for _ in range(20):
+    model.predict(batch, verbose=0)
+batch_s = (time.perf_counter() - t) / 20
+print(json.dumps({{"load_mb": (after_load - before) / 1024, "rss_mb": rss_kb() / 1024,
+                  "single_row_ms": 1000 * sorted(samples)[len(samples) // 2],
+                  "batch_1024_ms": 1000 * batch_s}}))
+"""
+
+LOADERS = {
+    "keras": "import tensorflow as tf\nmodel = tf.keras.models.load_model({path!r})",
+    "numpy": "from numpy_model import NumpyFertilizerModel\nmodel = NumpyFertilizerModel.load({path!r})",
+    "tflite": "from tflite_model import TFLiteFertilizerModel\nmodel = TFLiteFertilizerModel.load({path!r})",
+}
+
+
+def validation_split(data_path):
+    """Return (x_val, y_val or None, description)."""
+    if data_path and os.path.exists(data_path):
+        try:
+            import pandas as pd
+            import pickle
+            from sklearn.model_selection import train_test_split
+        except ImportError:
+            print("pandas/scikit-learn not installed; using the synthetic validation set.")
+        else:
+            with open(os.path.join(ROOT, "encoders.pkl"), "rb") as f:
+                encoders = pickle.load(f)
+            with open(os.path.join(ROOT, "scaler.pkl"), "rb") as f:
+                scaler = pickle.load(f)
+            df = pd.read_csv(data_path)
+            for col in ['Crop', 'Region', 'Month', 'Fertilizer']:
+                df[col] = df[col].astype(str).str.strip().str.lower()
+            for col, encoder in encoders["label_encoders"].items():
+                df[col] = encoder.transform(df[col])
+            y = encoders["fertilizer_encoder"].transform(df["Fertilizer"])
+            x = scaler.transform(df.drop("Fertilizer", axis=1)).astype(np.float32)
+            _, x_val, _, y_val = train_test_split(x, y, test_size=0.2, random_state=42)
+            return x_val, y_val, f"{len(x_val)} rows of {os.path.basename(data_path)}"
+    n_features = len(load_metadata(DEFAULT_METADATA_PATH)["features"])
+    x_val = synthetic_calibration_rows(n_features, n_samples=4000, seed=1)
+    return x_val, None, f"{len(x_val)} seeded synthetic rows (labels = Keras float predictions)"
+
+
+def run_engine(name, path, x_path, workdir):
+    out_path = os.path.join(workdir, f"{name.replace(' ', '_')}.npy")
+    loader = LOADERS[name.split()[0]]
+    code = ENGINE_SNIPPET.format(x_path=x_path, out_path=out_path, load=loader.format(path=path))
+    env = dict(os.environ, TF_CPP_MIN_LOG_LEVEL="3")
+    completed = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True)
+    if completed.returncode != 0:
+        return None, None
+    return json.loads(completed.stdout.strip().splitlines()[-1]), np.load(out_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", default=os.path.join(ROOT, "synthetic_crop_data_all_crops.csv"),
+                        help="training CSV used to rebuild the validation split")
+    args = parser.parse_args(argv)
+
+    x_val, y_val, description = validation_split(args.data)
+    quantization = load_metadata(DEFAULT_METADATA_PATH)["quantization"]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        x_path = os.path.join(workdir, "x_val.npy")
+        np.save(x_path, x_val)
+
+        engines = [
+            ("keras float32", os.path.join(ROOT, "model.h5")),
+            ("numpy float32", os.path.join(ROOT, "model_weights.npz")),
+            (f"tflite {quantization}", DEFAULT_TFLITE_PATH),
+        ]
+        try:
+            import tensorflow as tf
+            keras_model = tf.keras.models.load_model(os.path.join(ROOT, "model.h5"))
+            other = "int8" if quantization != "int8" else "float16"
+            other_path = os.path.join(workdir, f"model_{other}.tflite")
+            calibration = synthetic_calibration_rows(x_val.shape[1])
+            with open(other_path, "wb") as f:
+                f.write(convert_keras_model(keras_model, other, calibration))
+            engines.append((f"tflite {other}", other_path))
+        except ImportError:
+            pass
+
+        results = {}
+        for name, path in engines:
+            stats, probs = run_engine(name, path, x_path, workdir)
+            if stats is None:
+                print(f"{name}: could not run (missing runtime?)")
+                continue
+            stats["size_kb"] = os.path.getsize(path) / 1024
+            results[name] = (stats, probs)
+
+    if "keras float32" not in results:
+        print("TensorFlow is needed for the float reference model.")
+        return 1
+    reference = results["keras float32"][1]
+    if y_val is None:
+        y_val = reference.argmax(axis=1)
+
+    print(f"Validation set: {description}")
+    header = f"{'engine':<16}{'accuracy':>10}{'mean |dp|':>11}{'size KB':>10}{'load MB':>10}{'RSS MB':>9}{'1 row ms':>10}{'1024 rows ms':>14}"
+    print(header)
+    print("-" * len(header))
+    for name, (stats, probs) in results.items():
+        accuracy = float(np.mean(probs.argmax(axis=1) == y_val))
+        drift = float(np.mean(np.abs(probs - reference)))
+        print(f"{name:<16}{accuracy:>10.4f}{drift:>11.1e}{stats['size_kb']:>10.0f}{stats['load_mb']:>10.1f}{stats['rss_mb']:>9.0f}"
+              f"{stats['single_row_ms']:>10.3f}{stats['batch_1024_ms']:>14.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""SQLite concurrency stress test: tail latency under mixed read/write load.
+
+Reader threads load /dashboard while writer threads add crops and soil tests
+through the real routes. Each storage scenario gets a fresh database file so
+the journal mode is set from scratch. The table shows read/write tail latency
+and how many requests failed (e.g. 'database is locked').
+
+Usage:
+    python benchmarks/bench_sqlite_concurrency.py [--readers 12] [--writers 4] [--seconds 5]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+from _common import agri_dash, latency_summary, logged_in_client, seed_farmer, use_temp_database
+
+SCENARIOS = [
+    ("rollback", False),
+    ("wal", False),
+    ("wal", True),
+]
+
+
+def run_scenario(profile, write_queue, n_readers, n_writers, seconds, n_farmers=20):
+    agri_dash.app.config["SQLITE_PROFILE"] = profile
+    agri_dash.app.config["DB_WRITE_QUEUE"] = write_queue
+    agri_dash.app.config["DB_POOL_SIZE"] = n_readers + n_writers
+    db_path = use_temp_database()
+    user_ids = [seed_farmer(i, n_crops=20, n_soil_tests=5) for i in range(n_farmers)]
+
+    reads, writes = [], []
+    failures = {"read": 0, "write": 0}
+    stop = time.perf_counter() + seconds
+    lock = threading.Lock()
+
+    def reader(k):
+        client = logged_in_client(user_ids[k % n_farmers])
+        local, failed = [], 0
+        while time.perf_counter() < stop:
+            started = time.perf_counter()
+            status = client.get("/dashboard").status_code
+            local.append(time.perf_counter() - started)
+            failed += status != 200
+        with lock:
+            reads.extend(local)
+            failures["read"] += failed
+
+    def writer(k):
+        client = logged_in_client(user_ids[k % n_farmers])
+        local, failed, i = [], 0, 0
+        while time.perf_counter() < stop:
+            i += 1
+            if i % 2:
+                form = {"add_crop": "1", "acre": "2.5", "crop_type": "Rice",
+                        "stage": "Sowing", "planting_date": "2025-06-01"}
+                path = "/crop-management"
+            else:
+                form = {"soil_test_submit": "1", "test_date": "2025-06-01", "n_level": "Low",
+                        "p_level": "Medium", "k_level": "High", "ph_level": "6.5", "recommendations": ""}
+                path = "/fertilizer"
+            started = time.perf_counter()
+            response = client.post(path, data=form)
+            local.append(time.perf_counter() - started)
+            with client.session_transaction() as sess:
+                flashes = sess.pop("_flashes", [])
+            failed += response.status_code != 302 or any(cat == "error" for cat, _ in flashes)
+        with lock:
+            writes.extend(local)
+            failures["write"] += failed
+
+    threads = [threading.Thread(target=reader, args=(k,)) for k in range(n_readers)]
+    threads += [threading.Thread(target=writer, args=(k,)) for k in range(n_writers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+    return latency_summary(reads), latency_summary(writes), failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--readers", type=int, default=12)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args(argv)
+
+    header = f"{'profile':<10}{'write queue':<13}{'op':<7}{'count':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}{'failed':>8}"
+    print(header)
+    print("-" * len(header))
+    for profile, write_queue in SCENARIOS:
+        read, write, failures = run_scenario(profile, write_queue, args.readers, args.writers, args.seconds)
+        for op, summary in (("read", read), ("write", write)):
+            print(f"{profile:<10}{'on' if write_queue else 'off':<13}{op:<7}{summary['count']:>7}"
+                  f"{summary['p50_ms']:>9.1f}{summary['p95_ms']:>9.1f}{summary['p99_ms']:>9.1f}"
+                  f"{summary['max_ms']:>9.1f}{failures[op]:>8}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
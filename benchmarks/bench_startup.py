@@ -0,0 +1,87 @@
+"""Startup-time benchmark for agri_dash.
+
+Every measurement runs in a fresh interpreter so nothing is already imported.
+It compares time-to-first-response for a non-ML route (/login) with the lazy
+model load against the old eager path, which imported TensorFlow and loaded
+model.h5 before the first request could be served.
+
+Usage:
+    python benchmarks/bench_startup.py [--repeat 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LAZY_SNIPPET = """
+import json, time
+t0 = time.perf_counter()
+import agri_dash
+t1 = time.perf_counter()
+agri_dash.app.config['TESTING'] = True
+status = agri_dash.app.test_client().get('/login').status_code
+t2 = time.perf_counter()
+ready = agri_dash.ensure_ml_model(timeout=agri_dash.app.config['ML_MODEL_LOAD_TIMEOUT'])
+t3 = time.perf_counter()
+print(json.dumps({"import": t1 - t0, "first_response": t2 - t0, "model_ready": t3 - t0,
+                  "status": status, "backend": agri_dash.model_backend, "ready": ready}))
+"""
+
+# What the module used to pay at import time before the first request.
+EAGER_TF_SNIPPET = """
+import json, os, time
+t0 = time.perf_counter()
+import tensorflow as tf
+t1 = time.perf_counter()
+tf.keras.models.load_model(os.path.join({root!r}, "model.h5"))
+t2 = time.perf_counter()
+print(json.dumps({{"tf_import": t1 - t0, "keras_load": t2 - t1}}))
+"""
+
+
+def run_snippet(code):
+    env = dict(os.environ, TF_CPP_MIN_LOG_LEVEL="3")
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, env=env,
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def median_of(samples, key):
+    return statistics.median(sample[key] for sample in samples)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    lazy = [run_snippet(LAZY_SNIPPET) for _ in range(args.repeat)]
+    print(f"Lazy startup (median of {args.repeat}, backend={lazy[0]['backend']}):")
+    print(f"   import agri_dash:          {median_of(lazy, 'import') * 1000:8.1f} ms")
+    print(f"   first /login response:     {median_of(lazy, 'first_response') * 1000:8.1f} ms")
+    print(f"   model ready:               {median_of(lazy, 'model_ready') * 1000:8.1f} ms")
+
+    try:
+        eager = [run_snippet(EAGER_TF_SNIPPET.format(root=ROOT)) for _ in range(args.repeat)]
+    except subprocess.CalledProcessError:
+        print("\nTensorFlow is not installed; skipping the eager-load comparison.")
+        return 0
+
+    tf_cost = median_of(eager, "tf_import") + median_of(eager, "keras_load")
+    old_first_response = median_of(lazy, "first_response") + tf_cost
+    print("Eager startup (previous behaviour):")
+    print(f"   import tensorflow:         {median_of(eager, 'tf_import') * 1000:8.1f} ms")
+    print(f"   load model.h5:             {median_of(eager, 'keras_load') * 1000:8.1f} ms")
+    print(f"   first /login response:     {old_first_response * 1000:8.1f} ms")
+    print(f"\nSpeed-up to first response: {old_first_response / median_of(lazy, 'first_response'):.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
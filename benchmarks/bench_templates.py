@@ -0,0 +1,56 @@
+"""Template rendering benchmark: render_template_string vs precompiled pages.
+
+Drives /dashboard and /fertilizer through the Flask test client twice: once
+with the old per-request ``render_template_string(BASE_TEMPLATE + X_CONTENT)``
+path and once with the registered, precompiled templates.
+
+Usage:
+    python benchmarks/bench_templates.py [--requests 500]
+"""
+import argparse
+import os
+import sys
+
+from flask import render_template_string
+
+from _common import agri_dash, logged_in_client, requests_per_second, seed_farmer, use_temp_database
+
+ROUTES = ["/dashboard", "/fertilizer"]
+
+
+def legacy_render_page(name, **context):
+    """The pre-registration behaviour: rebuild and compile the source every call."""
+    return render_template_string(agri_dash.BASE_TEMPLATE + agri_dash.PAGE_TEMPLATES[name], **context)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    db_path = use_temp_database()
+    try:
+        client = logged_in_client(seed_farmer(0))
+        compiled_render_page = agri_dash.render_page
+
+        results = {}
+        for mode, renderer in [("render_template_string", legacy_render_page),
+                               ("precompiled", compiled_render_page)]:
+            agri_dash.render_page = renderer
+            for path in ROUTES:
+                requests_per_second(client, path, 20)  # warm-up
+                results[(mode, path)] = requests_per_second(client, path, args.requests)
+        agri_dash.render_page = compiled_render_page
+    finally:
+        os.remove(db_path)
+
+    print(f"{'route':<14}{'before (req/s)':>16}{'after (req/s)':>16}{'speed-up':>10}")
+    for path in ROUTES:
+        before = results[("render_template_string", path)]
+        after = results[("precompiled", path)]
+        print(f"{path:<14}{before:>16.1f}{after:>16.1f}{after / before:>9.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""Peak memory and time of loading the training CSV: in-memory, chunked streaming and the columnar cache.
+
+Writes a synthetic training CSV of ``--rows`` rows (or uses ``--data``), then
+loads it in a fresh interpreter per path and reads the peak RSS:
+
+* ``in-memory``: what train_and_save.py did before: one ``pd.read_csv``,
+  ``astype(str).str.strip().str.lower()``, LabelEncoder and StandardScaler
+  ``fit_transform`` on the full frame, and a one-hot ``to_categorical`` target;
+* ``streaming``: ``training_data.load_training_data`` (float32/category chunks,
+  incremental encoders and scaler, integer labels);
+* ``cache cold`` / ``cache warm``: ``training_data.prepare_training_split``
+  with a cache directory, first building the ``.npy`` entry and then mapping
+  it (the warm time includes hashing the CSV to find the entry).
+
+"Above imports" subtracts each process's RSS after its imports, so the
+TensorFlow import the in-memory path needs for ``to_categorical`` is not
+counted against it.
+
+Usage:
+    python benchmarks/bench_training_data.py [--rows 2000000] [--chunk-rows 250000]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from _common import ROOT, write_training_csv
+
+SNIPPET_HEADER = """
+import json, resource, time
+
+def rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+
+{imports}
+baseline = rss_mb()
+started = time.perf_counter()
+{body}
+print(json.dumps({{"seconds": time.perf_counter() - started, "baseline_mb": baseline,
+                  "peak_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, "rows": rows}}))
+"""
+
+PATHS = {
+    "in-memory": (
+        "import pandas as pd\n"
+        "from sklearn.preprocessing import LabelEncoder, StandardScaler\n"
+        "from tensorflow.keras.utils import to_categorical",
+        "df = pd.read_csv({path!r})\n"
+        "for col in ['Crop', 'Region', 'Month', 'Fertilizer']:\n"
+        "    df[col] = df[col].astype(str).str.strip().str.lower()\n"
+        "for col in ['Crop', 'Region', 'Month']:\n"
+        "    df[col] = LabelEncoder().fit_transform(df[col])\n"
+        "df['Fertilizer'] = LabelEncoder().fit_transform(df['Fertilizer'])\n"
+        "X = df.drop('Fertilizer', axis=1)\n"
+        "y = df['Fertilizer']\n"
+        "X_scaled = StandardScaler().fit_transform(X)\n"
+        "y_encoded = to_categorical(y)\n"
+        "rows = len(X_scaled)",
+    ),
+    "streaming": (
+        "from training_data import load_training_data",
+        "data = load_training_data({path!r}, chunk_rows={chunk_rows})\n"
+        "rows = len(data.labels)",
+    ),
+}
+CACHE_PATH = (
+    "from training_data import prepare_training_split",
+    "split, hit = prepare_training_split({path!r}, {cache_dir!r}, chunk_rows={chunk_rows})\n"
+    "assert hit == {expect_hit}\n"
+    "split.x_train.sum(axis=0), split.x_val.sum(axis=0)  # touch every mapped page\n"
+    "rows = len(split.y_train) + len(split.y_val)",
+)
+PATHS["cache cold"] = (CACHE_PATH[0], CACHE_PATH[1].replace("{expect_hit}", "False"))
+PATHS["cache warm"] = (CACHE_PATH[0], CACHE_PATH[1].replace("{expect_hit}", "True"))
+
+
+def run_path(name, path, chunk_rows, cache_dir):
+    imports, body = PATHS[name]
+    code = SNIPPET_HEADER.format(imports=imports, body=body.format(path=path, chunk_rows=chunk_rows,
+                                                                   cache_dir=cache_dir))
+    env = dict(os.environ, TF_CPP_MIN_LOG_LEVEL="3")
+    completed = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True)
+    if completed.returncode != 0:
+        print(f"{name}: failed\n{completed.stderr.strip().splitlines()[-1] if completed.stderr else ''}")
+        return None
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", help="existing training CSV (default: generate one)")
+    parser.add_argument("--rows", type=int, default=2_000_000, help="rows of the generated CSV")
+    parser.add_argument("--chunk-rows", type=int, default=250_000)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        path = args.data
+        if not path:
+            path = os.path.join(workdir, "training.csv")
+            started = time.perf_counter()
+            write_training_csv(path, args.rows)
+            print(f"Generated {args.rows} rows in {time.perf_counter() - started:.1f}s")
+        print(f"CSV: {os.path.getsize(path) / 2**20:.0f} MB")
+
+        header = f"{'path':<12}{'rows':>10}{'seconds':>10}{'peak MB':>10}{'above imports MB':>18}"
+        print(header)
+        print("-" * len(header))
+        for name in PATHS:
+            result = run_path(name, path, args.chunk_rows, os.path.join(workdir, "cache"))
+            if result is None:
+                continue
+            print(f"{name:<12}{result['rows']:>10}{result['seconds']:>10.1f}{result['peak_mb']:>10.0f}"
+                  f"{result['peak_mb'] - result['baseline_mb']:>18.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""Epoch time and samples/s of model.fit: in-memory NumPy arrays versus the tf.data pipeline.
+
+Generates a synthetic training CSV (or uses ``--data``), prepares it through
+the columnar cache like train_and_save.py, then trains the production
+network for ``--epochs`` epochs per input mode on the same hardware:
+
+* ``numpy``: ``model.fit(X_train, y_train, batch_size=32)``, the previous path;
+* ``tf.data/<batch>``: ``training_data.make_dataset`` over the memory-mapped
+  cache with a bounded shuffle buffer, parallel block reads and prefetch,
+  for each of ``--batch-sizes``.
+
+The first epoch includes graph tracing, so the reported epoch time is the
+median of the later epochs. Validation accuracy after the last epoch is shown
+to make sure larger batches still learn.
+
+Usage:
+    python benchmarks/bench_training_input.py [--rows 400000] [--epochs 3] [--batch-sizes 256 1024]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from _common import write_training_csv
+
+from fertilizer_network import EpochTimer, build_model  # noqa: E402
+from training_data import make_dataset, prepare_training_split  # noqa: E402
+
+
+def train(split, mode, batch_size, epochs, shuffle_buffer, parallelism):
+    import tensorflow as tf
+
+    tf.keras.utils.set_random_seed(0)
+    n_classes = len(split.fertilizer_encoder.classes_)
+    model = build_model(split.x_train.shape[1], n_classes)
+    timer = EpochTimer(len(split.y_train))
+    if mode == "numpy":
+        model.fit(split.x_train, split.y_train, validation_data=(split.x_val, split.y_val), epochs=epochs,
+                  batch_size=batch_size, callbacks=[timer], verbose=0)
+    else:
+        train_data = make_dataset(split.x_train, split.y_train, batch_size, shuffle_buffer=shuffle_buffer,
+                                  parallelism=parallelism, seed=0)
+        val_data = make_dataset(split.x_val, split.y_val, batch_size, parallelism=parallelism)
+        model.fit(train_data, validation_data=val_data, epochs=epochs, callbacks=[timer], verbose=0)
+    steady = timer.epoch_seconds[1:] or timer.epoch_seconds
+    epoch_s = statistics.median(steady)
+    val_accuracy = float(np.mean(model.predict(split.x_val, batch_size=4096, verbose=0).argmax(axis=1)
+                                 == split.y_val))
+    return {"first_epoch_s": timer.epoch_seconds[0], "epoch_s": epoch_s,
+            "samples_per_s": len(split.y_train) / epoch_s, "val_accuracy": val_accuracy}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", help="existing training CSV (default: generate one)")
+    parser.add_argument("--rows", type=int, default=400_000, help="rows of the generated CSV")
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[256, 1024])
+    parser.add_argument("--shuffle-buffer", type=int, default=65_536)
+    parser.add_argument("--parallelism", type=int, help="tf.data threads (default AUTOTUNE)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        path = args.data
+        if not path:
+            path = os.path.join(workdir, "training.csv")
+            write_training_csv(path, args.rows)
+        started = time.perf_counter()
+        split, _ = prepare_training_split(path, os.path.join(workdir, "cache"))
+        print(f"{len(split.y_train)} training / {len(split.y_val)} validation rows "
+              f"prepared in {time.perf_counter() - started:.1f}s; {os.cpu_count()} CPU(s)")
+
+        runs = [("numpy", 32)] + [("tf.data", size) for size in args.batch_sizes]
+        header = f"{'input':<16}{'first epoch s':>15}{'epoch s':>10}{'samples/s':>12}{'val acc':>10}"
+        print(header)
+        print("-" * len(header))
+        for mode, batch_size in runs:
+            result = train(split, mode, batch_size, args.epochs, args.shuffle_buffer, args.parallelism)
+            print(f"{mode + '/' + str(batch_size):<16}{result['first_epoch_s']:>15.1f}{result['epoch_s']:>10.1f}"
+                  f"{result['samples_per_s']:>12,.0f}{result['val_accuracy']:>10.4f}")
+        del split
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
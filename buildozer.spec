@@ -13,7 +13,7 @@ package.domain = org.agridash
 source.dir = .
 
 # (list) Source files to include (let empty to include all the files)
-source.include_exts = py,png,jpg,kv,atlas,html,css,js,h5,pkl,db
+source.include_exts = py,png,jpg,kv,atlas,html,css,js,h5,npz,tflite,json,pkl,db
 
 # (list) List of inclusions using pattern matching
 #source.include_patterns = assets/*,images/*.png
@@ -32,7 +32,7 @@ version = 0.1
 
 # (list) Application requirements
 # comma separated e.g. requirements = sqlite3,kivy
-requirements = python3,kivy==2.3.0,flask,werkzeug,jinja2,itsdangerous,click,numpy,openssl
+requirements = python3,kivy==2.3.0,flask,werkzeug,jinja2,itsdangerous,click,numpy,openssl,waitress
 
 # (str) Custom source folders for requirements
 # Sets custom source for any requirements with recipes
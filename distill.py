@@ -0,0 +1,144 @@
+"""Distil the fertilizer network into a compact student for fast CPU inference.
+
+The production network (Dense 128/256/128) is far larger than a 10-feature,
+60-class problem needs. The student here is a single hidden ReLU layer
+trained on the teacher's soft targets: the teacher's class probabilities
+softened with a temperature, using the usual ``T**2``-scaled cross-entropy
+on the student's softened logits. The trained student is written in the
+NumPy engine's ``.npz`` format (see numpy_model.py) with a softmax output,
+so agri_dash.py serves it with no TensorFlow via
+``ML_MODEL_BACKEND = 'student'``.
+
+Students are trained on the rows of the training CSV when it is available
+(through the columnar cache, see training_data.py), otherwise on synthetic
+rows spanning the scaled feature range.
+
+Usage:
+    python distill.py                                   # model.h5 -> student_weights.npz
+    python distill.py --data synthetic_crop_data_all_crops.csv --hidden-units 96 --temperature 3
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+from numpy_model import NumpyFertilizerModel, save_layers
+from tflite_model import synthetic_calibration_rows
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_TEACHER_PATH = os.path.join(BASE_DIR, "model.h5")
+DEFAULT_STUDENT_PATH = os.path.join(BASE_DIR, "student_weights.npz")
+DEFAULT_HIDDEN_UNITS = 128
+DEFAULT_TEMPERATURE = 1.0
+
+
+def soften(probabilities, temperature):
+    """Teacher probabilities at ``temperature``: softmax(log(p) / T)."""
+    logits = np.log(np.clip(probabilities, 1e-12, None)) / temperature
+    logits -= logits.max(axis=1, keepdims=True)
+    soft = np.exp(logits)
+    soft /= soft.sum(axis=1, keepdims=True)
+    return soft.astype(np.float32)
+
+
+def teacher_targets(teacher, x, temperature, batch_rows=65_536):
+    """Softened teacher probabilities for ``x``, computed in batches."""
+    targets = np.empty((len(x), teacher.output_shape[-1]), dtype=np.float32)
+    for start in range(0, len(x), batch_rows):
+        probabilities = teacher.predict(np.asarray(x[start:start + batch_rows]), batch_size=4096, verbose=0)
+        targets[start:start + batch_rows] = soften(probabilities, temperature)
+    return targets
+
+
+def build_student(input_dim, n_classes, hidden_units, temperature, learning_rate=0.003):
+    """One hidden layer with linear logits, trained on softened targets."""
+    import tensorflow as tf
+
+    student = tf.keras.Sequential([
+        tf.keras.layers.Input(shape=(input_dim,)),
+        tf.keras.layers.Dense(hidden_units, activation='relu'),
+        tf.keras.layers.Dense(n_classes),
+    ])
+
+    def distillation_loss(soft_targets, logits):
+        return temperature ** 2 * tf.keras.losses.categorical_crossentropy(
+            soft_targets, logits / temperature, from_logits=True)
+
+    student.compile(optimizer=tf.keras.optimizers.Adam(learning_rate=learning_rate), loss=distillation_loss)
+    return student
+
+
+def distill(teacher, x_train, x_val, hidden_units=DEFAULT_HIDDEN_UNITS, temperature=DEFAULT_TEMPERATURE,
+            epochs=50, batch_size=1024, patience=5, seed=42):
+    """Train a student on the teacher's soft targets; return its layers for ``save_layers``."""
+    import tensorflow as tf
+
+    from training_data import make_dataset
+
+    tf.keras.utils.set_random_seed(seed)
+    soft_train = teacher_targets(teacher, x_train, temperature)
+    soft_val = teacher_targets(teacher, x_val, temperature)
+    student = build_student(x_train.shape[1], soft_train.shape[1], hidden_units, temperature)
+    student.fit(
+        make_dataset(x_train, soft_train, batch_size, shuffle_buffer=65_536, seed=seed),
+        validation_data=make_dataset(x_val, soft_val, 4096),
+        epochs=epochs,
+        callbacks=[tf.keras.callbacks.EarlyStopping(monitor='val_loss', patience=patience,
+                                                    restore_best_weights=True)],
+        verbose=0
+    )
+    hidden, output = [layer for layer in student.layers if layer.get_weights()]
+    (w1, b1), (w2, b2) = hidden.get_weights(), output.get_weights()
+    return [(w1, b1, "relu"), (w2, b2, "softmax")]
+
+
+def distillation_inputs(data_path, cache_dir, n_features, synthetic_rows):
+    """(x_train, x_val, description): the training split if the CSV exists, else synthetic rows."""
+    if data_path and os.path.exists(data_path):
+        from training_data import prepare_training_split
+
+        split, _ = prepare_training_split(data_path, cache_dir)
+        return split.x_train, split.x_val, f"{len(split.y_train)} rows of {os.path.basename(data_path)}"
+    x = synthetic_calibration_rows(n_features, n_samples=synthetic_rows, seed=7)
+    n_val = len(x) // 5
+    return x[n_val:], x[:n_val], f"{len(x) - n_val} synthetic rows"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Distil model.h5 into a one-hidden-layer NumPy student.")
+    parser.add_argument("--teacher", default=DEFAULT_TEACHER_PATH, help="Keras .h5 teacher model")
+    parser.add_argument("--output", default=DEFAULT_STUDENT_PATH, help="Destination student .npz file")
+    parser.add_argument("--data", default=os.path.join(BASE_DIR, "synthetic_crop_data_all_crops.csv"),
+                        help="training CSV (synthetic rows are used if it is missing)")
+    parser.add_argument("--cache-dir", default=os.path.join(BASE_DIR, "training_cache"))
+    parser.add_argument("--hidden-units", type=int, default=DEFAULT_HIDDEN_UNITS)
+    parser.add_argument("--temperature", type=float, default=DEFAULT_TEMPERATURE)
+    parser.add_argument("--epochs", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=1024)
+    parser.add_argument("--synthetic-rows", type=int, default=200_000)
+    args = parser.parse_args(argv)
+
+    import tensorflow as tf
+
+    teacher = tf.keras.models.load_model(args.teacher, compile=False)
+    x_train, x_val, description = distillation_inputs(args.data, args.cache_dir, teacher.input_shape[1],
+                                                      args.synthetic_rows)
+    print(f"Distilling {args.teacher} into {args.hidden_units} hidden units on {description} "
+          f"(T={args.temperature})")
+    started = time.perf_counter()
+    layers = distill(teacher, x_train, x_val, args.hidden_units, args.temperature, args.epochs, args.batch_size)
+    save_layers(layers, args.output)
+    print(f"Saved {args.output} ({os.path.getsize(args.output) / 1024:.1f} KB) in {time.perf_counter() - started:.0f}s")
+
+    student = NumpyFertilizerModel.load(args.output)
+    x_val = np.asarray(x_val)
+    agreement = np.mean(teacher.predict(x_val, batch_size=4096, verbose=0).argmax(axis=1)
+                        == student.predict(x_val).argmax(axis=1))
+    print(f"   Top-1 agreement with the teacher on {len(x_val)} held-out rows: {agreement:.2%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,12 @@
+"""Column names of the fertilizer training CSV, shared by training and the model exports.
+
+Kept free of third-party imports so serving-side modules (tflite_model.py) can
+use them without pulling in pandas or scikit-learn.
+"""
+
+NUMERIC_COLUMNS = ['N', 'P', 'K', 'Temperature(C)', 'Humidity(%)', 'Soil_pH', 'Moisture(%)']
+CATEGORICAL_COLUMNS = ['Crop', 'Region', 'Month']
+TARGET_COLUMN = 'Fertilizer'
+# Column order of X in train_and_save.py for the committed artifacts; the training
+# script records the order of the CSV it actually read.
+FEATURE_COLUMNS = NUMERIC_COLUMNS + CATEGORICAL_COLUMNS
@@ -0,0 +1,95 @@
+"""Keras definition of the fertilizer network, shared by training and the benchmarks.
+
+The defaults are the production architecture: Dense 128/256/128 with batch
+normalization after the first two layers, dropout 0.4/0.4/0.3 and adam.
+``save_artifacts`` writes a trained model in the layout agri_dash.py loads.
+"""
+import os
+import pickle
+import time
+
+from tensorflow.keras.callbacks import Callback
+from tensorflow.keras.layers import BatchNormalization, Dense, Dropout
+from tensorflow.keras.models import Sequential
+from tensorflow.keras.optimizers import Adam
+
+from numpy_model import fold_keras_h5, save_layers
+from tflite_model import build_metadata, convert_keras_model, save_metadata
+
+DEFAULT_HIDDEN_UNITS = (128, 256, 128)
+DEFAULT_DROPOUT = (0.4, 0.4, 0.3)
+DEFAULT_LEARNING_RATE = 0.001
+
+
+def build_model(input_dim, n_classes, hidden_units=DEFAULT_HIDDEN_UNITS, dropout=DEFAULT_DROPOUT,
+                learning_rate=DEFAULT_LEARNING_RATE, batch_norm_layers=2):
+    """Compiled classifier over integer labels (sparse categorical cross-entropy).
+
+    ``dropout`` has one rate per hidden layer; the first ``batch_norm_layers``
+    hidden layers are followed by batch normalization.
+    """
+    if len(dropout) != len(hidden_units):
+        raise ValueError("dropout needs one rate per hidden layer")
+    layers = []
+    for i, (units, rate) in enumerate(zip(hidden_units, dropout)):
+        if i == 0:
+            layers.append(Dense(units, input_dim=input_dim, activation='relu'))
+        else:
+            layers.append(Dense(units, activation='relu'))
+        if i < batch_norm_layers:
+            layers.append(BatchNormalization())
+        layers.append(Dropout(rate))
+    layers.append(Dense(n_classes, activation='softmax'))
+
+    model = Sequential(layers)
+    model.compile(optimizer=Adam(learning_rate=learning_rate), loss='sparse_categorical_crossentropy',
+                  metrics=['accuracy'])
+    return model
+
+
+class EpochTimer(Callback):
+    """Records the wall time of every epoch (validation included) and the training samples per second."""
+
+    def __init__(self, n_samples):
+        super().__init__()
+        self.n_samples = n_samples
+        self.epoch_seconds = []
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._started = time.perf_counter()
+
+    def on_epoch_end(self, epoch, logs=None):
+        self.epoch_seconds.append(time.perf_counter() - self._started)
+
+    @property
+    def samples_per_second(self):
+        if not self.epoch_seconds:
+            return 0.0
+        return self.n_samples * len(self.epoch_seconds) / sum(self.epoch_seconds)
+
+
+def save_artifacts(model, split, output_dir, quantization='float16'):
+    """Write ``model`` and the preprocessing of ``split`` (a ``TrainingSplit``) to ``output_dir``.
+
+    Produces model.h5, encoders.pkl, scaler.pkl, model_weights.npz (NumPy
+    engine), model.tflite and model_metadata.json; returns their paths.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    paths = {name: os.path.join(output_dir, name) for name in (
+        "model.h5", "encoders.pkl", "scaler.pkl", "model_weights.npz", "model.tflite", "model_metadata.json")}
+
+    model.save(paths["model.h5"])
+    with open(paths["encoders.pkl"], "wb") as f:
+        pickle.dump({
+            "label_encoders": split.label_encoders,
+            "fertilizer_encoder": split.fertilizer_encoder,
+            "dropdowns": {col: sorted(le.classes_) for col, le in split.label_encoders.items()}
+        }, f)
+    with open(paths["scaler.pkl"], "wb") as f:
+        pickle.dump(split.scaler, f)
+    save_layers(fold_keras_h5(paths["model.h5"]), paths["model_weights.npz"])
+    with open(paths["model.tflite"], "wb") as f:
+        f.write(convert_keras_model(model, quantization, representative_data=split.x_train[:1000]))
+    save_metadata(build_metadata(split.label_encoders, split.fertilizer_encoder, split.scaler, quantization,
+                                 feature_columns=split.feature_columns), paths["model_metadata.json"])
+    return paths
@@ -0,0 +1,269 @@
+"""Parallel hyperparameter sweep for the fertilizer network.
+
+Trials vary the hidden layer widths, dropout, learning rate and batch size
+over a grid or a random search space. Each runs in its own worker process of
+a pool, with a fixed number of TensorFlow threads pinned to its own CPU
+cores so parallel trials do not oversubscribe the machine. Every trial trains
+with early stopping on the memory-mapped columnar cache (see
+training_data.py), so workers share the data through the page cache instead
+of each parsing the CSV.
+
+The leaderboard (best validation accuracy first) is rewritten after every
+finished trial, and the best model is saved with its encoders, scaler, NumPy
+and TFLite exports in the layout agri_dash.py loads.
+
+The search space is a JSON object mapping each hyperparameter to a list of
+values; random search also accepts ``{"log_uniform": [low, high]}`` or
+``{"uniform": [low, high]}``. ``dropout`` is one rate for every layer or a
+list with one rate per layer. The production configuration always runs as
+trial 0 for reference.
+
+Usage:
+    python hyperparameter_sweep.py --data synthetic_crop_data_all_crops.csv
+    python hyperparameter_sweep.py --search random --trials 24 --workers 4 --threads-per-trial 2
+    python hyperparameter_sweep.py --space space.json --output-dir sweep_models
+"""
+import argparse
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from tflite_model import QUANTIZATION_MODES
+from training_data import cache_entry_path, load_cache, prepare_training_split
+
+DEFAULT_SEARCH_SPACE = {
+    "hidden_units": [[64, 128, 64], [128, 256, 128], [256, 256], [256]],
+    "dropout": [0.2, 0.3, 0.4],
+    "learning_rate": [0.0003, 0.001, 0.003],
+    "batch_size": [256, 1024],
+}
+# Architecture and optimizer of train_and_save.py.
+BASELINE_TRIAL = {"hidden_units": [128, 256, 128], "dropout": [0.4, 0.4, 0.3], "learning_rate": 0.001,
+                  "batch_size": 256}
+LEADERBOARD_FIELDS = ["rank", "trial", "hidden_units", "dropout", "learning_rate", "batch_size", "val_accuracy",
+                      "val_loss", "epochs", "seconds", "status"]
+
+
+# --- Search space ---
+def grid_trials(space):
+    keys = sorted(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[key] for key in keys))]
+
+
+def random_trials(space, n_trials, seed=0):
+    rng = np.random.default_rng(seed)
+
+    def draw(spec):
+        if isinstance(spec, dict) and "log_uniform" in spec:
+            low, high = spec["log_uniform"]
+            return float(np.exp(rng.uniform(np.log(low), np.log(high))))
+        if isinstance(spec, dict) and "uniform" in spec:
+            return float(rng.uniform(*spec["uniform"]))
+        return spec[int(rng.integers(len(spec)))]
+
+    return [{key: draw(spec) for key, spec in sorted(space.items())} for _ in range(n_trials)]
+
+
+def normalize_trial(params):
+    """Fill defaults and expand a single dropout rate to one rate per hidden layer."""
+    trial = dict(BASELINE_TRIAL, **params)
+    trial["hidden_units"] = [int(units) for units in trial["hidden_units"]]
+    dropout = trial["dropout"]
+    if not isinstance(dropout, (list, tuple)):
+        dropout = [dropout] * len(trial["hidden_units"])
+    trial["dropout"] = [round(float(rate), 4) for rate in dropout]
+    trial["learning_rate"] = float(trial["learning_rate"])
+    trial["batch_size"] = int(trial["batch_size"])
+    return trial
+
+
+def build_trials(space, search, n_trials, seed):
+    candidates = grid_trials(space) if search == "grid" else random_trials(space, n_trials, seed)
+    trials = [normalize_trial(BASELINE_TRIAL)]
+    for params in candidates:
+        trial = normalize_trial(params)
+        if trial not in trials:
+            trials.append(trial)
+    return trials
+
+
+# --- Workers ---
+def cpu_slices(n_workers, threads_per_trial):
+    """One CPU set per worker, ``threads_per_trial`` cores each, wrapping if cores run out."""
+    cores = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(os.cpu_count()))
+    return [
+        {cores[(w * threads_per_trial + t) % len(cores)] for t in range(threads_per_trial)}
+        for w in range(n_workers)
+    ]
+
+
+def init_worker(core_slices, threads_per_trial):
+    """Pin this worker to its CPU set and limit TensorFlow to ``threads_per_trial`` threads."""
+    cores = core_slices.get()
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+    os.environ["OMP_NUM_THREADS"] = str(threads_per_trial)
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "3")
+
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads_per_trial)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def run_trial(trial_id, trial, cache_entry, model_dir, max_epochs, patience, seed):
+    """Train one configuration with early stopping; save the model and return its scores."""
+    import tensorflow as tf
+    from tensorflow.keras.callbacks import EarlyStopping
+
+    from fertilizer_network import EpochTimer, build_model
+    from training_data import make_dataset
+
+    started = time.perf_counter()
+    tf.keras.utils.set_random_seed(seed)
+    split = load_cache(cache_entry)
+    model = build_model(split.x_train.shape[1], len(split.fertilizer_encoder.classes_),
+                        hidden_units=trial["hidden_units"], dropout=trial["dropout"],
+                        learning_rate=trial["learning_rate"])
+    train_data = make_dataset(split.x_train, split.y_train, trial["batch_size"], shuffle_buffer=65_536,
+                              parallelism=1, seed=seed)
+    val_data = make_dataset(split.x_val, split.y_val, 4096, parallelism=1)
+    timer = EpochTimer(len(split.y_train))
+    early_stop = EarlyStopping(monitor="val_loss", patience=patience, restore_best_weights=True)
+    model.fit(train_data, validation_data=val_data, epochs=max_epochs, callbacks=[early_stop, timer], verbose=0)
+
+    val_loss, val_accuracy = model.evaluate(val_data, verbose=0)
+    model_path = os.path.join(model_dir, f"trial_{trial_id}.h5")
+    model.save(model_path)
+    return {"val_accuracy": float(val_accuracy), "val_loss": float(val_loss), "epochs": len(timer.epoch_seconds),
+            "seconds": time.perf_counter() - started, "model_path": model_path}
+
+
+# --- Leaderboard ---
+def ranked(results):
+    finished = [r for r in results if r["status"] == "ok"]
+    failed = [r for r in results if r["status"] != "ok"]
+    finished.sort(key=lambda r: (-r["val_accuracy"], r["val_loss"]))
+    return finished + failed
+
+
+def write_leaderboard(results, path):
+    rows = ranked(results)
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=LEADERBOARD_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        for rank, result in enumerate(rows, start=1):
+            row = dict(result, rank=rank if result["status"] == "ok" else "")
+            row["hidden_units"] = "/".join(str(units) for units in result["hidden_units"])
+            row["dropout"] = "/".join(str(rate) for rate in result["dropout"])
+            for key in ("val_accuracy", "val_loss"):
+                if key in row:
+                    row[key] = f"{row[key]:.4f}"
+            if "seconds" in row:
+                row["seconds"] = f"{row['seconds']:.1f}"
+            writer.writerow(row)
+    return rows
+
+
+def describe(result):
+    return (f"{'/'.join(map(str, result['hidden_units'])):<12} dropout {'/'.join(map(str, result['dropout'])):<12} "
+            f"lr {result['learning_rate']:<8.2g} batch {result['batch_size']:<5}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parallel hyperparameter sweep for the fertilizer network.")
+    parser.add_argument("--data", default="synthetic_crop_data_all_crops.csv")
+    parser.add_argument("--cache-dir", default="training_cache")
+    parser.add_argument("--space", help="JSON file with the search space (default: built-in grid)")
+    parser.add_argument("--search", choices=["grid", "random"], default="grid")
+    parser.add_argument("--trials", type=int, default=20, help="random search: number of sampled trials")
+    parser.add_argument("--workers", type=int, help="parallel trials (default: CPUs // threads per trial)")
+    parser.add_argument("--threads-per-trial", type=int, default=1)
+    parser.add_argument("--max-epochs", type=int, default=100)
+    parser.add_argument("--patience", type=int, default=5, help="early stopping patience in epochs")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output-dir", default="output_models", help="where the best model's artifacts go")
+    parser.add_argument("--quantization", choices=QUANTIZATION_MODES, default="float16",
+                        help="TFLite export of the best model")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.data):
+        print(f"Data file '{args.data}' not found.")
+        return 1
+    space = DEFAULT_SEARCH_SPACE
+    if args.space:
+        with open(args.space) as f:
+            space = json.load(f)
+    trials = build_trials(space, args.search, args.trials, args.seed)
+
+    split, hit = prepare_training_split(args.data, args.cache_dir)
+    cache_entry = cache_entry_path(args.data, args.cache_dir)
+    print(f"{'Mapped' if hit else 'Built'} training cache: {len(split.y_train)} training / "
+          f"{len(split.y_val)} validation rows")
+    del split
+
+    n_workers = args.workers or max(1, (os.cpu_count() or 1) // args.threads_per_trial)
+    n_workers = min(n_workers, len(trials))
+    print(f"Running {len(trials)} trials on {n_workers} worker(s) x {args.threads_per_trial} thread(s)")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    leaderboard_path = os.path.join(args.output_dir, "sweep_leaderboard.csv")
+    results = []
+    context = multiprocessing.get_context("spawn")  # TensorFlow is not fork-safe
+    core_slices = context.Queue()
+    for cores in cpu_slices(n_workers, args.threads_per_trial):
+        core_slices.put(cores)
+
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory() as model_dir, ProcessPoolExecutor(
+            max_workers=n_workers, mp_context=context, initializer=init_worker,
+            initargs=(core_slices, args.threads_per_trial)) as pool:
+        futures = {
+            pool.submit(run_trial, trial_id, trial, cache_entry, model_dir, args.max_epochs, args.patience,
+                        args.seed): (trial_id, trial)
+            for trial_id, trial in enumerate(trials)
+        }
+        for future in as_completed(futures):
+            trial_id, trial = futures[future]
+            result = dict(trial, trial=trial_id)
+            try:
+                result.update(future.result(), status="ok")
+                print(f"[{len(results) + 1}/{len(trials)}] trial {trial_id}: {describe(result)} "
+                      f"val_acc {result['val_accuracy']:.4f} ({result['epochs']} epochs, {result['seconds']:.0f}s)")
+            except Exception as e:
+                result["status"] = f"failed: {e}"
+                print(f"[{len(results) + 1}/{len(trials)}] trial {trial_id}: {describe(result)} FAILED: {e}")
+            results.append(result)
+            write_leaderboard(results, leaderboard_path)
+
+        rows = ranked(results)
+        print(f"\nSweep finished in {time.perf_counter() - started:.0f}s. Leaderboard: {leaderboard_path}")
+        for rank, result in enumerate(rows[:5], start=1):
+            if result["status"] == "ok":
+                print(f"  {rank}. trial {result['trial']:<3} {describe(result)} val_acc {result['val_accuracy']:.4f}")
+
+        best = rows[0] if rows and rows[0]["status"] == "ok" else None
+        if best is None:
+            print("No trial finished successfully.")
+            return 1
+
+        import tensorflow as tf
+        from fertilizer_network import save_artifacts
+
+        model = tf.keras.models.load_model(best["model_path"])
+        paths = save_artifacts(model, load_cache(cache_entry), args.output_dir, args.quantization)
+    with open(os.path.join(args.output_dir, "sweep_best.json"), "w") as f:
+        json.dump({key: best[key] for key in LEADERBOARD_FIELDS if key in best and key != "rank"}, f, indent=2)
+    print(f"Saved the best model (trial {best['trial']}) to {args.output_dir}: {', '.join(sorted(paths))}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
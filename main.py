@@ -3,6 +3,8 @@ import time
 import webbrowser
 import os
 import sys
+import urllib.error
+import urllib.request
 from kivy.app import App
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.label import Label
@@ -12,7 +14,27 @@ from kivy.clock import Clock
 # Import the Flask app
 # Ensure the current directory is in path so we can import agri_dash
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from agri_dash import app as flask_app
+from agri_dash import app as flask_app, init_db, run_server
+
+PORT = 5000
+SERVER_URL = f"http://127.0.0.1:{PORT}"
+HEALTH_URL = f"{SERVER_URL}/healthz"
+READY_TIMEOUT = 60
+
+
+def wait_for_server(url, timeout, interval=0.1):
+    """Poll the health endpoint until it answers 200 or the timeout expires."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return True
+        except (urllib.error.URLError, OSError):
+            pass
+        time.sleep(interval)
+    return False
+
 
 class FlaskThread(threading.Thread):
     def __init__(self):
@@ -20,9 +42,11 @@ class FlaskThread(threading.Thread):
         self.daemon = True
 
     def run(self):
-        # Run Flask app
-        # host='0.0.0.0' is important for Android
-        flask_app.run(host='0.0.0.0', port=5000, debug=False, use_reloader=False)
+        # Create tables and apply pending schema migrations
+        init_db()
+        # Serve with waitress (threaded WSGI server); it also warms up the ML model
+        # in the background. host='0.0.0.0' is important for Android
+        run_server(host='0.0.0.0', port=PORT, mode='waitress', threads=flask_app.config['SERVER_THREADS'])
 
 class AgriDashApp(App):
     def build(self):
@@ -47,18 +71,27 @@ class AgriDashApp(App):
         self.flask_thread = FlaskThread()
         self.flask_thread.start()
 
-        # Schedule browser open
-        Clock.schedule_once(self.server_ready, 3)
+        # Open the browser as soon as the server answers its health check
+        threading.Thread(target=self.wait_until_ready, daemon=True).start()
 
         return layout
 
+    def wait_until_ready(self):
+        if wait_for_server(HEALTH_URL, READY_TIMEOUT):
+            Clock.schedule_once(self.server_ready)
+        else:
+            Clock.schedule_once(self.server_failed)
+
     def server_ready(self, dt):
-        self.status_label.text = "Server Running!\nhttp://127.0.0.1:5000"
+        self.status_label.text = f"Server Running!\n{SERVER_URL}"
         self.open_button.disabled = False
         self.open_browser(None)
 
+    def server_failed(self, dt):
+        self.status_label.text = f"Server did not start within {READY_TIMEOUT} seconds."
+
     def open_browser(self, instance):
-        webbrowser.open("http://127.0.0.1:5000")
+        webbrowser.open(SERVER_URL)
 
 if __name__ == '__main__':
     AgriDashApp().run()
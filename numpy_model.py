@@ -0,0 +1,216 @@
+"""Pure-NumPy inference for the fertilizer network.
+
+The export step reads the Dense and BatchNormalization weights straight out of
+``model.h5`` (via h5py, no TensorFlow needed) and folds every inference-time
+BatchNorm into the Dense layer that follows it. Dropout is an identity at
+inference and is dropped. The result is a short list of ``(kernel, bias,
+activation)`` layers saved to a compact ``.npz`` file that ``agri_dash.py``
+can run without TensorFlow.
+
+Usage:
+    python numpy_model.py                      # export model.h5 -> model_weights.npz
+    python numpy_model.py --verify             # export, then compare against Keras
+"""
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_H5_PATH = os.path.join(BASE_DIR, "model.h5")
+DEFAULT_NPZ_PATH = os.path.join(BASE_DIR, "model_weights.npz")
+
+SUPPORTED_ACTIVATIONS = ("linear", "relu", "softmax")
+VERIFY_TOLERANCE = 1e-4
+
+
+def _relu(x):
+    return np.maximum(x, 0.0, out=x)
+
+
+def _softmax(x):
+    x -= x.max(axis=1, keepdims=True)
+    np.exp(x, out=x)
+    x /= x.sum(axis=1, keepdims=True)
+    return x
+
+
+_ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": _relu,
+    "softmax": _softmax,
+}
+
+
+class NumpyFertilizerModel:
+    """Fused Dense stack with a Keras-compatible ``predict`` method."""
+
+    def __init__(self, layers):
+        self.layers = [
+            (np.ascontiguousarray(kernel, dtype=np.float32),
+             np.ascontiguousarray(bias, dtype=np.float32),
+             activation)
+            for kernel, bias, activation in layers
+        ]
+        for _, _, activation in self.layers:
+            if activation not in _ACTIVATIONS:
+                raise ValueError(f"Unsupported activation: {activation}")
+
+    @property
+    def input_dim(self):
+        return self.layers[0][0].shape[0]
+
+    @property
+    def output_dim(self):
+        return self.layers[-1][0].shape[1]
+
+    @classmethod
+    def load(cls, path=DEFAULT_NPZ_PATH):
+        """Load a model previously written by :func:`save_layers`."""
+        with np.load(path, allow_pickle=False) as data:
+            activations = [str(a) for a in data["activations"]]
+            layers = [
+                (data[f"kernel_{i}"], data[f"bias_{i}"], activation)
+                for i, activation in enumerate(activations)
+            ]
+        return cls(layers)
+
+    def predict(self, x, verbose=0, batch_size=None):
+        """Return class probabilities for a 2-D input matrix."""
+        out = np.asarray(x, dtype=np.float32)
+        for kernel, bias, activation in self.layers:
+            out = out @ kernel
+            out += bias
+            out = _ACTIVATIONS[activation](out)
+        return out
+
+
+# --- Export ---
+def fold_keras_h5(h5_path=DEFAULT_H5_PATH):
+    """Read a Sequential Keras ``.h5`` file and return fused NumPy layers.
+
+    Each BatchNormalization ``y = gamma * (h - mean) / sqrt(var + eps) + beta``
+    is rewritten as ``h * scale + shift`` and folded into the next Dense layer:
+    ``kernel' = scale[:, None] * kernel`` and ``bias' = shift @ kernel + bias``.
+    """
+    import h5py
+
+    with h5py.File(h5_path, "r") as f:
+        config = json.loads(f.attrs["model_config"])
+        weights = f["model_weights"]
+
+        def read(layer_name, var):
+            group = weights[layer_name]
+            matches = []
+            group.visititems(
+                lambda name, obj: matches.append(obj[()])
+                if name.split("/")[-1].split(":")[0] == var else None
+            )
+            if not matches:
+                raise KeyError(f"{layer_name} has no weight named {var}")
+            return np.asarray(matches[0], dtype=np.float64)
+
+        layers = []
+        pending_scale = None
+        pending_shift = None
+        for layer in config["config"]["layers"]:
+            kind = layer["class_name"]
+            cfg = layer["config"]
+            name = cfg["name"]
+
+            if kind in ("InputLayer", "Dropout"):
+                continue
+
+            if kind == "BatchNormalization":
+                gamma = read(name, "gamma") if cfg.get("scale", True) else 1.0
+                beta = read(name, "beta") if cfg.get("center", True) else 0.0
+                mean = read(name, "moving_mean")
+                var = read(name, "moving_variance")
+                scale = gamma / np.sqrt(var + cfg["epsilon"])
+                shift = beta - mean * scale
+                if pending_scale is None:
+                    pending_scale, pending_shift = scale, shift
+                else:
+                    pending_scale, pending_shift = pending_scale * scale, pending_shift * scale + shift
+                continue
+
+            if kind == "Dense":
+                kernel = read(name, "kernel")
+                bias = read(name, "bias") if cfg.get("use_bias", True) else np.zeros(kernel.shape[1])
+                if pending_scale is not None:
+                    bias = pending_shift @ kernel + bias
+                    kernel = pending_scale[:, None] * kernel
+                    pending_scale = pending_shift = None
+                activation = cfg.get("activation", "linear")
+                if activation not in SUPPORTED_ACTIVATIONS:
+                    raise ValueError(f"Layer {name} uses unsupported activation '{activation}'")
+                layers.append((kernel, bias, activation))
+                continue
+
+            raise ValueError(f"Layer {name} of type {kind} cannot be exported to NumPy")
+
+        if pending_scale is not None:
+            # A trailing BatchNorm becomes a diagonal linear layer.
+            layers.append((np.diag(pending_scale), pending_shift, "linear"))
+
+    return layers
+
+
+def save_layers(layers, npz_path=DEFAULT_NPZ_PATH):
+    """Write fused layers to a compressed ``.npz`` file."""
+    arrays = {"activations": np.array([activation for _, _, activation in layers])}
+    for i, (kernel, bias, _) in enumerate(layers):
+        arrays[f"kernel_{i}"] = np.asarray(kernel, dtype=np.float32)
+        arrays[f"bias_{i}"] = np.asarray(bias, dtype=np.float32)
+    np.savez_compressed(npz_path, **arrays)
+
+
+def verify_against_keras(h5_path, npz_path, n_samples=2048, seed=0):
+    """Compare NumPy and Keras outputs; return (max abs difference, argmax agreement)."""
+    import tensorflow as tf
+
+    keras_model = tf.keras.models.load_model(h5_path)
+    numpy_model = NumpyFertilizerModel.load(npz_path)
+
+    rng = np.random.default_rng(seed)
+    # Cover the predictor's accepted input ranges plus the encoded categoricals.
+    low = np.array([0, 0, 0, 10, 0, 4.0, 0, 0, 0, 0], dtype=np.float32)
+    high = np.array([300, 200, 250, 50, 100, 9.0, 100, 120, 36, 12], dtype=np.float32)
+    x = rng.uniform(low, high, size=(n_samples, numpy_model.input_dim)).astype(np.float32)
+
+    expected = keras_model.predict(x, verbose=0)
+    actual = numpy_model.predict(x)
+    max_diff = float(np.max(np.abs(expected - actual)))
+    argmax_agreement = float(np.mean(expected.argmax(axis=1) == actual.argmax(axis=1)))
+    return max_diff, argmax_agreement
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export model.h5 to a fused NumPy .npz file.")
+    parser.add_argument("--model", default=DEFAULT_H5_PATH, help="Keras .h5 model to export")
+    parser.add_argument("--output", default=DEFAULT_NPZ_PATH, help="Destination .npz file")
+    parser.add_argument("--verify", action="store_true",
+                        help="Load the model with TensorFlow and check the outputs match")
+    args = parser.parse_args(argv)
+
+    layers = fold_keras_h5(args.model)
+    save_layers(layers, args.output)
+    shapes = " -> ".join(str(kernel.shape[1]) for kernel, _, _ in layers)
+    print(f"Exported {len(layers)} fused layers ({layers[0][0].shape[0]} -> {shapes}) to {args.output}")
+    print(f"   Size: {os.path.getsize(args.output) / 1024:.1f} KB")
+
+    if args.verify:
+        max_diff, agreement = verify_against_keras(args.model, args.output)
+        print(f"   Max |keras - numpy|: {max_diff:.2e} (tolerance {VERIFY_TOLERANCE:.0e})")
+        print(f"   Argmax agreement: {agreement:.2%}")
+        if max_diff > VERIFY_TOLERANCE:
+            print("FAILED: NumPy engine does not match Keras within tolerance.")
+            return 1
+        print("OK: NumPy engine matches Keras.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,38 @@
+"""The NumPy engine must reproduce the Keras model it was exported from."""
+import os
+
+import numpy as np
+import pytest
+
+from numpy_model import DEFAULT_H5_PATH, DEFAULT_NPZ_PATH, NumpyFertilizerModel, fold_keras_h5
+
+# Same ranges as verify_against_keras: the predictor's inputs plus the encoded categoricals.
+LOW = np.array([0, 0, 0, 10, 0, 4.0, 0, 0, 0, 0], dtype=np.float32)
+HIGH = np.array([300, 200, 250, 50, 100, 9.0, 100, 120, 36, 12], dtype=np.float32)
+
+
+@pytest.fixture(scope="module")
+def keras_model():
+    pytest.importorskip("h5py")
+    tf = pytest.importorskip("tensorflow")
+    if not os.path.exists(DEFAULT_H5_PATH):
+        pytest.skip(f"{DEFAULT_H5_PATH} not found")
+    return tf.keras.models.load_model(DEFAULT_H5_PATH, compile=False)
+
+
+@pytest.fixture(scope="module")
+def batch(keras_model):
+    rng = np.random.default_rng(0)
+    return rng.uniform(LOW, HIGH, size=(512, keras_model.input_shape[1])).astype(np.float32)
+
+
+def test_exported_weights_match_keras(keras_model, batch):
+    if not os.path.exists(DEFAULT_NPZ_PATH):
+        pytest.skip(f"{DEFAULT_NPZ_PATH} not found")
+    numpy_model = NumpyFertilizerModel.load(DEFAULT_NPZ_PATH)
+    np.testing.assert_allclose(numpy_model.predict(batch), keras_model.predict(batch, verbose=0), atol=1e-4)
+
+
+def test_folded_batch_norm_matches_keras(keras_model, batch):
+    numpy_model = NumpyFertilizerModel(fold_keras_h5(DEFAULT_H5_PATH))
+    np.testing.assert_allclose(numpy_model.predict(batch), keras_model.predict(batch, verbose=0), atol=1e-4)
@@ -0,0 +1,72 @@
+"""PreprocessingPipeline must reproduce train_and_save.py's encoding and scaling."""
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+import agri_dash
+from agri_dash import ENCODERS_PATH, MODEL_METADATA_PATH, SCALER_PATH, TRAINING_COLUMNS, PreprocessingPipeline
+
+ROWS = [
+    {"N": 5, "P": 10, "K": 10, "temperature": 20, "humidity": 50, "ph": 6.5, "moisture": 30,
+     "crop": "Rice", "region": "Haryana", "month": "May"},
+    {"N": 120, "P": 45.5, "K": 80, "temperature": 31.2, "humidity": 72, "ph": 7.8, "moisture": 55,
+     "crop": "Wheat", "region": "Bihar", "month": "November"},
+]
+
+
+@pytest.fixture(scope="module")
+def pickles():
+    pytest.importorskip("sklearn")
+    if not (os.path.exists(ENCODERS_PATH) and os.path.exists(SCALER_PATH)):
+        pytest.skip("encoders.pkl / scaler.pkl not found")
+    with open(ENCODERS_PATH, "rb") as f:
+        encoders = pickle.load(f)
+    with open(SCALER_PATH, "rb") as f:
+        scaler = pickle.load(f)
+    return encoders, scaler
+
+
+@pytest.fixture(scope="module")
+def metadata_pipeline():
+    if not os.path.exists(MODEL_METADATA_PATH):
+        pytest.skip("model_metadata.json not found")
+    return PreprocessingPipeline.from_metadata()
+
+
+def test_transform_matches_label_encoder_and_scaler(pickles):
+    encoders, scaler = pickles
+    features, errors = PreprocessingPipeline.from_pickles().transform(ROWS)
+    assert errors == {}
+
+    # train_and_save.py: lowercase the categoricals, LabelEncoder them, scale in CSV column order.
+    columns = list(getattr(scaler, "feature_names_in_", TRAINING_COLUMNS.values()))
+    raw = np.zeros((len(ROWS), len(columns)))
+    for i, row in enumerate(ROWS):
+        for field, column in TRAINING_COLUMNS.items():
+            value = row[field]
+            if column in encoders["label_encoders"]:
+                value = encoders["label_encoders"][column].transform([value.strip().lower()])[0]
+            raw[i, columns.index(column)] = value
+    np.testing.assert_allclose(features, scaler.transform(raw), atol=1e-6)
+
+
+def test_metadata_and_pickles_agree(pickles, metadata_pipeline):
+    from_pickles = PreprocessingPipeline.from_pickles()
+    np.testing.assert_allclose(metadata_pipeline.transform(ROWS)[0], from_pickles.transform(ROWS)[0], atol=1e-6)
+    assert metadata_pipeline.vocabularies == from_pickles.vocabularies
+    assert metadata_pipeline.labels == from_pickles.labels
+
+
+def test_bracketed_local_name_falls_back_to_training_name(metadata_pipeline):
+    code = metadata_pipeline.encode_category("crop", "Sesame (Til)")
+    assert code is not None
+    assert code == metadata_pipeline.encode_category("crop", "sesame")
+
+
+def test_app_region_missing_from_training_is_reported(metadata_pipeline):
+    assert "Punjab" in agri_dash.regions_ml
+    features, errors = metadata_pipeline.transform([dict(ROWS[0], region="Punjab"), ROWS[1]])
+    assert errors == {0: "The prediction model was not trained on region 'Punjab'."}
+    assert not features[0].any()
@@ -0,0 +1,198 @@
+"""Quantized TFLite export of the fertilizer network, plus a small interpreter wrapper.
+
+Export (needs TensorFlow) converts the Keras model into a TFLite flat buffer
+with float16 weights or full int8 quantization, and writes the label metadata
+the app needs to interpret the model: input feature order, scaler mean/scale,
+the categorical vocabularies and the fertilizer class names, as plain JSON so
+no pickle or scikit-learn is needed at serving time.
+
+Serving only needs a TFLite interpreter. The lightweight ``ai-edge-litert`` or
+``tflite-runtime`` packages are tried first and full TensorFlow last.
+
+Usage:
+    python tflite_model.py                          # model.h5 -> model.tflite (float16) + model_metadata.json
+    python tflite_model.py --quantization int8
+"""
+import argparse
+import json
+import os
+import pickle
+import sys
+import threading
+
+import numpy as np
+
+from feature_columns import CATEGORICAL_COLUMNS, FEATURE_COLUMNS
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_H5_PATH = os.path.join(BASE_DIR, "model.h5")
+DEFAULT_TFLITE_PATH = os.path.join(BASE_DIR, "model.tflite")
+DEFAULT_METADATA_PATH = os.path.join(BASE_DIR, "model_metadata.json")
+DEFAULT_ENCODERS_PATH = os.path.join(BASE_DIR, "encoders.pkl")
+DEFAULT_SCALER_PATH = os.path.join(BASE_DIR, "scaler.pkl")
+
+QUANTIZATION_MODES = ("int8", "float16", "none")
+
+
+def has_lightweight_interpreter():
+    """True if ai-edge-litert or tflite-runtime is installed, i.e. serving needs no TensorFlow."""
+    import importlib.util
+
+    return any(importlib.util.find_spec(name) is not None for name in ("ai_edge_litert", "tflite_runtime"))
+
+
+def load_interpreter_class():
+    """Return the first available TFLite ``Interpreter`` class."""
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+        return Interpreter
+    except ImportError:
+        pass
+    try:
+        from tflite_runtime.interpreter import Interpreter
+        return Interpreter
+    except ImportError:
+        pass
+    import tensorflow as tf
+    return tf.lite.Interpreter
+
+
+class TFLiteFertilizerModel:
+    """TFLite interpreter with a Keras-compatible ``predict`` method.
+
+    The interpreter is resized when the batch size changes and is not
+    thread-safe, so calls are serialized with a lock.
+    """
+
+    def __init__(self, model_content=None, model_path=None, num_threads=1):
+        interpreter_class = load_interpreter_class()
+        self.interpreter = interpreter_class(model_path=model_path, model_content=model_content,
+                                             num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self._batch_size = int(self._input["shape"][0])
+        self._lock = threading.Lock()
+
+    @property
+    def input_dim(self):
+        return int(self._input["shape"][1])
+
+    @property
+    def output_dim(self):
+        return int(self._output["shape"][1])
+
+    @classmethod
+    def load(cls, path=DEFAULT_TFLITE_PATH, num_threads=1):
+        return cls(model_path=path, num_threads=num_threads)
+
+    def predict(self, x, verbose=0, batch_size=None):
+        """Return class probabilities for a 2-D input matrix."""
+        x = np.ascontiguousarray(x, dtype=np.float32)
+        with self._lock:
+            if len(x) != self._batch_size:
+                self.interpreter.resize_tensor_input(self._input["index"], [len(x), x.shape[1]])
+                self.interpreter.allocate_tensors()
+                self._batch_size = len(x)
+            self.interpreter.set_tensor(self._input["index"], x)
+            self.interpreter.invoke()
+            return self.interpreter.get_tensor(self._output["index"]).copy()
+
+
+# --- Export ---
+def convert_keras_model(keras_model, quantization="int8", representative_data=None):
+    """Convert a Keras model to a TFLite flat buffer.
+
+    ``int8`` quantizes weights and activations using ``representative_data``
+    (scaled training rows) for calibration and keeps float32 input and output
+    so callers do not change. ``float16`` stores float16 weights.
+    """
+    import tensorflow as tf
+
+    if quantization not in QUANTIZATION_MODES:
+        raise ValueError(f"Unknown quantization '{quantization}', expected one of {QUANTIZATION_MODES}")
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(keras_model)
+    if quantization == "float16":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantization == "int8":
+        if representative_data is None:
+            raise ValueError("int8 quantization needs representative_data for calibration")
+        samples = np.asarray(representative_data, dtype=np.float32)
+
+        def representative_dataset():
+            for row in samples:
+                yield [row[np.newaxis, :]]
+
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    return converter.convert()
+
+
+def build_metadata(label_encoders, fertilizer_encoder, scaler, quantization, feature_columns=FEATURE_COLUMNS):
+    """Label metadata for a trained model, as JSON-serializable values."""
+    return {
+        "features": list(feature_columns),
+        "scaler": {
+            "mean": [float(v) for v in scaler.mean_],
+            "scale": [float(v) for v in scaler.scale_],
+        },
+        "categories": {col: [str(c) for c in label_encoders[col].classes_] for col in CATEGORICAL_COLUMNS},
+        "labels": [str(c) for c in fertilizer_encoder.classes_],
+        "quantization": quantization,
+    }
+
+
+def save_metadata(metadata, path=DEFAULT_METADATA_PATH):
+    with open(path, "w") as f:
+        json.dump(metadata, f, indent=2)
+
+
+def load_metadata(path=DEFAULT_METADATA_PATH):
+    with open(path) as f:
+        return json.load(f)
+
+
+def synthetic_calibration_rows(n_features, n_samples=1000, seed=0):
+    """Calibration rows for exporting without the training CSV.
+
+    The training features are roughly uniform, so after StandardScaler they
+    span about [-sqrt(3), sqrt(3)].
+    """
+    rng = np.random.default_rng(seed)
+    return rng.uniform(-np.sqrt(3), np.sqrt(3), size=(n_samples, n_features)).astype(np.float32)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export model.h5 to a quantized TFLite model plus label metadata.")
+    parser.add_argument("--model", default=DEFAULT_H5_PATH, help="Keras .h5 model to export")
+    parser.add_argument("--output", default=DEFAULT_TFLITE_PATH, help="Destination .tflite file")
+    parser.add_argument("--metadata", default=DEFAULT_METADATA_PATH, help="Destination label metadata JSON")
+    parser.add_argument("--encoders", default=DEFAULT_ENCODERS_PATH)
+    parser.add_argument("--scaler", default=DEFAULT_SCALER_PATH)
+    parser.add_argument("--quantization", choices=QUANTIZATION_MODES, default="float16")
+    args = parser.parse_args(argv)
+
+    import tensorflow as tf
+
+    keras_model = tf.keras.models.load_model(args.model)
+    calibration = synthetic_calibration_rows(keras_model.input_shape[1]) if args.quantization == "int8" else None
+    flat_buffer = convert_keras_model(keras_model, args.quantization, calibration)
+    with open(args.output, "wb") as f:
+        f.write(flat_buffer)
+    print(f"Exported {args.quantization} TFLite model to {args.output} ({len(flat_buffer) / 1024:.1f} KB)")
+
+    with open(args.encoders, "rb") as f:
+        encoders = pickle.load(f)
+    with open(args.scaler, "rb") as f:
+        scaler = pickle.load(f)
+    save_metadata(build_metadata(encoders["label_encoders"], encoders["fertilizer_encoder"], scaler,
+                                 args.quantization), args.metadata)
+    print(f"Wrote label metadata to {args.metadata}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
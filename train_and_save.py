@@ -1,13 +1,12 @@
-import pandas as pd
 import numpy as np
-import pickle
 import os
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder, StandardScaler
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import Dense, Dropout, BatchNormalization
+import time
 from tensorflow.keras.callbacks import EarlyStopping
-from tensorflow.keras.utils import to_categorical
+from fertilizer_network import EpochTimer, build_model, save_artifacts
+from distill import distill
+from numpy_model import NumpyFertilizerModel, save_layers
+from training_data import make_dataset, peak_rss_mb, prepare_training_split
+from tflite_model import TFLiteFertilizerModel
 
 # --- Configuration ---
 DATA_FILE = 'synthetic_crop_data_all_crops.csv'
@@ -15,6 +14,28 @@ OUTPUT_DIR = 'output_models'
 MODEL_PATH = os.path.join(OUTPUT_DIR, "model.h5")
 ENCODERS_PATH = os.path.join(OUTPUT_DIR, "encoders.pkl")
 SCALER_PATH = os.path.join(OUTPUT_DIR, "scaler.pkl")
+NUMPY_WEIGHTS_PATH = os.path.join(OUTPUT_DIR, "model_weights.npz")
+TFLITE_PATH = os.path.join(OUTPUT_DIR, "model.tflite")
+METADATA_PATH = os.path.join(OUTPUT_DIR, "model_metadata.json")
+# 'float16', 'int8' (smallest, calibrated on training rows) or 'none'. Check the printed
+# accuracy before switching to int8: close class probabilities are sensitive to it.
+TFLITE_QUANTIZATION = 'float16'
+# Rows parsed per CSV chunk; lower it if even one chunk does not fit in memory.
+CSV_CHUNK_ROWS = 250_000
+# Encoded, scaled arrays are cached here keyed by the CSV's hash; None re-parses every run.
+TRAINING_CACHE_DIR = 'training_cache'
+# 'tf.data' streams shuffled, prefetched batches from the arrays above; 'numpy' hands
+# them to model.fit directly with the original batch size of 32.
+TRAINING_INPUT = 'tf.data'
+TFDATA_BATCH_SIZE = 256
+SHUFFLE_BUFFER_ROWS = 65_536
+TFDATA_PARALLELISM = None  # parallel block reads and batching threads; None = tf.data AUTOTUNE
+TFDATA_CACHE = False  # keep loaded blocks in memory after the first epoch
+# Also distil a one-hidden-layer student (ML_MODEL_BACKEND = 'student' in agri_dash.py).
+DISTILL_STUDENT = True
+STUDENT_HIDDEN_UNITS = 128
+STUDENT_TEMPERATURE = 1.0
+STUDENT_PATH = os.path.join(OUTPUT_DIR, "student_weights.npz")
 
 # ========== STEP 1: Load & Clean Dataset ==========
 
@@ -27,116 +48,114 @@ if not os.path.exists(DATA_FILE):
     exit()
 
 try:
-    df_crop_recommendation = pd.read_csv(DATA_FILE)
+    # Chunked float32/category parsing with incrementally fitted encoders and scaler;
+    # see training_data.py. Peak memory stays close to the final float32 matrix.
+    # With TRAINING_CACHE_DIR set, later runs on the same CSV memory-map the result.
+    started = time.perf_counter()
+    data, cache_hit = prepare_training_split(DATA_FILE, TRAINING_CACHE_DIR, test_size=0.2, random_state=42,
+                                             chunk_rows=CSV_CHUNK_ROWS)
+except ValueError as e:
+    print(f"\nFATAL ERROR: {e}")
+    exit()
 except Exception as e:
     print(f"\nFATAL ERROR: Failed to read CSV file. Error: {e}")
     exit()
-
-# Verify and clean columns
-required_columns = [
-    'N', 'P', 'K', 'Temperature(C)', 'Humidity(%)', 'Soil_pH', 'Moisture(%)',
-    'Crop', 'Region', 'Month', 'Fertilizer'
-]
-
-for col in required_columns:
-    if col not in df_crop_recommendation.columns:
-        print(f"\nFATAL ERROR: Missing column in dataset: {col}.")
-        print(f"Available columns are: {df_crop_recommendation.columns.tolist()}")
-        exit()
-
-# Clean whitespace & casing
-for cat_col in ['Crop', 'Region', 'Month', 'Fertilizer']:
-    df_crop_recommendation[cat_col] = df_crop_recommendation[cat_col].astype(str).str.strip().str.lower()
-print("✅ Data loaded and cleaned.")
+print(f"✅ Data {'mapped from the training cache' if cache_hit else 'loaded and cleaned'} "
+      f"({len(data.y_train) + len(data.y_val)} rows in {time.perf_counter() - started:.1f}s, "
+      f"peak memory {peak_rss_mb():.0f} MB).")
 
 
 # ========== STEP 2: Encode Categorical Features ==========
-label_encoders = {}
-dropdowns = {}
-
-# Encode input features
-for col in ['Crop', 'Region', 'Month']:
-    le = LabelEncoder()
-    df_crop_recommendation[col] = le.fit_transform(df_crop_recommendation[col])
-    label_encoders[col] = le
-    dropdowns[col] = sorted(le.classes_)
-
-# Encode the target feature (Fertilizer)
-fertilizer_encoder = LabelEncoder()
-df_crop_recommendation['Fertilizer'] = fertilizer_encoder.fit_transform(df_crop_recommendation['Fertilizer'])
+# Encoded by the loader; the fitted encoders travel with ``data`` to save_artifacts.
 
-# ========== STEP 3: Feature Scaling and One-Hot Encoding ==========
-X = df_crop_recommendation.drop('Fertilizer', axis=1)
-y = df_crop_recommendation['Fertilizer']
-
-scaler = StandardScaler()
-X_scaled = scaler.fit_transform(X)
-
-y_encoded = to_categorical(y)
+# ========== STEP 3: Feature Scaling ==========
+# Scaled by the loader. Labels stay integer class ids (sparse categorical
+# loss) instead of a one-hot matrix with a column per fertilizer.
+n_classes = len(data.fertilizer_encoder.classes_)
 print("✅ Features scaled and target encoded.")
 
 
 # ========== STEP 4: Split Dataset for Validation ==========
-X_train, X_val, y_train, y_val = train_test_split(X_scaled, y_encoded, test_size=0.2, random_state=42)
+# Same rows as train_test_split(X, y, test_size=0.2, random_state=42).
+X_train, X_val, y_train, y_val = data.x_train, data.x_val, data.y_train, data.y_val
 
 # ========== STEP 5: Define ANN Model ==========
-model = Sequential([
-    Dense(128, input_dim=X.shape[1], activation='relu'),
-    BatchNormalization(),
-    Dropout(0.4),
-
-    Dense(256, activation='relu'),
-    BatchNormalization(),
-    Dropout(0.4),
-
-    Dense(128, activation='relu'),
-    Dropout(0.3),
-
-    Dense(y_encoded.shape[1], activation='softmax')
-])
-
-model.compile(optimizer='adam', loss='categorical_crossentropy', metrics=['accuracy'])
+# Dense 128/256/128 with batch norm and dropout 0.4/0.4/0.3; see fertilizer_network.py.
+model = build_model(X_train.shape[1], n_classes)
 print("✅ Model defined and compiled.")
 
 # ========== STEP 6: Train with Early Stopping ==========
 early_stop = EarlyStopping(monitor='val_loss', patience=10, restore_best_weights=True, verbose=1)
-
-print("\n--- Starting Model Training ---")
-history = model.fit(
-    X_train, y_train,
-    validation_data=(X_val, y_val),
-    epochs=100,
-    batch_size=32,
-    callbacks=[early_stop],
-    verbose=1
-)
+epoch_timer = EpochTimer(len(y_train))
+
+print(f"\n--- Starting Model Training ({TRAINING_INPUT} input) ---")
+if TRAINING_INPUT == 'tf.data':
+    train_data = make_dataset(X_train, y_train, TFDATA_BATCH_SIZE, shuffle_buffer=SHUFFLE_BUFFER_ROWS,
+                              cache=TFDATA_CACHE, parallelism=TFDATA_PARALLELISM, seed=42)
+    val_data = make_dataset(X_val, y_val, TFDATA_BATCH_SIZE, cache=TFDATA_CACHE, parallelism=TFDATA_PARALLELISM)
+    history = model.fit(train_data, validation_data=val_data, epochs=100,
+                        callbacks=[early_stop, epoch_timer], verbose=1)
+else:
+    history = model.fit(
+        X_train, y_train,
+        validation_data=(X_val, y_val),
+        epochs=100,
+        batch_size=32,
+        callbacks=[early_stop, epoch_timer],
+        verbose=1
+    )
 print("--- Training Complete ---")
+print(f"   {len(epoch_timer.epoch_seconds)} epochs, {np.mean(epoch_timer.epoch_seconds):.1f}s per epoch, "
+      f"{epoch_timer.samples_per_second:,.0f} samples/s")
 
-# ========== STEP 7: Save Model and Tools (Robust Save) ==========
-
-# Create the output directory if it doesn't exist
-os.makedirs(OUTPUT_DIR, exist_ok=True)
-
+# ========== STEP 7: Save Model and Tools ==========
+# fertilizer_network.save_artifacts writes the layout agri_dash.py loads: the Keras
+# model, encoders and scaler pickles, the fused NumPy export, the quantized TFLite
+# model and its label metadata.
 try:
-    # 1. Save the Keras model
-    model.save(MODEL_PATH)
-
-    # 2. Save the Encoders and Dropdown values
-    with open(ENCODERS_PATH, "wb") as f:
-        pickle.dump({
-            "label_encoders": label_encoders,
-            "fertilizer_encoder": fertilizer_encoder,
-            "dropdowns": dropdowns
-        }, f)
-
-    # 3. Save the Scaler
-    with open(SCALER_PATH, "wb") as f:
-        pickle.dump(scaler, f)
-
+    save_artifacts(model, data, OUTPUT_DIR, TFLITE_QUANTIZATION)
     print(f"\n SUCCESS: All files saved to the '{OUTPUT_DIR}' directory.")
     print(f"   - Model: {MODEL_PATH}")
     print(f"   - Encoders: {ENCODERS_PATH}")
     print(f"   - Scaler: {SCALER_PATH}")
-
+    print(f"   - NumPy weights: {NUMPY_WEIGHTS_PATH}")
+    print(f"   - TFLite ({TFLITE_QUANTIZATION}): {TFLITE_PATH}")
+    print(f"   - Label metadata: {METADATA_PATH}")
 except Exception as e:
     print(f"\nFATAL ERROR: Failed to save model or tools. Check directory permissions. Error: {e}")
+    exit()
+
+
+# ========== STEP 8: Compare the Quantized TFLite Model with the Float Model ==========
+quantized = TFLiteFertilizerModel.load(TFLITE_PATH)
+
+started = time.perf_counter()
+float_probs = model.predict(X_val, verbose=0)
+float_seconds = time.perf_counter() - started
+started = time.perf_counter()
+quantized_probs = quantized.predict(X_val)
+quantized_seconds = time.perf_counter() - started
+
+float_accuracy = np.mean(float_probs.argmax(axis=1) == y_val)
+quantized_accuracy = np.mean(quantized_probs.argmax(axis=1) == y_val)
+print(f"\n--- Quantized vs float model on {len(X_val)} validation rows ---")
+print(f"   Accuracy: float {float_accuracy:.4f}, {TFLITE_QUANTIZATION} {quantized_accuracy:.4f} "
+      f"({quantized_accuracy - float_accuracy:+.4f})")
+print(f"   Top-1 agreement: {np.mean(float_probs.argmax(axis=1) == quantized_probs.argmax(axis=1)):.2%}")
+print(f"   Batch latency: float {float_seconds * 1000:.1f} ms, {TFLITE_QUANTIZATION} {quantized_seconds * 1000:.1f} ms")
+print(f"   Size: {MODEL_PATH} {os.path.getsize(MODEL_PATH) / 1024:.0f} KB, "
+      f"{TFLITE_PATH} {os.path.getsize(TFLITE_PATH) / 1024:.0f} KB")
+
+
+# ========== STEP 9: Distil a Compact Student Model ==========
+if DISTILL_STUDENT:
+    started = time.perf_counter()
+    student_layers = distill(model, X_train, X_val, STUDENT_HIDDEN_UNITS, STUDENT_TEMPERATURE)
+    save_layers(student_layers, STUDENT_PATH)
+    student = NumpyFertilizerModel.load(STUDENT_PATH)
+    teacher_top1 = model.predict(X_val, batch_size=4096, verbose=0).argmax(axis=1)
+    student_top1 = student.predict(X_val).argmax(axis=1)
+    print(f"\n--- Distilled student ({STUDENT_HIDDEN_UNITS} hidden units) in {time.perf_counter() - started:.0f}s ---")
+    print(f"   Accuracy: teacher {np.mean(teacher_top1 == y_val):.4f}, student {np.mean(student_top1 == y_val):.4f}")
+    print(f"   Top-1 agreement with the teacher: {np.mean(teacher_top1 == student_top1):.2%}")
+    print(f"   - Student: {STUDENT_PATH} ({os.path.getsize(STUDENT_PATH) / 1024:.0f} KB)")
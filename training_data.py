@@ -0,0 +1,360 @@
+"""Memory-bounded loading of the fertilizer training CSV.
+
+``pd.read_csv`` on the whole file followed by ``.astype(str).str.strip().str.lower()``
+keeps every categorical value as a Python string and then builds several
+full-size float64 copies (``X``, ``X_scaled`` and a one-hot ``y``). The streaming
+loader here reads the CSV in chunks with float32 and ``category`` dtypes
+instead:
+
+* categories are normalized per chunk on the (few) distinct values, not per row;
+* each chunk is kept as float32 numbers plus small integer codes;
+* the encoders are the sorted union of the chunk vocabularies, exactly what
+  ``LabelEncoder.fit`` produces on the full column;
+* the scaler is fitted with ``StandardScaler.partial_fit`` chunk by chunk and
+  applied in place, so the only full-size array is the float32 feature matrix;
+* labels stay integer class ids for ``sparse_categorical_crossentropy``.
+
+``prepare_training_split`` adds a columnar cache on top: the encoded, scaled
+matrix and labels are written once as ``.npy`` files, rows ordered train
+split first, under a key made of the CSV's SHA-256 and the preprocessing
+config. Later runs memory-map them, so ``x_train``/``x_val`` are views of the
+mapped file and nothing is parsed, encoded or copied. Delete the cache
+directory to reclaim the space of entries for old CSVs.
+
+``make_dataset`` feeds either source to Keras through ``tf.data``: contiguous
+blocks are read from the (possibly memory-mapped) arrays in parallel, rows
+are shuffled through a bounded buffer, batched and prefetched, so the input
+side keeps up with training without holding another copy of the data.
+
+Usage:
+    python training_data.py synthetic_crop_data_all_crops.csv   # load and print the peak memory
+    python training_data.py synthetic_crop_data_all_crops.csv --cache-dir training_cache
+"""
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import resource
+import shutil
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+from feature_columns import CATEGORICAL_COLUMNS, NUMERIC_COLUMNS, TARGET_COLUMN
+
+REQUIRED_COLUMNS = NUMERIC_COLUMNS + CATEGORICAL_COLUMNS + [TARGET_COLUMN]
+DEFAULT_CHUNK_ROWS = 250_000
+# Rows read per tf.data element before they are split back into single rows.
+DATASET_BLOCK_ROWS = 4096
+# Bump when the loader's output changes so older cache entries are not reused.
+CACHE_FORMAT_VERSION = 1
+
+TrainingData = namedtuple(
+    "TrainingData", ["features", "labels", "feature_columns", "label_encoders", "fertilizer_encoder", "scaler"]
+)
+
+TrainingSplit = namedtuple(
+    "TrainingSplit",
+    ["x_train", "x_val", "y_train", "y_val", "feature_columns", "label_encoders", "fertilizer_encoder", "scaler"]
+)
+
+
+def read_columns(path):
+    """Header of the CSV; raises ValueError if a required column is missing."""
+    columns = pd.read_csv(path, nrows=0).columns.tolist()
+    missing = [col for col in REQUIRED_COLUMNS if col not in columns]
+    if missing:
+        raise ValueError(f"Missing column(s) in dataset: {', '.join(missing)}. Available columns are: {columns}")
+    return columns
+
+
+def normalize_categories(series):
+    """Strip and lowercase a ``category`` series the way training always has.
+
+    Returns ``(codes, values)``: int32 codes into the sorted, normalized
+    ``values`` of this chunk. Only the distinct categories are touched, and
+    categories that collapse to the same name (``"Rice"``, ``" rice"``) share
+    a code. Missing values become ``"nan"``, as ``astype(str)`` did.
+    """
+    names = series.cat.categories.astype(str).str.strip().str.lower().tolist()
+    codes = series.cat.codes.to_numpy()
+    if (codes < 0).any():
+        names.append("nan")
+        codes = np.where(codes < 0, len(names) - 1, codes)
+    values, remap = np.unique(np.array(names, dtype=object), return_inverse=True)
+    return remap[codes].astype(np.int32), values
+
+
+def _fitted_label_encoder(classes):
+    encoder = LabelEncoder()
+    encoder.classes_ = np.array(sorted(classes), dtype=object)
+    return encoder
+
+
+def load_training_data(path, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Read, encode and scale the training CSV without materializing it as strings.
+
+    Feature columns keep the CSV's column order (as ``df.drop('Fertilizer')``
+    did). Returns a :class:`TrainingData` with a C-contiguous float32 feature
+    matrix and int16 labels.
+    """
+    columns = read_columns(path)
+    feature_columns = [col for col in columns if col in REQUIRED_COLUMNS and col != TARGET_COLUMN]
+    categorical = CATEGORICAL_COLUMNS + [TARGET_COLUMN]
+    dtypes = {col: np.float32 for col in NUMERIC_COLUMNS}
+    dtypes.update({col: "category" for col in categorical})
+
+    # Pass 1: parse chunks into compact numbers and per-chunk category codes.
+    chunks = []
+    vocabularies = {col: set() for col in categorical}
+    reader = pd.read_csv(path, usecols=REQUIRED_COLUMNS, dtype=dtypes, chunksize=chunk_rows)
+    for frame in reader:
+        numeric = frame[NUMERIC_COLUMNS].to_numpy(dtype=np.float32)
+        coded = {}
+        for col in categorical:
+            codes, values = normalize_categories(frame[col])
+            vocabularies[col].update(values)
+            coded[col] = (codes, values)
+        chunks.append((numeric, coded))
+        del frame
+
+    label_encoders = {col: _fitted_label_encoder(vocabularies[col]) for col in CATEGORICAL_COLUMNS}
+    fertilizer_encoder = _fitted_label_encoder(vocabularies[TARGET_COLUMN])
+    encoders = dict(label_encoders, **{TARGET_COLUMN: fertilizer_encoder})
+
+    # Pass 2: write each chunk into the final matrix with global codes and fit
+    # the scaler incrementally, freeing the chunk as soon as it is copied.
+    n_rows = sum(len(numeric) for numeric, _ in chunks)
+    features = np.empty((n_rows, len(feature_columns)), dtype=np.float32)
+    labels = np.empty(n_rows, dtype=np.int16)
+    numeric_positions = [feature_columns.index(col) for col in NUMERIC_COLUMNS]
+    scaler = StandardScaler()
+    start = 0
+    while chunks:
+        numeric, coded = chunks.pop(0)
+        stop = start + len(numeric)
+        block = features[start:stop]
+        block[:, numeric_positions] = numeric
+        for col in categorical:
+            codes, values = coded[col]
+            global_codes = np.searchsorted(encoders[col].classes_, values)[codes]
+            if col == TARGET_COLUMN:
+                labels[start:stop] = global_codes
+            else:
+                block[:, feature_columns.index(col)] = global_codes
+        scaler.partial_fit(pd.DataFrame(block, columns=feature_columns, copy=False))
+        start = stop
+
+    for start in range(0, n_rows, chunk_rows):
+        block = features[start:start + chunk_rows]
+        block -= scaler.mean_.astype(np.float32)
+        block /= scaler.scale_.astype(np.float32)
+
+    return TrainingData(features, labels, feature_columns, label_encoders, fertilizer_encoder, scaler)
+
+
+# --- Columnar cache ---
+def file_sha256(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_key(path, test_size, random_state):
+    """Cache entry name: the CSV's content hash plus everything that shapes the arrays."""
+    config = {
+        "format": CACHE_FORMAT_VERSION,
+        "columns": REQUIRED_COLUMNS,
+        "categorical": CATEGORICAL_COLUMNS,
+        "normalize": "strip-lower",
+        "dtype": "float32",
+        "test_size": test_size,
+        "random_state": random_state,
+    }
+    digest = hashlib.sha256(file_sha256(path).encode())
+    digest.update(json.dumps(config, sort_keys=True).encode())
+    return digest.hexdigest()[:24]
+
+
+def cache_entry_path(path, cache_dir, test_size=0.2, random_state=42):
+    """Directory of the cache entry for the CSV at ``path``."""
+    return os.path.join(cache_dir, cache_key(path, test_size, random_state))
+
+
+def write_cache(data, directory, train_index, val_index, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Write ``data`` to ``directory`` with the training rows first, then the validation rows.
+
+    Rows are gathered chunk by chunk straight into the ``.npy`` files, so no
+    second full-size copy is made.
+    """
+    order = np.concatenate([train_index, val_index])
+    features = np.lib.format.open_memmap(os.path.join(directory, "features.npy"), mode="w+",
+                                         dtype=np.float32, shape=data.features.shape)
+    for start in range(0, len(order), chunk_rows):
+        features[start:start + chunk_rows] = data.features[order[start:start + chunk_rows]]
+    features.flush()
+    del features
+    np.save(os.path.join(directory, "labels.npy"), data.labels[order])
+    with open(os.path.join(directory, "preprocessing.pkl"), "wb") as f:
+        pickle.dump({
+            "n_train": len(train_index),
+            "feature_columns": data.feature_columns,
+            "label_encoders": data.label_encoders,
+            "fertilizer_encoder": data.fertilizer_encoder,
+            "scaler": data.scaler,
+        }, f)
+
+
+def load_cache(directory):
+    """Memory-map a cache entry; the returned arrays are read-only views of the files."""
+    with open(os.path.join(directory, "preprocessing.pkl"), "rb") as f:
+        meta = pickle.load(f)
+    features = np.load(os.path.join(directory, "features.npy"), mmap_mode="r")
+    labels = np.load(os.path.join(directory, "labels.npy"), mmap_mode="r")
+    n_train = meta["n_train"]
+    return TrainingSplit(features[:n_train], features[n_train:], labels[:n_train], labels[n_train:],
+                         meta["feature_columns"], meta["label_encoders"], meta["fertilizer_encoder"], meta["scaler"])
+
+
+def prepare_training_split(path, cache_dir=None, test_size=0.2, random_state=42, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Encoded, scaled train/validation split of the CSV at ``path``.
+
+    The rows are the ones ``train_test_split(X, y, test_size, random_state)``
+    picks. With ``cache_dir`` the arrays come from (and on a miss are written
+    to) the columnar cache. Returns ``(split, cache_hit)``.
+    """
+    if cache_dir:
+        directory = cache_entry_path(path, cache_dir, test_size, random_state)
+        if os.path.exists(os.path.join(directory, "preprocessing.pkl")):
+            return load_cache(directory), True
+
+    data = load_training_data(path, chunk_rows)
+    train_index, val_index = train_test_split(np.arange(len(data.labels)), test_size=test_size,
+                                              random_state=random_state)
+    if not cache_dir:
+        return TrainingSplit(data.features[train_index], data.features[val_index], data.labels[train_index],
+                             data.labels[val_index], data.feature_columns, data.label_encoders,
+                             data.fertilizer_encoder, data.scaler), False
+
+    # Build the entry under a temporary name and rename it into place, so an
+    # interrupted run never leaves a half-written entry that looks complete.
+    os.makedirs(cache_dir, exist_ok=True)
+    staging = f"{directory}.tmp-{os.getpid()}"
+    os.makedirs(staging, exist_ok=True)
+    try:
+        write_cache(data, staging, train_index, val_index, chunk_rows)
+        del data
+        os.replace(staging, directory)
+    except OSError:
+        # Another run finished the same entry first; use theirs.
+        shutil.rmtree(staging, ignore_errors=True)
+        if not os.path.exists(os.path.join(directory, "preprocessing.pkl")):
+            raise
+    return load_cache(directory), False
+
+
+# --- tf.data input pipeline ---
+def make_dataset(features, labels, batch_size, shuffle_buffer=0, cache=False, parallelism=None,
+                 block_rows=DATASET_BLOCK_ROWS, seed=None):
+    """``tf.data`` pipeline over a feature matrix and labels, such as a cache entry's views.
+
+    ``labels`` are integer class ids or, for distillation, a matrix of soft
+    targets with one row per sample.
+
+    Rows are read in contiguous blocks of ``block_rows`` by ``parallelism``
+    parallel calls (``None`` lets tf.data tune it) and re-cut into batches of
+    ``batch_size``. With ``shuffle_buffer`` > 0 each epoch draws the blocks in
+    a new random order, groups them so one group holds about
+    ``shuffle_buffer`` rows, and permutes the rows within each group. That is
+    a bounded-buffer shuffle done in NumPy rather than row by row in tf.data.
+    ``cache`` keeps the loaded blocks in memory after the first epoch; leave
+    it off for data larger than RAM, where the page cache already holds the
+    mapped file.
+    """
+    import tensorflow as tf
+
+    autotune = tf.data.AUTOTUNE if parallelism is None else parallelism
+    n_rows, n_features = features.shape
+    n_blocks = -(-n_rows // block_rows)
+    blocks_per_group = max(1, min(n_blocks, shuffle_buffer // block_rows)) if shuffle_buffer else 1
+    label_dtype = np.int32 if np.issubdtype(labels.dtype, np.integer) else np.float32
+    rng = np.random.default_rng(seed)
+
+    def read_blocks(indices):
+        x = np.concatenate([features[i * block_rows:(i + 1) * block_rows] for i in indices])
+        y = np.concatenate([labels[i * block_rows:(i + 1) * block_rows] for i in indices])
+        if shuffle_buffer:
+            order = rng.permutation(len(y))
+            x, y = x[order], y[order]
+        return x.astype(np.float32, copy=False), y.astype(label_dtype, copy=False)
+
+    def load(indices):
+        x, y = tf.numpy_function(read_blocks, [indices], (tf.float32, tf.as_dtype(label_dtype)))
+        x.set_shape([None, n_features])
+        y.set_shape([None, *labels.shape[1:]])
+        return x, y
+
+    def shuffle_rows(x, y):
+        order = tf.random.shuffle(tf.range(tf.shape(y)[0]), seed=seed)
+        return tf.gather(x, order), tf.gather(y, order)
+
+    dataset = tf.data.Dataset.range(n_blocks)
+    if cache:
+        # Cache single blocks, then shuffle and group the cached blocks each epoch.
+        dataset = dataset.batch(1).map(load, num_parallel_calls=autotune).cache()
+        if shuffle_buffer:
+            dataset = dataset.shuffle(n_blocks, seed=seed, reshuffle_each_iteration=True)
+            dataset = dataset.rebatch(block_rows * blocks_per_group).map(shuffle_rows, num_parallel_calls=autotune)
+    else:
+        if shuffle_buffer:
+            dataset = dataset.shuffle(n_blocks, seed=seed, reshuffle_each_iteration=True)
+        dataset = dataset.batch(blocks_per_group).map(load, num_parallel_calls=autotune,
+                                                     deterministic=not shuffle_buffer)
+    # rebatch() loses the dataset length; restore it so Keras knows where an epoch ends.
+    dataset = dataset.rebatch(batch_size).apply(tf.data.experimental.assert_cardinality(-(-n_rows // batch_size)))
+
+    options = tf.data.Options()
+    if parallelism is not None:
+        options.threading.private_threadpool_size = parallelism
+    return dataset.prefetch(tf.data.AUTOTUNE).with_options(options)
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process so far, in MB (Linux reports KB)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load the training CSV in chunks and report the peak memory.")
+    parser.add_argument("data", nargs="?", default="synthetic_crop_data_all_crops.csv")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--cache-dir", help="build (or reuse) the columnar cache entry in this directory")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.data):
+        print(f"Data file '{args.data}' not found.")
+        return 1
+    started = time.perf_counter()
+    if args.cache_dir:
+        split, hit = prepare_training_split(args.data, args.cache_dir, chunk_rows=args.chunk_rows)
+        print(f"{'Mapped' if hit else 'Built'} cache entry: {len(split.y_train)} training and "
+              f"{len(split.y_val)} validation rows in {time.perf_counter() - started:.2f}s, "
+              f"peak RSS {peak_rss_mb():.0f} MB")
+        return 0
+    data = load_training_data(args.data, args.chunk_rows)
+    print(f"Loaded {len(data.labels)} rows x {len(data.feature_columns)} features "
+          f"({len(data.fertilizer_encoder.classes_)} classes) in {time.perf_counter() - started:.1f}s")
+    print(f"Feature matrix {data.features.nbytes / 2**20:.1f} MB, peak RSS {peak_rss_mb():.0f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())